@@ -0,0 +1,31 @@
+"""Add game score
+
+Revision ID: 7c1f0e2b9a4d
+Revises: 44d48dbeda5a
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1f0e2b9a4d"
+down_revision: str | Sequence[str] | None = "44d48dbeda5a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("games", sa.Column("score", sa.Float(), server_default="0", nullable=False))
+    op.create_index(op.f("ix_games_score"), "games", ["score"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_games_score"), table_name="games")
+    op.drop_column("games", "score")
@@ -0,0 +1,33 @@
+"""Add genre and team game indexes
+
+Revision ID: a7d4e1b93c60
+Revises: f5c3a9d27b18
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d4e1b93c60"
+down_revision: str | Sequence[str] | None = "f5c3a9d27b18"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_game_genres_genre_id_game_id", "game_genres", ["genre_id", "game_id"], unique=False)
+    op.drop_index(op.f("ix_game_genres_genre_id"), table_name="game_genres")
+    op.create_index("ix_game_teams_team_id_game_id", "game_teams", ["team_id", "game_id"], unique=False)
+    op.drop_index(op.f("ix_game_teams_team_id"), table_name="game_teams")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f("ix_game_teams_team_id"), "game_teams", ["team_id"], unique=False)
+    op.drop_index("ix_game_teams_team_id_game_id", table_name="game_teams")
+    op.create_index(op.f("ix_game_genres_genre_id"), "game_genres", ["genre_id"], unique=False)
+    op.drop_index("ix_game_genres_genre_id_game_id", table_name="game_genres")
@@ -0,0 +1,31 @@
+"""Add job owner and heartbeat
+
+Revision ID: c6f2a8d41b73
+Revises: a7d4e1b93c60
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c6f2a8d41b73"
+down_revision: str | Sequence[str] | None = "a7d4e1b93c60"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("jobs", sa.Column("owner", sa.String(length=128), nullable=True))
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("jobs", "heartbeat_at")
+    op.drop_column("jobs", "owner")
@@ -0,0 +1,34 @@
+"""Add review scores and running rating aggregates
+
+Revision ID: e8b2f4a61c95
+Revises: d41a7c9e2f03
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b2f4a61c95"
+down_revision: str | Sequence[str] | None = "d41a7c9e2f03"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("reviews", sa.Column("score", sa.Float(), nullable=True))
+    op.add_column("games", sa.Column("rating_sum", sa.Float(), server_default="0", nullable=False))
+    op.add_column("games", sa.Column("rating_count", sa.Integer(), server_default="0", nullable=False))
+    op.execute("UPDATE games SET rating_sum = rating * reviews_number, rating_count = reviews_number")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("games", "rating_count")
+    op.drop_column("games", "rating_sum")
+    op.drop_column("reviews", "score")
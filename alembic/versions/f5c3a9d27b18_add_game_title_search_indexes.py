@@ -0,0 +1,43 @@
+"""Add game title search indexes
+
+Revision ID: f5c3a9d27b18
+Revises: e8b2f4a61c95
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f5c3a9d27b18"
+down_revision: str | Sequence[str] | None = "e8b2f4a61c95"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # word prefixes (LIKE '% x%') go through the trigram index, title prefixes (LIKE 'x%') through the btree
+    op.create_index(
+        "ix_games_title_trgm",
+        "games",
+        [sa.text("lower(title) gin_trgm_ops")],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index("ix_games_title_prefix", "games", [sa.text("lower(title) text_pattern_ops")], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_games_title_prefix", table_name="games")
+    op.drop_index("ix_games_title_trgm", table_name="games")
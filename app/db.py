@@ -1,13 +1,39 @@
+import uuid
 from collections.abc import AsyncGenerator
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.settings import settings
+from app.utils.compiled_cache import CompiledCacheStats
+from app.utils.metrics import metrics
 
 DATABASE_URL = settings.database_url
 
-async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+
+def engine_options(url: str) -> dict[str, Any]:
+    options: dict[str, Any] = {"query_cache_size": settings.database_compiled_cache_size}
+    # SQLite engines use a pool without a size
+    if url.startswith("sqlite"):
+        return options
+    options.update(pool_size=settings.database_pool_size, max_overflow=settings.database_max_overflow)
+    if url.startswith("postgresql+asyncpg"):
+        connect_args: dict[str, Any] = {
+            "prepared_statement_cache_size": settings.database_prepared_statement_cache_size
+        }
+        if settings.database_pgbouncer:
+            # pgbouncer hands each transaction any server connection, so prepared statement names must be unique
+            # and asyncpg's own statement cache, which reuses names, stays off
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        options["connect_args"] = connect_args
+    return options
+
+
+async_engine = create_async_engine(DATABASE_URL, echo=False, future=True, **engine_options(DATABASE_URL))
+compiled_cache_stats = CompiledCacheStats(async_engine.sync_engine)
+metrics.register("compiled_cache", compiled_cache_stats.snapshot)
 
 async_session_maker = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
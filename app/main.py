@@ -1,14 +1,114 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
+from app.db import async_engine, async_session_maker
+from app.routers.admin import router as admin_router
 from app.routers.auth import router as auth_router
 from app.routers.game import router as game_router
+from app.routers.genre import router as genre_router
+from app.routers.health import router as health_router
+from app.routers.team import router as team_router
 from app.routers.user import router as user_router
+from app.services.activity import activity_buffer
+from app.services.autocomplete import title_index
+from app.services.catalog import catalog_snapshot
+from app.services.genre_affinity import genre_affinity
+from app.services.jobs import job_runner
+from app.services.leaderboard import leaderboard
+from app.services.similarity import similar_games
+from app.services.warmup import warmup
+from app.settings import settings
+from app.utils.compression import CompressionMiddleware
+from app.utils.concurrency import ConcurrencyLimitMiddleware, limiters
+from app.utils.deadline import DeadlineMiddleware
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.tracing import TracingMiddleware, instrument_routes, listen_to_statements, tracer
+
+
+async def refresh_snapshots() -> None:
+    """Warm up, then keep the in-process snapshots fresh. The refresh loops start after the warm-up built them."""
+    if settings.warmup_enabled:
+        await warmup.run(async_engine, async_session_maker)
+    warmup.ready = True
+
+    loops = [
+        genre_affinity.run(
+            async_session_maker, settings.genre_affinity_refresh_seconds, settings.genre_affinity_poll_seconds
+        ),
+        similar_games.run(async_session_maker, settings.similar_games_poll_seconds),
+        title_index.run(async_session_maker, settings.autocomplete_refresh_seconds, settings.autocomplete_poll_seconds),
+    ]
+    if settings.leaderboard_enabled:
+        loops.append(
+            leaderboard.run(
+                async_session_maker, settings.leaderboard_refresh_seconds, settings.leaderboard_poll_seconds
+            )
+        )
+    if settings.catalog_snapshot_path:
+        loops.append(
+            catalog_snapshot.run(
+                async_session_maker, settings.catalog_snapshot_refresh_seconds, settings.catalog_snapshot_poll_seconds
+            )
+        )
+    await asyncio.gather(*loops)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    activity_buffer.open()
+    background_tasks = [
+        asyncio.create_task(activity_buffer.run(async_session_maker, settings.activity_flush_seconds)),
+        asyncio.create_task(refresh_snapshots()),
+    ]
+    if tracer.enabled:
+        background_tasks.append(asyncio.create_task(tracer.run(settings.tracing_export_seconds)))
+
+    if settings.jobs_enabled:
+        await job_runner.start(async_session_maker)
+
+    yield
+
+    await job_runner.stop()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    async with async_session_maker() as db:
+        await activity_buffer.flush(db)
+    activity_buffer.close()
+    await tracer.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware, header=settings.profiling_header, top_functions=settings.profiling_top_functions
+    )
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+if tracer.enabled:
+    listen_to_statements()
+    app.add_middleware(TracingMiddleware)
+if settings.concurrency_limit_enabled:
+    # outside everything but the deadline, so shed requests cost nothing beyond the 503
+    app.add_middleware(ConcurrencyLimitMiddleware, limiters=limiters)
+if settings.request_deadline_seconds:
+    # outermost, so the time a request waits for the limiter counts against its deadline
+    app.add_middleware(
+        DeadlineMiddleware, budgets=settings.request_deadlines, default=settings.request_deadline_seconds
+    )
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(game_router, prefix="/games", tags=["games"])
+app.include_router(genre_router, prefix="/genres", tags=["genres"])
+app.include_router(team_router, prefix="/teams", tags=["teams"])
 app.include_router(user_router, prefix="/user", tags=["user"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
+app.include_router(health_router, prefix="/health", tags=["health"])
+if tracer.enabled:
+    instrument_routes(app)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
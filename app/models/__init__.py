@@ -1,4 +1,5 @@
-from .game import Game, GameGenre, GameTeam, Genre, Review, Team
+from .game import Game, GameGenre, GameTeam, Genre, Review, SimilarGame, Team
+from .job import Job
 from .user import Role, User, UserLikedGenres
 
 __all__ = [
@@ -6,8 +7,10 @@ __all__ = [
     "GameGenre",
     "GameTeam",
     "Genre",
+    "Job",
     "Review",
     "Role",
+    "SimilarGame",
     "Team",
     "User",
     "UserLikedGenres",
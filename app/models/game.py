@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import Date, Float, Integer, String, Text
 
@@ -9,6 +9,7 @@ class Game(Base):
     __tablename__ = "games"
 
     id = Column(Integer, primary_key=True)
+    # lower(title) has PostgreSQL-only trigram and text_pattern_ops indexes for autocomplete, created by migration
     title = Column(String(255), nullable=False)
     release_date = Column(Date, nullable=True)
     rating = Column(Float, default=0, nullable=False)
@@ -19,6 +20,10 @@ class Game(Base):
     playing = Column(Integer, default=0, nullable=False)
     backlogs = Column(Integer, default=0, nullable=False)
     whitelist = Column(Integer, default=0, nullable=False)
+    score = Column(Float, default=0, server_default="0", nullable=False, index=True)
+    # running aggregate behind ``rating``, the CSV rating counts as ``reviews_number`` scores of that value
+    rating_sum = Column(Float, default=0, server_default="0", nullable=False)
+    rating_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     teams = relationship("GameTeam", back_populates="game", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="game", cascade="all, delete-orphan")
@@ -30,7 +35,7 @@ class Game(Base):
 
     @property
     def game_reviews(self) -> list[str]:
-        return [review.review for review in self.reviews]
+        return [review.review for review in self.reviews if review.review is not None]
 
     @property
     def game_genres(self) -> list[str]:
@@ -52,9 +57,13 @@ class GameGenre(Base):
 
     id = Column(Integer, primary_key=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False, index=True)
-    genre_id = Column(Integer, ForeignKey("genres.id"), nullable=False, index=True)
+    genre_id = Column(Integer, ForeignKey("genres.id"), nullable=False)
 
-    __table_args__ = (UniqueConstraint("game_id", "genre_id", name="uq_game_genre"),)
+    __table_args__ = (
+        UniqueConstraint("game_id", "genre_id", name="uq_game_genre"),
+        # covers the keyset pages of a genre's games
+        Index("ix_game_genres_genre_id_game_id", "genre_id", "game_id"),
+    )
 
     game = relationship("Game", back_populates="genres")
     genre = relationship("Genre", back_populates="games")
@@ -74,9 +83,13 @@ class GameTeam(Base):
 
     id = Column(Integer, primary_key=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False, index=True)
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
 
-    __table_args__ = (UniqueConstraint("game_id", "team_id", name="uq_game_team"),)
+    __table_args__ = (
+        UniqueConstraint("game_id", "team_id", name="uq_game_team"),
+        # covers the keyset pages of a team's games
+        Index("ix_game_teams_team_id_game_id", "team_id", "game_id"),
+    )
 
     game = relationship("Game", back_populates="teams")
     team = relationship("Team", back_populates="games")
@@ -88,5 +101,17 @@ class Review(Base):
     id = Column(Integer, primary_key=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False, index=True)
     review = Column(Text, nullable=True)
+    score = Column(Float, nullable=True)
 
     game = relationship("Game", back_populates="reviews")
+
+
+class SimilarGame(Base):
+    __tablename__ = "similar_games"
+
+    game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    similar_game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), nullable=False)
+    similarity = Column(Float, nullable=False)
+
+    similar_game = relationship("Game", foreign_keys=[similar_game_id])
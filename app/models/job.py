@@ -0,0 +1,21 @@
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, String, Text
+
+from app.db import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String(64), nullable=False)
+    status = Column(String(16), nullable=False, index=True)
+    params = Column(JSON, nullable=False, default=dict)
+    progress = Column(Float, default=0, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # runner that claimed the job, and when it last confirmed it is still running it
+    owner = Column(String(128), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import ADMIN_ACCESS
+from app.db import get_async_session
+from app.models import Job, User
+from app.schemas.job import JobCreateModel, JobResponseModel, JobStatus
+from app.services.jobs import JobQueueFullError, UnknownJobTypeError, job_runner
+from app.utils.auth import require_roles
+from app.utils.metrics import metrics
+from app.utils.profiling import profile_store
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics(current_user: User = Depends(require_roles(*ADMIN_ACCESS))) -> dict[str, dict]:
+    """Endpoint to get in-process performance counters."""
+    return metrics.snapshot()
+
+
+@router.post("/jobs", response_model=JobResponseModel, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_job(
+    job_data: JobCreateModel,
+    current_user: User = Depends(require_roles(*ADMIN_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Endpoint to queue a background job."""
+    try:
+        return await job_runner.enqueue(db, job_data.type, job_data.params)
+    except UnknownJobTypeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown job type") from None
+    except JobQueueFullError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job queue is full") from None
+
+
+@router.get("/jobs", response_model=list[JobResponseModel])
+async def get_jobs(
+    current_user: User = Depends(require_roles(*ADMIN_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+    job_status: JobStatus | None = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Endpoint to list background jobs, newest first."""
+    statement = select(Job).order_by(Job.id.desc()).limit(limit).offset(offset)
+    if job_status is not None:
+        statement = statement.where(Job.status == job_status.value)
+    return (await db.execute(statement)).scalars().all()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponseModel)
+async def get_job(
+    job_id: int,
+    current_user: User = Depends(require_roles(*ADMIN_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Endpoint to poll the status and progress of a background job."""
+    job = await db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get("/profiles")
+def get_profiles(current_user: User = Depends(require_roles(*ADMIN_ACCESS))) -> list[dict]:
+    """Endpoint to list the request profiles kept by this process, newest first."""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, current_user: User = Depends(require_roles(*ADMIN_ACCESS))) -> dict:
+    """Endpoint to get the report of a profiled request."""
+    report = profile_store.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return report
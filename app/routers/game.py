@@ -1,42 +1,214 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.constants import EDITOR_ACCESS
+from app.constants import ADMIN_ACCESS, EDITOR_ACCESS
 from app.db import get_async_session
 from app.models import User
-from app.schemas.game import GameResponseModel
+from app.schemas.game import GameActivityModel, GameResponseModel, GameSortField, GameTitleModel
+from app.schemas.review import ReviewBulkItemModel, ReviewBulkResponseModel, ReviewCreateModel, ReviewResponseModel
+from app.services.activity import activity_buffer
+from app.services.autocomplete import title_index
+from app.services.catalog import catalog_snapshot
 from app.services.game import GameService
+from app.services.genre_affinity import genre_affinity
+from app.services.leaderboard import leaderboard
+from app.services.review import ReviewService
 from app.services.user import UserService
+from app.settings import settings
 from app.utils.auth import require_roles
+from app.utils.pagination import set_pagination_headers, split_page, total_from_page
 
 router = APIRouter()
 
 game_service = GameService()
 user_service = UserService()
+review_service = ReviewService()
+
+
+async def resolve_total(
+    db: AsyncSession, page: list, offset: int, has_more: bool, exact_total: bool, genre_ids: list[int] | None = None
+) -> tuple[int, bool]:
+    """Total matching games and whether it is exact, cheapest source first."""
+    total = total_from_page(offset, page, has_more)
+    if total is not None:
+        return total, True
+
+    if genre_ids is None:
+        if exact_total:
+            return await game_service.count_games(db), True
+        return await game_service.estimate_game_count(db), False
+
+    genre_ids = sorted(set(genre_ids))
+    if exact_total:
+        return await game_service.count_games_in_genres(genre_ids, db), True
+    genre_counts = await game_service.get_genre_game_counts(db)
+    estimate = sum(genre_counts.get(genre_id, 0) for genre_id in genre_ids)
+    if len(genre_ids) == 1:
+        return estimate, True
+    # games in several of the genres are counted once per genre, so this is an upper bound
+    return min(estimate, await game_service.estimate_game_count(db)), False
+
+
+async def top_games(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    sort: GameSortField,
+    exact_total: bool,
+):
+    """One page of the whole catalog by ``sort``, from the leaderboard, the catalog snapshot or the database."""
+    snapshot = leaderboard.current() if sort == GameSortField.rating else None
+    if snapshot is not None and (games := snapshot.top(limit + 1, offset)) is not None:
+        games, has_more = split_page(games, limit)
+        response = snapshot.rendered(("top", limit, offset), lambda: games).to_response(request)
+        set_pagination_headers(response, *await resolve_total(db, games, offset, has_more, exact_total), has_more)
+        return response
+
+    catalog = catalog_snapshot.current()
+    if catalog is not None:
+        games = catalog.top(limit, offset, sort)
+        set_pagination_headers(response, len(catalog), True, offset + limit < len(catalog))
+        return games
+
+    games, has_more = split_page(await game_service.get_games(db, limit + 1, offset, sort), limit)
+    set_pagination_headers(response, *await resolve_total(db, games, offset, has_more, exact_total), has_more)
+    return games
 
 
 @router.get("/", response_model=list[GameResponseModel])
 async def get_games(
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
     db: AsyncSession = Depends(get_async_session),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    sort: GameSortField = Query(GameSortField.rating),
+    exact_total: bool = Query(False),
 ):
     """Endpoint to retrieve a list of games."""
-    games = await game_service.get_games(db, limit, offset)
-    return games
+    return await top_games(request, response, db, limit, offset, sort, exact_total)
+
+
+@router.get("/autocomplete", response_model=list[GameTitleModel])
+async def autocomplete_titles(
+    current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """Endpoint to complete a game title from the start of any of its words, the most popular games first."""
+    index = title_index.current()
+    if index is not None:
+        return index.search(q, limit)
+    return await game_service.autocomplete_titles(q, db, limit)
 
 
 @router.get("/recommendations", response_model=list[GameResponseModel])
 async def get_game_recommendations(
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
     db: AsyncSession = Depends(get_async_session),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    sort: GameSortField = Query(GameSortField.rating),
+    exact_total: bool = Query(False),
 ):
-    """Endpoint to retrieve game recommendations."""
+    """Endpoint to retrieve game recommendations, the best scored games for users without liked genres."""
     user_liked_genre_ids = await user_service.get_user_liked_genre_ids(current_user.id, db)
     if not user_liked_genre_ids:
-        return []
-    games = await game_service.get_games_by_genre_ids(user_liked_genre_ids, db, limit=limit, offset=offset)
+        return await top_games(request, response, db, limit, offset, GameSortField.score, exact_total)
+
+    # few liked genres give narrow lists, widen them with the genres that co-occur in the catalog
+    model = genre_affinity.current()
+    if model is not None and len(user_liked_genre_ids) < settings.recommendation_expand_below:
+        game_ids, total = model.recommend(
+            user_liked_genre_ids, limit, offset, sort, expansion_weight=settings.recommendation_expansion_weight
+        )
+        set_pagination_headers(response, total, True, offset + limit < total)
+        catalog = catalog_snapshot.current()
+        if catalog is not None:
+            return catalog.games_by_ids(game_ids)
+        return await game_service.get_games_by_ids(game_ids, db)
+
+    snapshot = leaderboard.current() if sort == GameSortField.rating else None
+    if snapshot is not None and (games := snapshot.top_for_genres(user_liked_genre_ids, limit + 1, offset)) is not None:
+        games, has_more = split_page(games, limit)
+        key = ("genres", frozenset(user_liked_genre_ids), limit, offset)
+        response = snapshot.rendered(key, lambda: games).to_response(request)
+        total, exact = await resolve_total(db, games, offset, has_more, exact_total, user_liked_genre_ids)
+        set_pagination_headers(response, total, exact, has_more)
+        return response
+
+    catalog = catalog_snapshot.current()
+    if catalog is not None:
+        rows = catalog.genre_rows(user_liked_genre_ids, sort)
+        set_pagination_headers(response, len(rows), True, offset + limit < len(rows))
+        return [catalog.game(int(row)) for row in rows[offset : offset + limit]]
+
+    games, has_more = split_page(
+        await game_service.get_games_by_genre_ids(user_liked_genre_ids, db, limit=limit + 1, offset=offset, sort=sort),
+        limit,
+    )
+    total, exact = await resolve_total(db, games, offset, has_more, exact_total, user_liked_genre_ids)
+    set_pagination_headers(response, total, exact, has_more)
     return games
+
+
+@router.get("/{game_id}/similar", response_model=list[GameResponseModel])
+async def get_similar_games(
+    game_id: int,
+    current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+    limit: int = Query(10, ge=1, le=settings.similar_games_top_k),
+):
+    """Endpoint to retrieve games similar to a specific game."""
+    games = await game_service.get_similar_games(game_id, db, limit)
+    if not games and not await game_service.game_exists(game_id, db):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    return games
+
+
+@router.post("/{game_id}/activity", status_code=status.HTTP_202_ACCEPTED)
+def record_game_activity(
+    game_id: int,
+    activity: GameActivityModel,
+    current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
+) -> dict[str, str]:
+    """Endpoint to record player activity, counters are written to the database in batches."""
+    activity_buffer.record(game_id, activity.counter, activity.delta)
+    return {"message": "Activity recorded"}
+
+
+@router.post("/reviews", response_model=ReviewBulkResponseModel, status_code=status.HTTP_201_CREATED)
+async def create_reviews(
+    reviews: list[ReviewBulkItemModel] = Body(..., max_length=5000),
+    current_user: User = Depends(require_roles(*ADMIN_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+) -> ReviewBulkResponseModel:
+    """Endpoint to ingest reviews for many games in one transaction."""
+    missing = await review_service.missing_game_ids({review.game_id for review in reviews}, db)
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Games not found: {sorted(missing)}")
+
+    created = await review_service.add_reviews(reviews, db)
+    return ReviewBulkResponseModel(created=len(created))
+
+
+@router.post("/{game_id}/reviews", response_model=ReviewResponseModel, status_code=status.HTTP_201_CREATED)
+async def create_review(
+    game_id: int,
+    review_data: ReviewCreateModel,
+    current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """Endpoint to review a game, optionally with a score that updates its rating."""
+    if await review_service.missing_game_ids({game_id}, db):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+
+    review = ReviewBulkItemModel(game_id=game_id, **review_data.model_dump())
+    (created,) = await review_service.add_reviews([review], db)
+    return created
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import EDITOR_ACCESS
+from app.db import get_async_session
+from app.models import User
+from app.schemas.game import GameResponseModel
+from app.schemas.genre import GenreResponseModel
+from app.services.game import GameService
+from app.services.genre import GenreService
+from app.utils.auth import require_roles
+from app.utils.pagination import set_cursor_headers, set_pagination_headers, split_page
+
+router = APIRouter()
+
+game_service = GameService()
+genre_service = GenreService()
+
+
+@router.get("/", response_model=list[GenreResponseModel])
+async def get_genres(
+    response: Response,
+    current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """Endpoint to retrieve genres with their game counts and average ratings."""
+    genres = await genre_service.get_genres(db)
+    set_pagination_headers(response, len(genres), True, offset + limit < len(genres))
+    return genres[offset : offset + limit]
+
+
+@router.get("/{genre_id}/games", response_model=list[GameResponseModel])
+async def get_genre_games(
+    genre_id: int,
+    response: Response,
+    current_user: User = Depends(require_roles(*EDITOR_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+    limit: int = Query(10, ge=1, le=100),
+    after: int | None = Query(None, description="Id of the last game of the previous page"),
+):
+    """Endpoint to retrieve the games of a genre by id, pages follow the ``X-Next-Cursor`` header."""
+    game_ids, has_more = split_page(await genre_service.get_genre_game_ids(genre_id, db, limit + 1, after), limit)
+    if not game_ids and not await genre_service.genre_exists(genre_id, db):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Genre not found")
+    set_cursor_headers(response, game_ids[-1] if has_more else None)
+    return await game_service.get_games_by_ids(game_ids, db)
@@ -0,0 +1,34 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_session
+from app.services.warmup import warmup
+from app.settings import settings
+
+router = APIRouter()
+
+
+# a coroutine on purpose, answering from the event loop is what proves the loop is not blocked
+@router.get("/live")
+async def live() -> dict[str, str]:  # noqa: RUF029
+    """Endpoint for liveness probes, answers as long as the event loop does."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready(db: AsyncSession = Depends(get_async_session)):
+    """Endpoint for readiness probes, unavailable until the warm-up finished and while the database is unreachable."""
+    if not warmup.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "warming_up", "warmup": warmup.stats()}
+        )
+    try:
+        await asyncio.wait_for(db.execute(text("SELECT 1")), timeout=settings.health_database_timeout_seconds)
+    except (SQLAlchemyError, OSError, TimeoutError):
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "database_unavailable"})
+    return {"status": "ready", "warmup": warmup.stats()}
@@ -5,12 +5,15 @@ from app.constants import ADMIN, ADMIN_ACCESS, EDITOR_ACCESS
 from app.db import get_async_session
 from app.models import User
 from app.schemas.user import (
+    UserBulkDeleteModel,
+    UserBulkDeleteResponseModel,
     UserCreateModel,
     UserCreateResponseModel,
     UserResponseModel,
     UserUpdateModel,
 )
 from app.services.user import UserService
+from app.settings import settings
 from app.utils.auth import require_roles
 
 router = APIRouter()
@@ -78,6 +81,23 @@ async def create_user(
     return UserCreateResponseModel(message="User created successfully, please login", user_id=created_user.id)
 
 
+@router.post("/bulk-delete", response_model=UserBulkDeleteResponseModel)
+async def delete_users(
+    delete_data: UserBulkDeleteModel,
+    current_user: User = Depends(require_roles(*ADMIN_ACCESS)),
+    db: AsyncSession = Depends(get_async_session),
+) -> UserBulkDeleteResponseModel:
+    """Endpoint to delete the users matching a list of ids and/or a role, never the requesting admin."""
+    users, liked_genres = await user_service.delete_users(
+        db,
+        user_ids=delete_data.user_ids,
+        role_id=delete_data.role_id,
+        exclude_ids=[current_user.id],
+        batch_size=settings.user_delete_batch_size,
+    )
+    return UserBulkDeleteResponseModel(users=users, liked_genres=liked_genres)
+
+
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
@@ -1,10 +1,30 @@
 from datetime import date
 from decimal import Decimal
+from enum import StrEnum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+class GameSortField(StrEnum):
+    rating = "rating"
+    score = "score"
+
+
+class GameCounter(StrEnum):
+    plays = "plays"
+    playing = "playing"
+    backlogs = "backlogs"
+    whitelist = "whitelist"
+    times_listed = "times_listed"
+
+
+class GameActivityModel(BaseModel):
+    counter: GameCounter
+    delta: int = Field(1, ge=-1000, le=1000)
 
 
 class GameResponseModel(BaseModel):
+    id: int
     title: str
     release_date: date | None
     rating: Decimal
@@ -21,3 +41,11 @@ class GameResponseModel(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class GameTitleModel(BaseModel):
+    id: int
+    title: str
+
+
+game_list_adapter = TypeAdapter(list[GameResponseModel])
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class GenreResponseModel(BaseModel):
+    id: int
+    name: str
+    games_count: int
+    average_rating: float | None
@@ -0,0 +1,33 @@
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobStatus(StrEnum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class JobCreateModel(BaseModel):
+    type: str
+    params: dict[str, Any] = {}
+
+
+class JobResponseModel(BaseModel):
+    id: int
+    type: str
+    status: JobStatus
+    params: dict[str, Any]
+    progress: float
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
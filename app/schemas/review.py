@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field, model_validator
+
+
+class ReviewCreateModel(BaseModel):
+    review: str | None = Field(None, max_length=10_000)
+    score: float | None = Field(None, ge=0, le=5)
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "ReviewCreateModel":
+        if self.review is None and self.score is None:
+            raise ValueError("A review needs a text or a score")
+        return self
+
+
+class ReviewBulkItemModel(ReviewCreateModel):
+    game_id: int
+
+
+class ReviewResponseModel(BaseModel):
+    id: int
+    game_id: int
+    review: str | None
+    score: float | None
+
+    class Config:
+        from_attributes = True
+
+
+class ReviewBulkResponseModel(BaseModel):
+    created: int
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class TeamResponseModel(BaseModel):
+    id: int
+    name: str
+    games_count: int
+    average_rating: float | None
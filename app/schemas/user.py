@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class UserResponseModel(BaseModel):
@@ -32,3 +32,19 @@ class UserUpdateModel(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserBulkDeleteModel(BaseModel):
+    user_ids: list[int] | None = Field(None, max_length=100_000)
+    role_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "UserBulkDeleteModel":
+        if self.user_ids is None and self.role_id is None:
+            raise ValueError("Pass user ids or a role to delete by")
+        return self
+
+
+class UserBulkDeleteResponseModel(BaseModel):
+    users: int
+    liked_genres: int
@@ -0,0 +1,14 @@
+import asyncio
+
+from app.db import async_session_maker
+from app.services.similarity import similar_games
+
+
+async def main():
+    async with async_session_maker() as session:
+        count = await similar_games.refresh(session)
+        print(f"Built similar games for {count} games.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+import asyncio
+
+from app.db import async_session_maker
+from app.services.scoring import recompute_game_scores
+
+
+async def main():
+    async with async_session_maker() as session:
+        count = await recompute_game_scores(session)
+        print(f"Scored {count} games.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -86,12 +86,16 @@ async def load_data(session: AsyncSession, csv_path: str):
                 release_date = datetime.strptime(raw_date, "%b %d, %Y").date()
 
             # create game instance
+            rating = float(row.get("Rating") or 0)
+            reviews_number = parse_human_readable_number(row.get("Number of Reviews"))
             game = Game(
                 title=title,
                 release_date=release_date,
-                rating=float(row.get("Rating") or 0),
+                rating=rating,
+                rating_sum=rating * reviews_number,
+                rating_count=reviews_number,
                 times_listed=parse_human_readable_number(row.get("Times Listed")),
-                reviews_number=parse_human_readable_number(row.get("Number of Reviews")),
+                reviews_number=reviews_number,
                 summary=row.get("Summary") or None,
                 plays=parse_human_readable_number(row.get("Plays")),
                 playing=parse_human_readable_number(row.get("Playing")),
@@ -0,0 +1,264 @@
+import asyncio
+import fcntl
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from sqlalchemy import Integer, bindparam, column, func, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game
+from app.schemas.game import GameCounter
+from app.settings import settings
+from app.utils.cache import INVALIDATES_OPTION
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = tuple(counter.value for counter in GameCounter)
+JOURNAL_PREFIX = "activity-"
+
+
+class ActivityBuffer:
+    """Merges counter increments per game in memory and writes them with one batched UPDATE per flush.
+
+    Every event is appended to a per-process journal before it is acknowledged. The write goes to the page cache,
+    so counts survive a crash of the process; a crash of the machine loses the events since the last flush, the
+    journal is fsynced when a flush rotates it into a segment. Journals of processes that are gone (their ``flock``
+    can be taken) are replayed on startup. Delivery is at least once: a crash between the database commit and the
+    journal cleanup replays that flush.
+
+    Flushes bump no cache version, bumping "games" would drop the leaderboard, the catalog snapshot and every cached
+    list each second. Counters therefore reach cached game lists within ``cache_ttl_seconds`` and the snapshots on
+    their periodic rebuild. A counter never goes below zero, larger decrements stop at it.
+
+    ``record`` may be called from threadpool threads, the flush loop runs on the event loop.
+    """
+
+    def __init__(self, journal_dir: str | None, batch_size: int, max_pending_games: int) -> None:
+        self.journal_dir = Path(journal_dir) if journal_dir else None
+        self.batch_size = batch_size
+        self.max_pending_games = max_pending_games
+        self.pending: defaultdict[int, defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.events = 0
+        self.flushes = 0
+        self.flushed_games = 0
+        self.failures = 0
+        self._journal_fd: int | None = None
+        self._segments: list[Path] = []
+        self._flush_requested = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = asyncio.Lock()
+        # guards pending and the journal between recording threads and the flush
+        self._record_lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "events": self.events,
+            "pending_games": len(self.pending),
+            "flushes": self.flushes,
+            "flushed_games": self.flushed_games,
+            "failures": self.failures,
+        }
+
+    @property
+    def journal_path(self) -> Path:
+        return self.journal_dir / f"{JOURNAL_PREFIX}{os.getpid()}.log"
+
+    def record(self, game_id: int, counter: GameCounter, delta: int) -> None:
+        with self._record_lock:
+            if self.journal_dir is not None:
+                if self._journal_fd is None:
+                    self.open()
+                os.write(self._journal_fd, f"{game_id} {counter.value} {delta}\n".encode())
+            self.pending[game_id][counter.value] += delta
+            self.events += 1
+            full = len(self.pending) >= self.max_pending_games
+        if full:
+            if self._loop is None:
+                self._flush_requested.set()
+            else:
+                self._loop.call_soon_threadsafe(self._flush_requested.set)
+
+    def open(self) -> None:
+        """Start this process's journal, then replay the journals left by dead processes."""
+        if self.journal_dir is None or self._journal_fd is not None:
+            return
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        # locked before recovering, so no other process takes the segments this one claims meanwhile
+        self._journal_fd = self._open_journal()
+        if os.fstat(self._journal_fd).st_size:
+            # left behind by a dead process that had our pid
+            self._replay(self.journal_path)
+            os.close(self._rotate())
+        self._recover()
+
+    def close(self) -> None:
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+
+    def _open_journal(self) -> int:
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def _recover(self) -> None:
+        for journal in sorted(self.journal_dir.glob(f"{JOURNAL_PREFIX}*.log")):
+            if journal == self.journal_path:
+                continue
+            try:
+                file = journal.open("r")
+            except FileNotFoundError:
+                continue  # claimed by another process since the listing
+            with file:
+                try:
+                    fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # the owner is alive, or another process is recovering it
+                if not self._still_named(file.fileno(), journal):
+                    continue  # recovered and renamed into a segment while we waited for the lock
+                owner = journal.name.removeprefix(JOURNAL_PREFIX).removesuffix(".log")
+                for path in [*sorted(self.journal_dir.glob(f"{JOURNAL_PREFIX}{owner}-*.seg")), journal]:
+                    claimed = self._next_segment()
+                    try:
+                        path.rename(claimed)
+                    except FileNotFoundError:
+                        continue
+                    replayed = self._replay(claimed)
+                    self._segments.append(claimed)
+                    logger.info("Recovered %s activity events from %s", replayed, path.name)
+
+    @staticmethod
+    def _still_named(fd: int, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(fd)
+        return (stat.st_dev, stat.st_ino) == (opened.st_dev, opened.st_ino)
+
+    def _replay(self, path: Path) -> int:
+        count = 0
+        with path.open("r") as file:
+            for line in file:
+                parts = line.split()
+                # a crash can leave a torn last line
+                if len(parts) != 3 or parts[1] not in COUNTERS:
+                    continue
+                try:
+                    game_id, delta = int(parts[0]), int(parts[2])
+                except ValueError:
+                    continue
+                self.pending[game_id][parts[1]] += delta
+                count += 1
+        return count
+
+    def _next_segment(self) -> Path:
+        # unique names, a recovered process may have had this pid and left segments behind
+        return self.journal_dir / f"{JOURNAL_PREFIX}{os.getpid()}-{uuid.uuid4().hex}.seg"
+
+    def _rotate(self) -> int | None:
+        """Move the journal of the events being flushed into a segment and start a new one.
+
+        Returns the descriptor of the rotated journal, still open for the caller to sync and close.
+        """
+        if self._journal_fd is None:
+            return None
+        segment = self._next_segment()
+        self.journal_path.rename(segment)
+        self._segments.append(segment)
+        rotated, self._journal_fd = self._journal_fd, self._open_journal()
+        return rotated
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Write every pending increment, returns the number of games updated."""
+        async with self._lock:
+            # swapping and rotating happen under the record lock, so no event lands between them
+            with self._record_lock:
+                if not self.pending:
+                    return 0
+                batch, self.pending = self.pending, defaultdict(lambda: defaultdict(int))
+                rotated = self._rotate()
+                segments, self._segments = self._segments, []
+
+            rows = [(game_id, *(deltas.get(counter, 0) for counter in COUNTERS)) for game_id, deltas in batch.items()]
+            try:
+                if rotated is not None:
+                    try:
+                        await asyncio.to_thread(os.fsync, rotated)
+                    finally:
+                        os.close(rotated)
+                for start in range(0, len(rows), self.batch_size):
+                    await self._apply(db, rows[start : start + self.batch_size])
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                self.failures += 1
+                with self._record_lock:
+                    for game_id, deltas in batch.items():
+                        for counter, delta in deltas.items():
+                            self.pending[game_id][counter] += delta
+                    self._segments = segments + self._segments
+                raise
+
+            for segment in segments:
+                segment.unlink(missing_ok=True)
+            self.flushes += 1
+            self.flushed_games += len(rows)
+            return len(rows)
+
+    async def _apply(self, db: AsyncSession, rows: list[tuple[int, ...]]) -> None:
+        games = Game.__table__
+        options = {INVALIDATES_OPTION: ()}
+        if db.get_bind().dialect.name == "postgresql":
+            deltas = values(
+                column("id", Integer), *(column(counter, Integer) for counter in COUNTERS), name="deltas"
+            ).data(rows)
+            statement = (
+                update(games)
+                .where(games.c.id == deltas.c.id)
+                .values({counter: func.greatest(games.c[counter] + deltas.c[counter], 0) for counter in COUNTERS})
+            )
+            await db.execute(statement, execution_options=options)
+            return
+
+        # SQLite cannot name the columns of a VALUES list, an executemany of the same statement is its batch
+        statement = (
+            update(games)
+            .where(games.c.id == bindparam("game_id"))
+            # the two-argument max() of SQLite is a scalar function
+            .values({counter: func.max(games.c[counter] + bindparam(f"delta_{counter}"), 0) for counter in COUNTERS})
+        )
+        params = [
+            {"game_id": row[0], **{f"delta_{counter}": delta for counter, delta in zip(COUNTERS, row[1:], strict=True)}}
+            for row in rows
+        ]
+        await db.execute(statement, params, execution_options=options)
+
+    async def run(self, session_maker: sessionmaker, interval: float) -> None:
+        """Flush every ``interval`` seconds, or as soon as ``max_pending_games`` games have pending deltas."""
+        self._loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=interval)
+            except TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                async with session_maker() as db:
+                    await self.flush(db)
+            except Exception:
+                logger.exception("Activity flush failed")
+
+
+activity_buffer = ActivityBuffer(
+    journal_dir=settings.activity_journal_dir,
+    batch_size=settings.activity_flush_batch_size,
+    max_pending_games=settings.activity_max_pending_games,
+)
+metrics.register("activity", activity_buffer.stats)
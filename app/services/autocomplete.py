@@ -0,0 +1,147 @@
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game
+from app.schemas.game import GameTitleModel
+from app.utils.cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+TITLE_TABLES = ("games",)
+# keys are truncated, longer queries are checked against the full title
+KEY_LENGTH = 32
+MAX_KEY = "\U0010ffff"
+CACHED_QUERY_LENGTH = 2
+CACHED_QUERIES = 4096
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.lower().split())
+
+
+def ranking_columns():
+    """Suggestions rank like ``/games?sort=score``, by score and then by rating where scores tie."""
+    return Game.score, Game.rating
+
+
+@dataclass(frozen=True)
+class TitleIndex:
+    """Sorted word suffixes of every title, a query is a binary search for the range of keys it prefixes.
+
+    ``rows[i]`` is the game behind ``keys[i]`` and ``starts[i]`` whether the key is the start of the title.
+    """
+
+    version: tuple[int, ...]
+    built_at: float
+    game_ids: np.ndarray
+    titles: list[str]
+    normalized: list[str]
+    scores: np.ndarray
+    ratings: np.ndarray
+    keys: list[str]
+    rows: np.ndarray
+    starts: np.ndarray
+    # results of the short queries, whose key ranges are the widest
+    _cached: dict[tuple[str, int], list[GameTitleModel]] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(cls, version: tuple[int, ...], games: list[tuple[int, str, float, float]]) -> "TitleIndex":
+        """``games`` are ``(id, title, score, rating)`` rows."""
+        entries = []
+        normalized = []
+        for row, (_, title, _, _) in enumerate(games):
+            text = normalize_title(title)
+            normalized.append(text)
+            position = 0
+            for word in text.split(" "):
+                entries.append((text[position : position + KEY_LENGTH], row, position == 0))
+                position += len(word) + 1
+        entries.sort()
+        return cls(
+            version=version,
+            built_at=time.monotonic(),
+            game_ids=np.array([game[0] for game in games], dtype=np.int64),
+            titles=[game[1] for game in games],
+            normalized=normalized,
+            scores=np.array([game[2] for game in games], dtype=np.float64),
+            ratings=np.array([game[3] for game in games], dtype=np.float64),
+            keys=[key for key, _, _ in entries],
+            rows=np.array([row for _, row, _ in entries], dtype=np.int64),
+            starts=np.array([start for _, _, start in entries], dtype=bool),
+        )
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def search(self, query: str, limit: int) -> list[GameTitleModel]:
+        """Titles with a word starting with ``query``, title prefixes first, then by score and rating."""
+        query = normalize_title(query)
+        if not query:
+            return []
+        if len(query) <= CACHED_QUERY_LENGTH and (cached := self._cached.get((query, limit))) is not None:
+            return cached
+
+        key = query[:KEY_LENGTH]
+        low = bisect.bisect_left(self.keys, key)
+        high = bisect.bisect_right(self.keys, key + MAX_KEY, lo=low)
+        rows, starts = self.rows[low:high], self.starts[low:high]
+        order = np.lexsort((rows, -self.ratings[rows], -self.scores[rows], ~starts))
+
+        results = []
+        seen = set()
+        for row in rows[order].tolist():
+            if row in seen or (len(query) > KEY_LENGTH and query not in self.normalized[row]):
+                continue
+            seen.add(row)
+            results.append(GameTitleModel(id=int(self.game_ids[row]), title=self.titles[row]))
+            if len(results) == limit:
+                break
+
+        if len(query) <= CACHED_QUERY_LENGTH and len(self._cached) < CACHED_QUERIES:
+            self._cached[(query, limit)] = results
+        return results
+
+
+class TitleIndexService:
+    def __init__(self) -> None:
+        self.index: TitleIndex | None = None
+
+    def current(self) -> TitleIndex | None:
+        """The index if it matches the catalog, score and rating writes move its version."""
+        index = self.index
+        if index is None or index.version != query_cache.versions(TITLE_TABLES):
+            return None
+        return index
+
+    async def rebuild(self, db: AsyncSession) -> TitleIndex:
+        version = query_cache.versions(TITLE_TABLES)
+        statement = select(Game.id, Game.title, *ranking_columns()).order_by(Game.id)
+        rows = [tuple(row) for row in (await db.execute(statement)).all()]
+        # sorting the keys is the bulk of the work, keep it off the event loop
+        index = await asyncio.to_thread(TitleIndex.build, version, rows)
+        self.index = index
+        return index
+
+    async def run(self, session_maker: sessionmaker, interval: float, poll_interval: float) -> None:
+        """Rebuild every ``interval`` seconds, or sooner once the catalog version changes."""
+        while True:
+            index = self.index
+            expired = index is None or time.monotonic() - index.built_at >= interval
+            if expired or index.version != query_cache.versions(TITLE_TABLES):
+                try:
+                    async with session_maker() as db:
+                        await self.rebuild(db)
+                except Exception:
+                    logger.exception("Title index rebuild failed")
+            await asyncio.sleep(poll_interval)
+
+
+title_index = TitleIndexService()
@@ -0,0 +1,374 @@
+"""Read-only catalog snapshot shared between worker processes through ``mmap``.
+
+File layout: an 8 byte magic, a little-endian u64 header length, a JSON header with the build time and the
+offset/count of every section, then 8 byte aligned sections. Games are fixed-width records ordered by
+``(rating desc, id)`` so a row number is also the rating rank; strings live in offset/data tables and the
+game->genre, game->team, game->review and genre->game relations are CSR ``indptr``/``indices`` pairs.
+"""
+
+import asyncio
+import datetime
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game, GameGenre, GameTeam, Genre, Review, Team
+from app.schemas.game import GameResponseModel, GameSortField
+from app.services.game import GAME_TABLES
+from app.settings import settings
+from app.utils.cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IGCAT\x00\x00\x01"
+ALIGNMENT = 8
+
+GAME_RECORD = np.dtype([
+    ("id", "<i4"),
+    ("release_date", "<i4"),  # proleptic Gregorian ordinal, 0 when unknown
+    ("rating", "<f8"),
+    ("score", "<f8"),
+    ("times_listed", "<i4"),
+    ("reviews_number", "<i4"),
+    ("plays", "<i4"),
+    ("playing", "<i4"),
+    ("backlogs", "<i4"),
+    ("whitelist", "<i4"),
+    ("has_summary", "u1"),
+])
+COUNTERS = ("times_listed", "reviews_number", "plays", "playing", "backlogs", "whitelist")
+
+SECTIONS = {
+    "games": GAME_RECORD,
+    "id_order": np.dtype("<i4"),
+    "score_order": np.dtype("<i4"),
+    "score_rank": np.dtype("<i4"),
+    "title_offsets": np.dtype("<u8"),
+    "title_data": np.dtype("u1"),
+    "summary_offsets": np.dtype("<u8"),
+    "summary_data": np.dtype("u1"),
+    "genre_ids": np.dtype("<i4"),
+    "genre_name_offsets": np.dtype("<u8"),
+    "genre_name_data": np.dtype("u1"),
+    "team_name_offsets": np.dtype("<u8"),
+    "team_name_data": np.dtype("u1"),
+    "review_offsets": np.dtype("<u8"),
+    "review_data": np.dtype("u1"),
+    "game_genre_indptr": np.dtype("<i8"),
+    "game_genre_indices": np.dtype("<i4"),
+    "game_team_indptr": np.dtype("<i8"),
+    "game_team_indices": np.dtype("<i4"),
+    "game_review_indptr": np.dtype("<i8"),
+    "genre_game_indptr": np.dtype("<i8"),
+    "genre_game_rows": np.dtype("<i4"),
+}
+
+
+def _pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _indptr(groups: list[list]) -> np.ndarray:
+    indptr = np.zeros(len(groups) + 1, dtype=np.int64)
+    np.cumsum([len(group) for group in groups], out=indptr[1:])
+    return indptr
+
+
+def _csr(groups: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    indptr = _indptr(groups)
+    indices = np.fromiter((item for group in groups for item in group), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+async def build_catalog_arrays(db: AsyncSession) -> dict[str, np.ndarray]:
+    games = (
+        await db.execute(
+            select(
+                Game.id,
+                Game.release_date,
+                Game.rating,
+                Game.score,
+                *(getattr(Game, counter) for counter in COUNTERS),
+                Game.title,
+                Game.summary,
+            ).order_by(Game.rating.desc(), Game.id)
+        )
+    ).all()
+    genres = (await db.execute(select(Genre.id, Genre.name).order_by(Genre.id))).all()
+    teams = (await db.execute(select(Team.id, Team.name).order_by(Team.id))).all()
+
+    records = np.zeros(len(games), dtype=GAME_RECORD)
+    records["id"] = [game.id for game in games]
+    records["release_date"] = [game.release_date.toordinal() if game.release_date else 0 for game in games]
+    records["rating"] = [game.rating for game in games]
+    records["score"] = [game.score for game in games]
+    for counter in COUNTERS:
+        records[counter] = [getattr(game, counter) for game in games]
+    records["has_summary"] = [game.summary is not None for game in games]
+
+    row_of = {game.id: row for row, game in enumerate(games)}
+    genre_index = {genre_id: index for index, (genre_id, _) in enumerate(genres)}
+    team_index = {team_id: index for index, (team_id, _) in enumerate(teams)}
+
+    game_genres: list[list[int]] = [[] for _ in games]
+    genre_games: list[list[int]] = [[] for _ in genres]
+    for game_id, genre_id in await db.execute(select(GameGenre.game_id, GameGenre.genre_id).order_by(GameGenre.id)):
+        game_genres[row_of[game_id]].append(genre_index[genre_id])
+        genre_games[genre_index[genre_id]].append(row_of[game_id])
+    game_teams: list[list[int]] = [[] for _ in games]
+    for game_id, team_id in await db.execute(select(GameTeam.game_id, GameTeam.team_id).order_by(GameTeam.id)):
+        game_teams[row_of[game_id]].append(team_index[team_id])
+    reviews_by_row: dict[int, list[str]] = defaultdict(list)
+    review_rows = select(Review.game_id, Review.review).where(Review.review.is_not(None)).order_by(Review.id)
+    for game_id, review in await db.execute(review_rows):
+        reviews_by_row[row_of[game_id]].append(review)
+
+    arrays = {"games": records}
+    arrays["id_order"] = np.argsort(records["id"], kind="stable").astype(np.int32)
+    score_order = np.lexsort((records["id"], -records["score"])).astype(np.int32)
+    arrays["score_order"] = score_order
+    arrays["score_rank"] = np.empty(len(games), dtype=np.int32)
+    arrays["score_rank"][score_order] = np.arange(len(games), dtype=np.int32)
+    arrays["title_offsets"], arrays["title_data"] = _pack_strings([game.title for game in games])
+    arrays["summary_offsets"], arrays["summary_data"] = _pack_strings([game.summary or "" for game in games])
+    arrays["genre_ids"] = np.array([genre_id for genre_id, _ in genres], dtype=np.int32)
+    arrays["genre_name_offsets"], arrays["genre_name_data"] = _pack_strings([name for _, name in genres])
+    arrays["team_name_offsets"], arrays["team_name_data"] = _pack_strings([name for _, name in teams])
+    arrays["game_genre_indptr"], arrays["game_genre_indices"] = _csr(game_genres)
+    arrays["game_team_indptr"], arrays["game_team_indices"] = _csr(game_teams)
+    review_groups = [reviews_by_row.get(row, []) for row in range(len(games))]
+    arrays["game_review_indptr"] = _indptr(review_groups)
+    arrays["review_offsets"], arrays["review_data"] = _pack_strings([text for group in review_groups for text in group])
+    # rows are rating ranks, so a sorted genre list is that genre's ranking
+    arrays["genre_game_indptr"], arrays["genre_game_rows"] = _csr([sorted(rows) for rows in genre_games])
+    return arrays
+
+
+def write_catalog_file(path: Path, arrays: dict[str, np.ndarray], built_at: float) -> None:
+    """Write to a temporary file next to ``path`` and rename it over, readers see the old or the new file."""
+    sections = {}
+    offset = 0
+    for name in SECTIONS:
+        sections[name] = {"offset": offset, "count": len(arrays[name])}
+        offset += -(-arrays[name].nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({"format": 1, "built_at": built_at, "sections": sections}).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            file.write(b"\x00" * (data_start - file.tell()))
+            for name, section in sections.items():
+                file.seek(data_start + section["offset"])
+                file.write(arrays[name].tobytes())
+            file.truncate(data_start + offset)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    inode: int
+    modified_ns: int
+    size: int
+
+    @classmethod
+    def of(cls, path: Path) -> "FileIdentity | None":
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return cls(stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class CatalogSnapshot:
+    """Zero-copy view of a catalog file, every array is a numpy view over the shared mapping."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as file:
+            self.identity = FileIdentity.of(path)
+            self._mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapping[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_length,) = struct.unpack_from("<Q", self._mapping, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mapping[header_start : header_start + header_length])
+        data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+
+        self.built_at = header["built_at"]
+        for name, dtype in SECTIONS.items():
+            section = header["sections"][name]
+            view = np.frombuffer(self._mapping, dtype, section["count"], data_start + section["offset"])
+            setattr(self, name, view)
+        self._genre_index = {int(genre_id): index for index, genre_id in enumerate(self.genre_ids)}
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def _string(self, offsets: np.ndarray, data: np.ndarray, index: int) -> str:
+        return data[offsets[index] : offsets[index + 1]].tobytes().decode()
+
+    def game(self, row: int) -> GameResponseModel:
+        record = self.games[row]
+        genres = self.game_genre_indices[self.game_genre_indptr[row] : self.game_genre_indptr[row + 1]]
+        teams = self.game_team_indices[self.game_team_indptr[row] : self.game_team_indptr[row + 1]]
+        reviews = range(self.game_review_indptr[row], self.game_review_indptr[row + 1])
+        return GameResponseModel(
+            id=int(record["id"]),
+            title=self._string(self.title_offsets, self.title_data, row),
+            release_date=datetime.date.fromordinal(record["release_date"]) if record["release_date"] else None,
+            rating=float(record["rating"]),
+            summary=self._string(self.summary_offsets, self.summary_data, row) if record["has_summary"] else None,
+            **{counter: int(record[counter]) for counter in COUNTERS},
+            game_teams=[self._string(self.team_name_offsets, self.team_name_data, team) for team in teams],
+            game_genres=[self._string(self.genre_name_offsets, self.genre_name_data, genre) for genre in genres],
+            game_reviews=[self._string(self.review_offsets, self.review_data, review) for review in reviews],
+        )
+
+    def top(self, limit: int, offset: int, sort: GameSortField) -> list[GameResponseModel]:
+        rows = range(offset, min(offset + limit, len(self)))
+        if sort == GameSortField.score:
+            rows = self.score_order[offset : offset + limit]
+        return [self.game(int(row)) for row in rows]
+
+    def genre_rows(self, genre_ids: list[int], sort: GameSortField) -> np.ndarray:
+        """Rows of every game in any of ``genre_ids``, in ``sort`` order."""
+        indices = [self._genre_index[genre_id] for genre_id in set(genre_ids) if genre_id in self._genre_index]
+        lists = [
+            self.genre_game_rows[self.genre_game_indptr[index] : self.genre_game_indptr[index + 1]] for index in indices
+        ]
+        rows = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int32)
+        if sort == GameSortField.score:
+            rows = rows[np.argsort(self.score_rank[rows], kind="stable")]
+        return rows
+
+    def top_for_genres(
+        self, genre_ids: list[int], limit: int, offset: int, sort: GameSortField
+    ) -> list[GameResponseModel]:
+        return [self.game(int(row)) for row in self.genre_rows(genre_ids, sort)[offset : offset + limit]]
+
+    def games_by_ids(self, game_ids: list[int]) -> list[GameResponseModel]:
+        ids = self.games["id"][self.id_order]
+        positions = np.searchsorted(ids, game_ids)
+        return [
+            self.game(int(self.id_order[position]))
+            for game_id, position in zip(game_ids, positions, strict=True)
+            if position < len(ids) and ids[position] == game_id
+        ]
+
+
+class CatalogSnapshotService:
+    """Keeps the newest catalog file mapped and, in whichever worker holds the lock, rebuilds it when stale.
+
+    A snapshot is served only if it was built after the last catalog write this process has seen; with the redis
+    cache backend the table versions are shared, so every worker sees every write.
+    """
+
+    def __init__(self, path: str | None, check_interval: float) -> None:
+        self.path = Path(path) if path else None
+        self.check_interval = check_interval
+        self.snapshot: CatalogSnapshot | None = None
+        self._checked_at = 0.0
+        self._versions = query_cache.versions(GAME_TABLES)
+        # a file left by a previous run may predate changes made while nothing was watching
+        self._changed_at = time.time()
+
+    def current(self) -> CatalogSnapshot | None:
+        """The mapped snapshot if it is newer than the last catalog write, remapping when a new file appears."""
+        if self.path is None:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._reload()
+        snapshot = self.snapshot
+        if snapshot is None or self._is_stale(snapshot):
+            return None
+        return snapshot
+
+    def _observe_writes(self) -> None:
+        versions = query_cache.versions(GAME_TABLES)
+        if versions != self._versions:
+            self._versions = versions
+            self._changed_at = time.time()
+
+    def _is_stale(self, snapshot: CatalogSnapshot) -> bool:
+        self._observe_writes()
+        return snapshot.built_at < self._changed_at
+
+    def _reload(self) -> None:
+        identity = FileIdentity.of(self.path)
+        if identity is None or (self.snapshot is not None and self.snapshot.identity == identity):
+            return
+        try:
+            # the old mapping is released once the last request holding its arrays is done
+            self.snapshot = CatalogSnapshot(self.path)
+        except (OSError, ValueError):
+            logger.exception("Catalog snapshot %s could not be mapped", self.path)
+
+    async def rebuild(
+        self, db: AsyncSession, progress: Callable[[float], Awaitable[None]] | None = None
+    ) -> CatalogSnapshot:
+        self._observe_writes()
+        built_at = time.time()
+        arrays = await build_catalog_arrays(db)
+        if progress is not None:
+            await progress(0.5)
+        await asyncio.to_thread(write_catalog_file, self.path, arrays, built_at)
+        self._reload()
+        return self.snapshot
+
+    def _needs_rebuild(self, interval: float) -> bool:
+        self._reload()
+        snapshot = self.snapshot
+        return snapshot is None or time.time() - snapshot.built_at >= interval or self._is_stale(snapshot)
+
+    async def run(self, session_maker: sessionmaker, interval: float, poll_interval: float) -> None:
+        """Rebuild when the file is missing, older than ``interval`` or older than the last catalog write.
+
+        Every worker runs this loop, an exclusive ``flock`` makes sure only one of them writes at a time.
+        """
+        lock_path = self.path.with_name(f".{self.path.name}.lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            if self._needs_rebuild(interval):
+                with lock_path.open("a") as lock:
+                    try:
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        pass
+                    else:
+                        try:
+                            # another worker may have written a fresh file while this one waited for the lock
+                            if self._needs_rebuild(interval):
+                                async with session_maker() as db:
+                                    await self.rebuild(db)
+                        except Exception:
+                            logger.exception("Catalog snapshot rebuild failed")
+            await asyncio.sleep(poll_interval)
+
+
+catalog_snapshot = CatalogSnapshotService(settings.catalog_snapshot_path, settings.catalog_snapshot_check_seconds)
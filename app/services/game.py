@@ -1,46 +1,221 @@
-from collections.abc import Sequence
+import json
+from collections.abc import Callable
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Select, bindparam, func, or_, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models import Game, GameGenre, GameTeam
+from app.models import Game, GameGenre, GameTeam, Genre, Review, SimilarGame, Team
+from app.schemas.game import GameResponseModel, GameSortField, GameTitleModel, game_list_adapter
+from app.services.autocomplete import normalize_title, ranking_columns
+from app.settings import settings
+from app.utils.cache import cached
+from app.utils.singleflight import game_list_flight, recommendations_flight
+from app.utils.tracing import trace_methods
 
+GAME_TABLES = ("games", "game_genres", "genres", "game_teams", "teams", "reviews")
+GAME_CARD_LISTS = ("game_genres", "game_teams", "game_reviews")
+GAME_CARD_FIELDS = tuple(name for name in GameResponseModel.model_fields if name not in GAME_CARD_LISTS)
 
+# built once and executed with bound parameters, so SQLAlchemy reuses their compiled form and asyncpg the
+# prepared statement
+COUNT_GAMES = select(func.count(Game.id))
+ESTIMATE_GAME_COUNT = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'games'::regclass")
+COUNT_GAMES_IN_GENRES = select(func.count(GameGenre.game_id.distinct())).where(
+    GameGenre.genre_id.in_(bindparam("genre_ids", expanding=True))
+)
+GENRE_GAME_COUNTS = select(GameGenre.genre_id, func.count()).group_by(GameGenre.genre_id)
+IN_GENRES = (
+    select(GameGenre.id)
+    .where(GameGenre.game_id == Game.id, GameGenre.genre_id.in_(bindparam("genre_ids", expanding=True)))
+    .exists()
+)
+GAME_EXISTS = select(Game.id).where(Game.id == bindparam("game_id"))
+AUTOCOMPLETE_TITLE = func.lower(Game.title)
+AUTOCOMPLETE_TITLE_PREFIX = AUTOCOMPLETE_TITLE.like(bindparam("title_prefix"), escape="\\")
+AUTOCOMPLETE_WORD_PREFIX = AUTOCOMPLETE_TITLE.like(bindparam("word_prefix"), escape="\\")
+AUTOCOMPLETE_TITLES = (
+    select(Game.id, Game.title)
+    .where(or_(AUTOCOMPLETE_TITLE_PREFIX, AUTOCOMPLETE_WORD_PREFIX))
+    .order_by(AUTOCOMPLETE_TITLE_PREFIX.desc(), *(column.desc() for column in ranking_columns()), Game.id)
+    .limit(bindparam("limit"))
+)
+
+_game_card_statements: dict[tuple, Select] = {}
+
+
+def _aggregate(dialect_name: str, value: ColumnElement, order_by: ColumnElement) -> ColumnElement:
+    if dialect_name == "postgresql":
+        return func.array_agg(aggregate_order_by(value, order_by))
+    # SQLite has no arrays, a JSON array keeps names containing any separator intact
+    return func.json_group_array(value)
+
+
+def game_card_columns(dialect_name: str) -> list[ColumnElement]:
+    """The response columns of a game, with its genre, team and review lists aggregated by correlated subqueries."""
+    genres = (
+        select(_aggregate(dialect_name, Genre.name, GameGenre.id))
+        .select_from(GameGenre)
+        .join(Genre, Genre.id == GameGenre.genre_id)
+        .where(GameGenre.game_id == Game.id)
+        .scalar_subquery()
+    )
+    teams = (
+        select(_aggregate(dialect_name, Team.name, GameTeam.id))
+        .select_from(GameTeam)
+        .join(Team, Team.id == GameTeam.team_id)
+        .where(GameTeam.game_id == Game.id)
+        .scalar_subquery()
+    )
+    reviews = (
+        select(_aggregate(dialect_name, Review.review, Review.id))
+        .where(Review.game_id == Game.id, Review.review.is_not(None))
+        .scalar_subquery()
+    )
+    return [
+        *(getattr(Game, name) for name in GAME_CARD_FIELDS),
+        genres.label("game_genres"),
+        teams.label("game_teams"),
+        reviews.label("game_reviews"),
+    ]
+
+
+def select_game_cards(db: AsyncSession) -> Select:
+    """The base statement of the list reads, filter and order it and pass it to ``fetch_game_cards``."""
+    if settings.games_core_read_path:
+        return select(*game_card_columns(db.get_bind().dialect.name))
+    return select(Game).options(
+        selectinload(Game.genres).selectinload(GameGenre.genre),
+        selectinload(Game.teams).selectinload(GameTeam.team),
+        selectinload(Game.reviews),
+    )
+
+
+def game_card_statement(db: AsyncSession, key: tuple, build: Callable[[Select], Select]) -> Select:
+    """The statement ``build`` makes from ``select_game_cards``, built once per key, dialect and read path.
+
+    Values must go in as ``bindparam``s, the statement is shared by every call with the same key.
+    """
+    key = (*key, db.get_bind().dialect.name, settings.games_core_read_path)
+    statement = _game_card_statements.get(key)
+    if statement is None:
+        statement = _game_card_statements[key] = build(select_game_cards(db))
+    return statement
+
+
+async def fetch_game_cards(db: AsyncSession, statement: Select, params: dict | None = None) -> list[GameResponseModel]:
+    result = await db.execute(statement, params)
+    if not settings.games_core_read_path:
+        return [GameResponseModel.model_validate(game) for game in result.scalars().all()]
+
+    rows = []
+    for row in result.mappings():
+        row = dict(row)
+        for name in GAME_CARD_LISTS:
+            names = row[name]
+            row[name] = json.loads(names) if isinstance(names, str) else names or []
+        rows.append(row)
+    return game_list_adapter.validate_python(rows)
+
+
+@trace_methods
 class GameService:
-    async def get_games(self, db: AsyncSession, limit: int, offset: int) -> Sequence[Game]:
-        statement = (
-            select(Game)
-            .options(
-                selectinload(Game.genres).selectinload(GameGenre.genre),
-                selectinload(Game.teams).selectinload(GameTeam.team),
-                selectinload(Game.reviews),
-            )
-            .limit(limit)
-            .offset(offset)
+    @cached(*GAME_TABLES)
+    @game_list_flight.coalesce
+    async def get_games(
+        self, db: AsyncSession, limit: int, offset: int, sort: GameSortField = GameSortField.rating
+    ) -> list[GameResponseModel]:
+        statement = game_card_statement(
+            db,
+            ("page", sort),
+            lambda cards: (
+                cards.order_by(getattr(Game, sort.value).desc(), Game.id)
+                .limit(bindparam("limit"))
+                .offset(bindparam("offset"))
+            ),
         )
+        return await fetch_game_cards(db, statement, {"limit": limit, "offset": offset})
 
-        result = await db.execute(statement)
-        games = result.scalars().all()
-        return games
-
+    @cached(*GAME_TABLES)
+    @recommendations_flight.coalesce
     async def get_games_by_genre_ids(
-        self, genre_ids: list[int], db: AsyncSession, limit: int, offset: int
-    ) -> Sequence[Game]:
-        statement = (
-            select(Game)
-            .join(GameGenre, GameGenre.game_id == Game.id)
-            .where(GameGenre.genre_id.in_(genre_ids))
-            .options(
-                selectinload(Game.genres).selectinload(GameGenre.genre),
-                selectinload(Game.teams).selectinload(GameTeam.team),
-                selectinload(Game.reviews),
-            )
-            .distinct()
-            .order_by(Game.rating.desc())
-            .limit(limit)
-            .offset(offset)
+        self,
+        genre_ids: list[int],
+        db: AsyncSession,
+        limit: int,
+        offset: int,
+        sort: GameSortField = GameSortField.rating,
+    ) -> list[GameResponseModel]:
+        statement = game_card_statement(
+            db,
+            ("genre_page", sort),
+            lambda cards: (
+                cards.where(IN_GENRES)
+                .order_by(getattr(Game, sort.value).desc(), Game.id)
+                .limit(bindparam("limit"))
+                .offset(bindparam("offset"))
+            ),
+        )
+        return await fetch_game_cards(db, statement, {"genre_ids": genre_ids, "limit": limit, "offset": offset})
+
+    @cached(*GAME_TABLES)
+    async def get_games_by_ids(self, game_ids: list[int], db: AsyncSession) -> list[GameResponseModel]:
+        """Games in the order of ``game_ids``, ids that no longer exist are skipped."""
+        if not game_ids:
+            return []
+        statement = game_card_statement(
+            db, ("by_ids",), lambda cards: cards.where(Game.id.in_(bindparam("game_ids", expanding=True)))
+        )
+        games = {game.id: game for game in await fetch_game_cards(db, statement, {"game_ids": game_ids})}
+        return [games[game_id] for game_id in game_ids if game_id in games]
+
+    @cached("similar_games", *GAME_TABLES)
+    async def get_similar_games(self, game_id: int, db: AsyncSession, limit: int) -> list[GameResponseModel]:
+        statement = game_card_statement(
+            db,
+            ("similar",),
+            lambda cards: (
+                cards.join(SimilarGame, SimilarGame.similar_game_id == Game.id)
+                .where(SimilarGame.game_id == bindparam("game_id"))
+                .order_by(SimilarGame.rank)
+                .limit(bindparam("limit"))
+            ),
         )
-        result = await db.execute(statement)
-        games = result.scalars().all()
-        return games
+        return await fetch_game_cards(db, statement, {"game_id": game_id, "limit": limit})
+
+    @cached("games")
+    async def autocomplete_titles(self, query: str, db: AsyncSession, limit: int) -> list[GameTitleModel]:
+        """Titles with a word starting with ``query``, served by the trigram and prefix indexes on PostgreSQL."""
+        query = normalize_title(query)
+        if not query:
+            return []
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params = {"title_prefix": f"{pattern}%", "word_prefix": f"% {pattern}%", "limit": limit}
+        rows = (await db.execute(AUTOCOMPLETE_TITLES, params)).all()
+        return [GameTitleModel(id=game_id, title=title) for game_id, title in rows]
+
+    @cached("games")
+    async def count_games(self, db: AsyncSession) -> int:
+        return (await db.execute(COUNT_GAMES)).scalar_one()
+
+    @cached("games")
+    async def estimate_game_count(self, db: AsyncSession) -> int:
+        """Planner row estimate on PostgreSQL, an exact count elsewhere or before the table was first analyzed."""
+        if db.get_bind().dialect.name == "postgresql":
+            estimate = (await db.execute(ESTIMATE_GAME_COUNT)).scalar_one_or_none()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        return await self.count_games(db)
+
+    @cached("game_genres")
+    async def count_games_in_genres(self, genre_ids: list[int], db: AsyncSession) -> int:
+        return (await db.execute(COUNT_GAMES_IN_GENRES, {"genre_ids": genre_ids})).scalar_one()
+
+    @cached("game_genres")
+    async def get_genre_game_counts(self, db: AsyncSession) -> dict[int, int]:
+        return dict((await db.execute(GENRE_GAME_COUNTS)).all())
+
+    async def game_exists(self, game_id: int, db: AsyncSession) -> bool:
+        result = await db.execute(GAME_EXISTS, {"game_id": game_id})
+        return result.scalar_one_or_none() is not None
@@ -0,0 +1,34 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.models import Game
+
+
+async def fetch_group_stats(
+    db: AsyncSession, entity: type, link: type, link_column: InstrumentedAttribute
+) -> list[tuple[int, str, int, float | None]]:
+    """Every genre or team by name, with the number of its games and their average rating."""
+    statement = (
+        select(entity.id, entity.name, func.count(Game.id), func.avg(Game.rating))
+        .outerjoin(link, link_column == entity.id)
+        .outerjoin(Game, Game.id == link.game_id)
+        .group_by(entity.id, entity.name)
+        .order_by(entity.name)
+    )
+    return [tuple(row) for row in (await db.execute(statement)).all()]
+
+
+async def fetch_group_game_ids(
+    db: AsyncSession, link: type, link_column: InstrumentedAttribute, group_id: int, limit: int, after: int | None
+) -> list[int]:
+    """Keyset page of the games of a genre or team, read from the ``(group_id, game_id)`` index alone."""
+    statement = select(link.game_id).where(link_column == group_id).order_by(link.game_id).limit(limit)
+    if after is not None:
+        statement = statement.where(link.game_id > after)
+    return list((await db.execute(statement)).scalars().all())
+
+
+async def group_exists(db: AsyncSession, entity: type, group_id: int) -> bool:
+    result = await db.execute(select(entity.id).where(entity.id == group_id))
+    return result.scalar_one_or_none() is not None
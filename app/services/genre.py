@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import GameGenre, Genre
+from app.schemas.genre import GenreResponseModel
+from app.services.game_group import fetch_group_game_ids, fetch_group_stats, group_exists
+from app.utils.cache import cached
+
+
+class GenreService:
+    @cached("genres", "game_genres", "games")
+    async def get_genres(self, db: AsyncSession) -> list[GenreResponseModel]:
+        rows = await fetch_group_stats(db, Genre, GameGenre, GameGenre.genre_id)
+        return [
+            GenreResponseModel(id=genre_id, name=name, games_count=count, average_rating=average)
+            for genre_id, name, count, average in rows
+        ]
+
+    @cached("game_genres")
+    async def get_genre_game_ids(self, genre_id: int, db: AsyncSession, limit: int, after: int | None) -> list[int]:
+        return await fetch_group_game_ids(db, GameGenre, GameGenre.genre_id, genre_id, limit, after)
+
+    @cached("genres")
+    async def genre_exists(self, genre_id: int, db: AsyncSession) -> bool:
+        return await group_exists(db, Genre, genre_id)
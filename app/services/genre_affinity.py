@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game, GameGenre, Genre
+from app.schemas.game import GameSortField
+from app.utils.cache import query_cache
+
+logger = logging.getLogger(__name__)
+
+AFFINITY_TABLES = ("games", "game_genres", "genres")
+
+
+@dataclass(frozen=True)
+class GenreAffinityModel:
+    """Game x genre bitmap of the catalog and the genre co-occurrence matrix derived from it.
+
+    ``cooccurrence[i, j]`` is the share of games in genre ``i`` that are also in genre ``j``.
+    """
+
+    version: tuple[int, ...]
+    built_at: float
+    game_ids: np.ndarray
+    genre_ids: np.ndarray
+    sort_keys: dict[GameSortField, np.ndarray]
+    bitmap: np.ndarray
+    cooccurrence: np.ndarray
+
+    def genre_weights(self, liked_genre_ids: list[int], expansion_weight: float) -> np.ndarray:
+        """The user's genre vector plus ``expansion_weight`` times the genres that co-occur with it."""
+        liked = np.isin(self.genre_ids, liked_genre_ids).astype(np.float32)
+        related = liked @ self.cooccurrence / max(liked.sum(), 1)
+        related[liked > 0] = 0
+        return liked + expansion_weight * related
+
+    def rank(self, liked_genre_ids: list[int], sort: GameSortField, expansion_weight: float) -> np.ndarray:
+        """Ids of every game sharing a weighted genre, by overlap and then by the sort field."""
+        if not len(self.genre_ids):
+            return np.empty(0, dtype=np.int64)
+        scores = self.bitmap @ self.genre_weights(liked_genre_ids, expansion_weight)
+        candidates = np.flatnonzero(scores > 0)
+        order = np.lexsort((self.game_ids[candidates], -self.sort_keys[sort][candidates], -scores[candidates]))
+        return self.game_ids[candidates[order]]
+
+    def recommend(
+        self, liked_genre_ids: list[int], limit: int, offset: int, sort: GameSortField, expansion_weight: float
+    ) -> tuple[list[int], int]:
+        """One page of ``rank`` and the number of ranked games."""
+        ranked = self.rank(liked_genre_ids, sort, expansion_weight)
+        return ranked[offset : offset + limit].tolist(), len(ranked)
+
+
+def build_genre_affinity_model(
+    version: tuple[int, ...], games: np.ndarray, genre_ids: np.ndarray, links: np.ndarray
+) -> GenreAffinityModel:
+    game_ids = games[:, 0].astype(np.int64)
+    bitmap = np.zeros((len(game_ids), len(genre_ids)), dtype=np.float32)
+    bitmap[np.searchsorted(game_ids, links[:, 0]), np.searchsorted(genre_ids, links[:, 1])] = 1
+
+    counts = bitmap.T @ bitmap
+    cooccurrence = counts / np.maximum(np.diag(counts), 1)[:, np.newaxis]
+    np.fill_diagonal(cooccurrence, 0)
+
+    return GenreAffinityModel(
+        version=version,
+        built_at=time.monotonic(),
+        game_ids=game_ids,
+        genre_ids=genre_ids,
+        sort_keys={GameSortField.rating: games[:, 1], GameSortField.score: games[:, 2]},
+        bitmap=bitmap,
+        cooccurrence=cooccurrence.astype(np.float32),
+    )
+
+
+class GenreAffinityService:
+    def __init__(self) -> None:
+        self.model: GenreAffinityModel | None = None
+
+    def current(self) -> GenreAffinityModel | None:
+        """The model if it still matches the catalog, readers never wait for a rebuild."""
+        model = self.model
+        if model is None or model.version != query_cache.versions(AFFINITY_TABLES):
+            return None
+        return model
+
+    async def rebuild(
+        self, db: AsyncSession, progress: Callable[[float], Awaitable[None]] | None = None
+    ) -> GenreAffinityModel:
+        """Load the catalog's genre links and build the model from them in a worker thread."""
+        version = query_cache.versions(AFFINITY_TABLES)
+
+        games = np.array(
+            (await db.execute(select(Game.id, Game.rating, Game.score).order_by(Game.id))).all(), dtype=np.float64
+        ).reshape(-1, 3)
+        genre_ids = np.array((await db.execute(select(Genre.id).order_by(Genre.id))).scalars().all(), dtype=np.int64)
+        links = np.array(
+            (await db.execute(select(GameGenre.game_id, GameGenre.genre_id))).all(), dtype=np.int64
+        ).reshape(-1, 2)
+        if progress is not None:
+            await progress(0.5)
+
+        model = await asyncio.to_thread(build_genre_affinity_model, version, games, genre_ids, links)
+        self.model = model
+        return model
+
+    async def run(self, session_maker: sessionmaker, interval: float, poll_interval: float) -> None:
+        """Rebuild every ``interval`` seconds, or sooner once the catalog version changes."""
+        while True:
+            model = self.model
+            expired = model is None or time.monotonic() - model.built_at >= interval
+            if expired or model.version != query_cache.versions(AFFINITY_TABLES):
+                try:
+                    async with session_maker() as db:
+                        await self.rebuild(db)
+                except Exception:
+                    logger.exception("Genre affinity rebuild failed")
+            await asyncio.sleep(poll_interval)
+
+
+genre_affinity = GenreAffinityService()
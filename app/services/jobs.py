@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Job
+from app.schemas.job import JobStatus
+from app.services.catalog import catalog_snapshot
+from app.services.genre_affinity import genre_affinity
+from app.services.leaderboard import leaderboard
+from app.services.scoring import recompute_game_scores
+from app.services.similarity import similar_games
+from app.settings import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class UnknownJobTypeError(Exception):
+    pass
+
+
+class JobContext:
+    """Handed to a running job so it can report progress without touching its own transaction."""
+
+    def __init__(self, job_id: int, session_maker: sessionmaker) -> None:
+        self.job_id = job_id
+        self.session_maker = session_maker
+
+    async def report(self, progress: float) -> None:
+        # progress is informational, a job must not fail because it could not be recorded
+        try:
+            async with self.session_maker() as db:
+                # SQLite has a single writer, the job's own transaction holds it until the handler commits
+                if db.get_bind().dialect.name == "sqlite":
+                    return
+                await db.execute(update(Job).where(Job.id == self.job_id).values(progress=min(max(progress, 0), 1)))
+                await db.commit()
+        except SQLAlchemyError:
+            logger.warning("Could not record the progress of job %s", self.job_id, exc_info=True)
+
+
+JobHandler = Callable[[AsyncSession, dict[str, Any], JobContext], Awaitable[dict[str, Any] | None]]
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str):
+    def decorator(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = func
+        return func
+
+    return decorator
+
+
+class JobRunner:
+    """Runs queued jobs on a fixed number of worker tasks, at most ``type_limits[type]`` of a type at once.
+
+    Job records live in the database, the in-memory queue only carries ids, so status survives the process.
+    Every running job names the runner that claimed it, which refreshes ``heartbeat_at`` every
+    ``heartbeat_seconds``. A running job whose heartbeat is older than ``stale_after_seconds`` lost its runner
+    and is failed by any other runner, so live runners in other processes keep their jobs.
+    """
+
+    def __init__(
+        self,
+        queue_size: int,
+        workers: int,
+        type_limits: dict[str, int],
+        default_type_limit: int,
+        heartbeat_seconds: float = 10,
+        stale_after_seconds: float = 60,
+    ) -> None:
+        self.queue_size = queue_size
+        self.workers = workers
+        self.type_limits = type_limits
+        self.default_type_limit = default_type_limit
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_after_seconds = stale_after_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self._queue: asyncio.Queue[int] = asyncio.Queue(maxsize=queue_size)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._heartbeat_task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self._session_maker: sessionmaker | None = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "workers": len(self._tasks),
+        }
+
+    async def enqueue(self, db: AsyncSession, job_type: str, params: dict[str, Any]) -> Job:
+        if job_type not in JOB_HANDLERS:
+            raise UnknownJobTypeError(job_type)
+        if self._queue.full():
+            raise JobQueueFullError
+
+        job = Job(type=job_type, status=JobStatus.queued.value, params=params, created_at=datetime.now(UTC))
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            # another request took the last slot while this one was committing
+            await self._finish(db, job.id, JobStatus.failed, error="Job queue is full")
+            raise JobQueueFullError from None
+        return job
+
+    async def start(self, session_maker: sessionmaker) -> None:
+        self._session_maker = session_maker
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._stopping.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        # the heartbeat finishes the beat it is in, a cancelled commit would invalidate its connection
+        self._stopping.set()
+        tasks = [*self._tasks, self._heartbeat_task] if self._heartbeat_task else self._tasks
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    async def _recover(self) -> None:
+        """Fail jobs whose runner stopped, and queue again those that never ran."""
+        async with self._session_maker() as db:
+            await self._fail_orphaned(db)
+            queued = (
+                (await db.execute(select(Job.id).where(Job.status == JobStatus.queued.value).order_by(Job.id)))
+                .scalars()
+                .all()
+            )
+            for job_id in queued:
+                try:
+                    self._queue.put_nowait(job_id)
+                except asyncio.QueueFull:
+                    await self._finish(db, job_id, JobStatus.failed, error="Job queue is full")
+            await db.commit()
+
+    async def _fail_orphaned(self, db: AsyncSession) -> None:
+        stale_before = datetime.now(UTC) - timedelta(seconds=self.stale_after_seconds)
+        await db.execute(
+            update(Job)
+            .where(
+                Job.status == JobStatus.running.value,
+                or_(Job.owner.is_(None), Job.owner != self.owner),
+                or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale_before),
+            )
+            .values(status=JobStatus.failed.value, error="Interrupted by shutdown", finished_at=datetime.now(UTC))
+        )
+
+    async def _heartbeat(self) -> None:
+        """Mark this runner's jobs as alive and fail the jobs of runners that stopped doing so."""
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.heartbeat_seconds)
+            except TimeoutError:
+                pass
+            else:
+                return
+            try:
+                async with self._session_maker() as db:
+                    # the beat would wait for a running job's SQLite write lock and fail, skip it until the job is done
+                    if self.running and db.get_bind().dialect.name == "sqlite":
+                        continue
+                    await db.execute(
+                        update(Job)
+                        .where(Job.owner == self.owner, Job.status == JobStatus.running.value)
+                        .values(heartbeat_at=datetime.now(UTC))
+                    )
+                    await self._fail_orphaned(db)
+                    await db.commit()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Job %s could not be run", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: int) -> None:
+        async with self._session_maker() as db:
+            job = await db.get(Job, job_id)
+            if job is None or job.status != JobStatus.queued.value:
+                return
+            job_type, params = job.type, job.params
+
+        semaphore = self._semaphores.get(job_type)
+        if semaphore is None:
+            limit = self.type_limits.get(job_type, self.default_type_limit)
+            semaphore = self._semaphores[job_type] = asyncio.Semaphore(limit)
+
+        async with semaphore:
+            # claim atomically, the same id can be queued twice when start() recovers jobs enqueued before it
+            async with self._session_maker() as db:
+                claimed = await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == JobStatus.queued.value)
+                    .values(
+                        status=JobStatus.running.value,
+                        owner=self.owner,
+                        started_at=datetime.now(UTC),
+                        heartbeat_at=datetime.now(UTC),
+                    )
+                )
+                await db.commit()
+            if not claimed.rowcount:
+                return
+
+            self.running += 1
+            try:
+                async with self._session_maker() as db:
+                    result = await JOB_HANDLERS[job_type](db, params, JobContext(job_id, self._session_maker))
+            except Exception as err:
+                logger.exception("Job %s (%s) failed", job_id, job_type)
+                self.failed += 1
+                async with self._session_maker() as db:
+                    await self._finish(db, job_id, JobStatus.failed, error=f"{type(err).__name__}: {err}")
+            else:
+                self.succeeded += 1
+                async with self._session_maker() as db:
+                    await self._finish(db, job_id, JobStatus.succeeded, result=result)
+            finally:
+                self.running -= 1
+
+    @staticmethod
+    async def _finish(
+        db: AsyncSession, job_id: int, status: JobStatus, result: dict | None = None, error: str | None = None
+    ) -> None:
+        values = {"status": status.value, "result": result, "error": error, "finished_at": datetime.now(UTC)}
+        if status == JobStatus.succeeded:
+            values["progress"] = 1
+        await db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await db.commit()
+
+
+@job_handler("compute_scores")
+async def compute_scores_job(db: AsyncSession, params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    return {"games": await recompute_game_scores(db, progress=context.report)}
+
+
+@job_handler("build_similar_games")
+async def build_similar_games_job(db: AsyncSession, params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    game_ids = params.get("game_ids")
+    games = await similar_games.refresh(db, set(game_ids) if game_ids else None, progress=context.report)
+    return {"games": games}
+
+
+@job_handler("rebuild_leaderboard")
+async def rebuild_leaderboard_job(db: AsyncSession, params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    snapshot = await leaderboard.rebuild(db)
+    return {"games": len(snapshot.cards)}
+
+
+@job_handler("rebuild_genre_affinity")
+async def rebuild_genre_affinity_job(db: AsyncSession, params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    model = await genre_affinity.rebuild(db, progress=context.report)
+    return {"games": len(model.game_ids), "genres": len(model.genre_ids)}
+
+
+@job_handler("build_catalog_snapshot")
+async def build_catalog_snapshot_job(db: AsyncSession, params: dict[str, Any], context: JobContext) -> dict[str, Any]:
+    if catalog_snapshot.path is None:
+        raise RuntimeError("CATALOG_SNAPSHOT_PATH is not configured")
+    snapshot = await catalog_snapshot.rebuild(db, progress=context.report)
+    return {"games": len(snapshot), "bytes": snapshot.identity.size}
+
+
+job_runner = JobRunner(
+    queue_size=settings.jobs_queue_size,
+    workers=settings.jobs_workers,
+    type_limits=settings.jobs_type_limits,
+    default_type_limit=settings.jobs_default_type_limit,
+    heartbeat_seconds=settings.jobs_heartbeat_seconds,
+    stale_after_seconds=settings.jobs_stale_after_seconds,
+)
+metrics.register("jobs", job_runner.stats)
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import logging
+import time
+from array import array
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game, GameGenre
+from app.schemas.game import GameResponseModel, game_list_adapter
+from app.services.game import GAME_TABLES, fetch_game_cards, select_game_cards
+from app.settings import settings
+from app.utils.cache import query_cache
+from app.utils.compression import CompressedBody
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LeaderboardSnapshot:
+    """Top games by rating, overall and per genre.
+
+    ``cards`` is sorted by ``(rating desc, id)``, so every ranking is stored as an array of positions into it and
+    merging rankings is a merge of sorted integer arrays.
+    """
+
+    version: tuple[int, ...]
+    built_at: float
+    size: int
+    genre_size: int
+    cards: tuple[GameResponseModel, ...]
+    overall: array
+    by_genre: Mapping[int, array]
+    rendered_limit: int = 0
+    bodies: dict[Hashable, CompressedBody] = field(default_factory=dict, compare=False, repr=False)
+
+    def top(self, limit: int, offset: int) -> list[GameResponseModel] | None:
+        """Return the page, or None when it reaches past what the snapshot holds."""
+        if offset + limit > self.size and len(self.overall) >= self.size:
+            return None
+        return [self.cards[position] for position in self.overall[offset : offset + limit]]
+
+    def rendered(self, key: Hashable, page: Callable[[], list[GameResponseModel] | None]) -> CompressedBody | None:
+        """The serialized page under ``key``, kept with its ETag and compressed variants for the snapshot's life."""
+        body = self.bodies.get(key)
+        if body is None:
+            games = page()
+            if games is None:
+                return None
+            body = CompressedBody(game_list_adapter.dump_json(games))
+            if len(self.bodies) < self.rendered_limit:
+                self.bodies[key] = body
+        return body
+
+    def top_for_genres(self, genre_ids: list[int], limit: int, offset: int) -> list[GameResponseModel] | None:
+        rankings = [self.by_genre.get(genre_id, array("i")) for genre_id in set(genre_ids)]
+        # a game in the top K of the union is in the top K of each of its genres, so truncated rankings are exact
+        # as long as K fits in them
+        if offset + limit > self.genre_size and any(len(ranking) >= self.genre_size for ranking in rankings):
+            return None
+
+        page = []
+        previous = None
+        for position in heapq.merge(*rankings):
+            if position == previous:
+                continue
+            previous = position
+            if offset:
+                offset -= 1
+                continue
+            page.append(self.cards[position])
+            if len(page) == limit:
+                break
+        return page
+
+
+class LeaderboardService:
+    def __init__(self, size: int, genre_size: int, rendered_limit: int = 0) -> None:
+        self.size = size
+        self.genre_size = genre_size
+        self.rendered_limit = rendered_limit
+        self.snapshot: LeaderboardSnapshot | None = None
+
+    def current(self) -> LeaderboardSnapshot | None:
+        """The snapshot if it still matches the catalog, readers never wait for a rebuild."""
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version != query_cache.versions(GAME_TABLES):
+            return None
+        return snapshot
+
+    async def rebuild(self, db: AsyncSession) -> LeaderboardSnapshot:
+        version = query_cache.versions(GAME_TABLES)
+
+        overall_statement = select(Game.id).order_by(Game.rating.desc(), Game.id).limit(self.size)
+        overall_ids = (await db.execute(overall_statement)).scalars().all()
+
+        genre_rank = (
+            select(
+                GameGenre.genre_id,
+                GameGenre.game_id,
+                func.row_number()
+                .over(partition_by=GameGenre.genre_id, order_by=(Game.rating.desc(), Game.id))
+                .label("rank"),
+            )
+            .join(Game, Game.id == GameGenre.game_id)
+            .subquery()
+        )
+        genre_statement = (
+            select(genre_rank.c.genre_id, genre_rank.c.game_id)
+            .where(genre_rank.c.rank <= self.genre_size)
+            .order_by(genre_rank.c.genre_id, genre_rank.c.rank)
+        )
+        genre_rows = (await db.execute(genre_statement)).all()
+
+        game_ids = set(overall_ids) | {game_id for _, game_id in genre_rows}
+        cards_statement = select_game_cards(db).where(Game.id.in_(game_ids)).order_by(Game.rating.desc(), Game.id)
+        games = await fetch_game_cards(db, cards_statement)
+        positions = {game.id: position for position, game in enumerate(games)}
+
+        by_genre: dict[int, array] = {}
+        for genre_id, game_id in genre_rows:
+            by_genre.setdefault(genre_id, array("i")).append(positions[game_id])
+
+        snapshot = LeaderboardSnapshot(
+            version=version,
+            built_at=time.monotonic(),
+            size=self.size,
+            genre_size=self.genre_size,
+            cards=tuple(games),
+            overall=array("i", (positions[game_id] for game_id in overall_ids)),
+            by_genre=MappingProxyType(by_genre),
+            rendered_limit=self.rendered_limit,
+        )
+        # a single reference assignment, readers see either the old or the new snapshot
+        self.snapshot = snapshot
+        return snapshot
+
+    async def run(self, session_maker: sessionmaker, interval: float, poll_interval: float) -> None:
+        """Rebuild every ``interval`` seconds, or sooner once the catalog version changes."""
+        while True:
+            snapshot = self.snapshot
+            expired = snapshot is None or time.monotonic() - snapshot.built_at >= interval
+            if expired or snapshot.version != query_cache.versions(GAME_TABLES):
+                try:
+                    async with session_maker() as db:
+                        await self.rebuild(db)
+                except Exception:
+                    logger.exception("Leaderboard rebuild failed")
+            await asyncio.sleep(poll_interval)
+
+
+leaderboard = LeaderboardService(
+    size=settings.leaderboard_size,
+    genre_size=settings.leaderboard_genre_size,
+    rendered_limit=settings.leaderboard_rendered_pages,
+)
@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+from sqlalchemy import Float, Integer, bindparam, case, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Game, Review
+from app.schemas.review import ReviewBulkItemModel
+
+
+class ReviewService:
+    async def missing_game_ids(self, game_ids: set[int], db: AsyncSession) -> set[int]:
+        result = await db.execute(select(Game.id).where(Game.id.in_(game_ids)))
+        return game_ids - set(result.scalars())
+
+    async def add_reviews(self, reviews: list[ReviewBulkItemModel], db: AsyncSession) -> list[Review]:
+        """Insert the reviews and fold them into each game's running rating in the same transaction."""
+        created = list(await db.scalars(insert(Review).returning(Review), [review.model_dump() for review in reviews]))
+
+        totals: defaultdict[int, dict[str, float]] = defaultdict(
+            lambda: {"review_count": 0, "score_count": 0, "score_sum": 0.0}
+        )
+        for review in reviews:
+            total = totals[review.game_id]
+            total["review_count"] += 1
+            if review.score is not None:
+                total["score_count"] += 1
+                total["score_sum"] += review.score
+
+        games = Game.__table__
+        review_count = bindparam("review_count", type_=Integer)
+        score_count = bindparam("score_count", type_=Integer)
+        score_sum = bindparam("score_sum", type_=Float)
+        # SET expressions read the pre-update row, so concurrent reviews never overwrite each other's aggregate
+        statement = (
+            update(games)
+            .where(games.c.id == bindparam("game_id", type_=Integer))
+            .values(
+                reviews_number=games.c.reviews_number + review_count,
+                rating_count=games.c.rating_count + score_count,
+                rating_sum=games.c.rating_sum + score_sum,
+                rating=case(
+                    (
+                        games.c.rating_count + score_count > 0,
+                        (games.c.rating_sum + score_sum) / (games.c.rating_count + score_count),
+                    ),
+                    else_=games.c.rating,
+                ),
+            )
+        )
+        # rows are locked in game id order, so concurrent ingests of overlapping games cannot deadlock
+        await db.execute(statement, [{"game_id": game_id, **total} for game_id, total in sorted(totals.items())])
+        await db.commit()
+        return created
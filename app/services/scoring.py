@@ -0,0 +1,72 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Mapping
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Game
+from app.settings import SCORE_SIGNALS, settings
+
+COUNTER_COLUMNS = tuple(name for name in SCORE_SIGNALS if name != "rating")
+
+UPDATE_BATCH_SIZE = 1000
+
+
+def compute_scores(
+    columns: Mapping[str, np.ndarray], weights: Mapping[str, float], rating_prior_reviews: int
+) -> np.ndarray:
+    """Weighted sum of normalized quality and popularity signals, in [0, 1].
+
+    The rating is shrunk towards the catalog mean by ``rating_prior_reviews`` pseudo reviews, so a 5.0 from two
+    reviews doesn't outrank a 4.6 from thousands. Counters are heavy tailed and go through ``log1p`` first. Every
+    signal is scaled by its maximum over the catalog.
+    """
+    ratings = columns["rating"].astype(np.float64)
+    reviews = columns["reviews_number"].astype(np.float64)
+    mean_rating = ratings.mean() if ratings.size else 0.0
+    signals = {"rating": (ratings * reviews + mean_rating * rating_prior_reviews) / (reviews + rating_prior_reviews)}
+    for name in COUNTER_COLUMNS:
+        signals[name] = np.log1p(np.maximum(columns[name].astype(np.float64), 0))
+
+    scores = np.zeros(ratings.shape, dtype=np.float64)
+    total_weight = 0.0
+    for name, weight in weights.items():
+        values = signals[name]
+        peak = values.max() if values.size else 0.0
+        if peak > 0:
+            scores += weight * (values / peak)
+        total_weight += weight
+    return scores / total_weight if total_weight else scores
+
+
+def rounded_scores(columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    return np.round(compute_scores(columns, settings.score_weights, settings.score_rating_prior_reviews), 6)
+
+
+async def recompute_game_scores(db: AsyncSession, progress: Callable[[float], Awaitable[None]] | None = None) -> int:
+    """Recompute ``Game.score`` for the whole catalog and write it back in bulk, returns the number of games.
+
+    ``progress`` is awaited with the share of the scores written after every batch.
+    """
+    names = ("rating", "reviews_number", *COUNTER_COLUMNS)
+    result = await db.execute(select(Game.id, *(getattr(Game, name) for name in names)))
+    matrix = np.array(result.all(), dtype=np.float64).reshape(-1, len(names) + 1)
+    if not matrix.size:
+        return 0
+
+    ids = matrix[:, 0].astype(np.int64)
+    columns = {name: matrix[:, index + 1] for index, name in enumerate(names)}
+    scores = await asyncio.to_thread(rounded_scores, columns)
+
+    for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+        batch = zip(
+            ids[start : start + UPDATE_BATCH_SIZE].tolist(),
+            scores[start : start + UPDATE_BATCH_SIZE].tolist(),
+            strict=True,
+        )
+        await db.execute(update(Game), [{"id": game_id, "score": score} for game_id, score in batch])
+        if progress is not None:
+            await progress(min(start + UPDATE_BATCH_SIZE, len(ids)) / len(ids))
+    await db.commit()
+    return len(ids)
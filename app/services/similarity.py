@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from itertools import chain
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Game, GameGenre, GameTeam, SimilarGame
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# upper bound for the dense similarity block computed at once (rows x catalog size)
+BLOCK_CELLS = 4_000_000
+WRITE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    game_ids: np.ndarray
+    features: sparse.csr_matrix
+    popularity: np.ndarray
+
+    def lookup(self, game_ids) -> tuple[np.ndarray, np.ndarray]:
+        """Row of every game id, and a mask of the ids that are in the matrix."""
+        game_ids = np.fromiter(game_ids, dtype=np.int64)
+        rows = np.searchsorted(self.game_ids, game_ids)
+        found = rows < len(self.game_ids)
+        found[found] = self.game_ids[rows[found]] == game_ids[found]
+        return rows, found
+
+    def rows_of(self, game_ids) -> np.ndarray:
+        rows, found = self.lookup(game_ids)
+        return rows[found]
+
+
+async def load_feature_matrix(db: AsyncSession, team_weight: float, popularity_weight: float) -> FeatureMatrix:
+    """Game x (genres + teams) incidence matrix with L2-normalized rows, so ``F @ F.T`` is the cosine similarity."""
+    games = np.array(
+        (await db.execute(select(Game.id, Game.plays, Game.whitelist, Game.backlogs).order_by(Game.id))).all(),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    genre_links = np.array((await db.execute(select(GameGenre.game_id, GameGenre.genre_id))).all(), dtype=np.int64)
+    team_links = np.array((await db.execute(select(GameTeam.game_id, GameTeam.team_id))).all(), dtype=np.int64)
+    return await asyncio.to_thread(
+        build_feature_matrix,
+        games,
+        genre_links.reshape(-1, 2),
+        team_links.reshape(-1, 2),
+        team_weight,
+        popularity_weight,
+    )
+
+
+def build_feature_matrix(
+    games: np.ndarray, genre_links: np.ndarray, team_links: np.ndarray, team_weight: float, popularity_weight: float
+) -> FeatureMatrix:
+    game_ids = games[:, 0]
+    _, genre_columns = np.unique(genre_links[:, 1], return_inverse=True)
+    _, team_columns = np.unique(team_links[:, 1], return_inverse=True)
+    genre_count = int(genre_columns.max()) + 1 if genre_columns.size else 0
+    team_count = int(team_columns.max()) + 1 if team_columns.size else 0
+
+    features = sparse.csr_matrix(
+        (
+            np.concatenate([np.ones(len(genre_links)), np.full(len(team_links), team_weight)]),
+            (
+                np.searchsorted(game_ids, np.concatenate([genre_links[:, 0], team_links[:, 0]])),
+                np.concatenate([genre_columns, team_columns + genre_count]),
+            ),
+        ),
+        shape=(len(game_ids), genre_count + team_count),
+        dtype=np.float32,
+    )
+    norms = np.sqrt(np.asarray(features.multiply(features).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    features = sparse.diags(1 / norms) @ features
+
+    interest = np.log1p(games[:, 1:].sum(axis=1).astype(np.float64))
+    peak = interest.max() if interest.size else 0
+    normalized = interest / peak if peak else np.zeros_like(interest)
+    popularity = 1 - popularity_weight + popularity_weight * normalized
+    return FeatureMatrix(game_ids=game_ids, features=features.tocsr(), popularity=popularity.astype(np.float32))
+
+
+def top_k_neighbours(
+    matrix: FeatureMatrix, rows: np.ndarray, k: int
+) -> Iterator[list[tuple[int, np.ndarray, np.ndarray]]]:
+    """Yield ``(row, neighbour_rows, similarities)`` of every requested row, best neighbour first.
+
+    Rows come in blocks of at most ``BLOCK_CELLS`` similarity cells, each block is computed when it is requested.
+    """
+    total = len(matrix.game_ids)
+    k = min(k, total - 1)
+    if k <= 0:
+        return
+
+    block_size = max(1, BLOCK_CELLS // total)
+    transposed = matrix.features.T.tocsc()
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start : start + block_size]
+        similarities = (matrix.features[block_rows] @ transposed).toarray()
+        similarities *= matrix.popularity[np.newaxis, :]
+        similarities[np.arange(len(block_rows)), block_rows] = 0
+
+        candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        candidate_similarities = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.argsort(-candidate_similarities, axis=1, kind="stable")
+        neighbours = np.take_along_axis(candidates, order, axis=1)
+        neighbour_similarities = np.take_along_axis(candidate_similarities, order, axis=1)
+
+        block = []
+        for row, row_neighbours, row_similarities in zip(block_rows, neighbours, neighbour_similarities, strict=True):
+            positive = row_similarities > 0
+            block.append((int(row), row_neighbours[positive], row_similarities[positive]))
+        yield block
+
+
+class SimilarGamesService:
+    def __init__(self, top_k: int, team_weight: float, popularity_weight: float) -> None:
+        self.top_k = top_k
+        self.team_weight = team_weight
+        self.popularity_weight = popularity_weight
+        self.pending_game_ids: set[int] = set()
+
+    async def refresh(
+        self,
+        db: AsyncSession,
+        game_ids: set[int] | None = None,
+        progress: Callable[[float], Awaitable[None]] | None = None,
+    ) -> int:
+        """Recompute neighbour lists, for the whole catalog or only those affected by ``game_ids`` changing links.
+
+        Similarity blocks are computed in a worker thread, ``progress`` is awaited with the share of the lists
+        written after each. Returns the number of games whose list was rewritten.
+        """
+        matrix = await load_feature_matrix(db, self.team_weight, self.popularity_weight)
+
+        if game_ids is None:
+            rows = np.arange(len(matrix.game_ids))
+            await db.execute(delete(SimilarGame))
+        else:
+            rows = await self._affected_rows(db, matrix, game_ids)
+            stale_ids = set(game_ids) | set(matrix.game_ids[rows].tolist())
+            for batch in _batches(sorted(stale_ids), WRITE_BATCH_SIZE):
+                await db.execute(delete(SimilarGame).where(SimilarGame.game_id.in_(batch)))
+
+        blocks = top_k_neighbours(matrix, rows, self.top_k)
+        written = 0
+        while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+            records = (
+                {
+                    "game_id": int(matrix.game_ids[row]),
+                    "rank": rank,
+                    "similar_game_id": int(matrix.game_ids[neighbour]),
+                    "similarity": float(similarity),
+                }
+                for row, neighbours, similarities in block
+                for rank, (neighbour, similarity) in enumerate(zip(neighbours, similarities, strict=True), start=1)
+            )
+            for batch in _batches(records, WRITE_BATCH_SIZE):
+                await db.execute(insert(SimilarGame), batch)
+            written += len(block)
+            if progress is not None:
+                await progress(written / len(rows))
+        await db.commit()
+        return len(rows)
+
+    async def _affected_rows(self, db: AsyncSession, matrix: FeatureMatrix, game_ids: set[int]) -> np.ndarray:
+        """Rows of the changed games, of games listing them, and of games they would now enter the top K of."""
+        changed_rows = matrix.rows_of(game_ids)
+
+        listing_ids = (
+            await db.execute(select(SimilarGame.game_id).where(SimilarGame.similar_game_id.in_(game_ids)).distinct())
+        ).scalars()
+        affected = [changed_rows, matrix.rows_of(listing_ids)]
+
+        if changed_rows.size:
+            thresholds = np.zeros(len(matrix.game_ids), dtype=np.float32)
+            statement = (
+                select(SimilarGame.game_id, func.min(SimilarGame.similarity))
+                .group_by(SimilarGame.game_id)
+                .having(func.count() >= self.top_k)
+            )
+            kth = np.array((await db.execute(statement)).all(), dtype=np.float64).reshape(-1, 2)
+            kth_rows, found = matrix.lookup(kth[:, 0].astype(np.int64))
+            thresholds[kth_rows[found]] = kth[found, 1]
+
+            to_changed = matrix.features @ matrix.features[changed_rows].T
+            to_changed = to_changed.multiply(matrix.popularity[changed_rows][np.newaxis, :]).tocsr()
+            best = to_changed.max(axis=1).toarray().ravel()
+            affected.append(np.flatnonzero(best > thresholds))
+
+        return np.unique(np.concatenate(affected))
+
+    async def run(self, session_maker: sessionmaker, poll_interval: float) -> None:
+        """Apply incremental updates for games whose genre or team links changed."""
+        while True:
+            await asyncio.sleep(poll_interval)
+            if not self.pending_game_ids:
+                continue
+
+            game_ids, self.pending_game_ids = self.pending_game_ids, set()
+            try:
+                async with session_maker() as db:
+                    await self.refresh(db, game_ids)
+            except Exception:
+                logger.exception("Similar games refresh failed")
+                self.pending_game_ids |= game_ids
+
+
+def _batches(items, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+similar_games = SimilarGamesService(
+    top_k=settings.similar_games_top_k,
+    team_weight=settings.similar_games_team_weight,
+    popularity_weight=settings.similar_games_popularity_weight,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_links(session: Session, flush_context) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, GameGenre | GameTeam) and obj.game_id is not None:
+            similar_games.pending_game_ids.add(obj.game_id)
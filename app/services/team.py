@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import GameTeam, Team
+from app.schemas.team import TeamResponseModel
+from app.services.game_group import fetch_group_game_ids, fetch_group_stats, group_exists
+from app.utils.cache import cached
+
+
+class TeamService:
+    @cached("teams", "game_teams", "games")
+    async def get_teams(self, db: AsyncSession) -> list[TeamResponseModel]:
+        rows = await fetch_group_stats(db, Team, GameTeam, GameTeam.team_id)
+        return [
+            TeamResponseModel(id=team_id, name=name, games_count=count, average_rating=average)
+            for team_id, name, count, average in rows
+        ]
+
+    @cached("game_teams")
+    async def get_team_game_ids(self, team_id: int, db: AsyncSession, limit: int, after: int | None) -> list[int]:
+        return await fetch_group_game_ids(db, GameTeam, GameTeam.team_id, team_id, limit, after)
+
+    @cached("teams")
+    async def team_exists(self, team_id: int, db: AsyncSession) -> bool:
+        return await group_exists(db, Team, team_id)
@@ -1,31 +1,103 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+
 from fastapi import HTTPException
-from sqlalchemy import delete, select
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import class_mapper, make_transient_to_detached, object_mapper, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.constants import DEFAULT_USER_ROLE_ID
 from app.models import Genre, Role, User, UserLikedGenres
 from app.schemas.user import UserCreateModel, UserUpdateModel
+from app.utils.cache import cached
 from app.utils.hashing import generate_hashed_password
+from app.utils.singleflight import recommendations_flight, user_lookup_flight
+from app.utils.tracing import trace_methods
+
+# built once and executed with bound parameters, so SQLAlchemy reuses their compiled form and asyncpg the
+# prepared statement
+USER_BY_ID = (
+    select(User)
+    .options(selectinload(User.role), selectinload(User.liked_genres).selectinload(UserLikedGenres.genre))
+    .where(User.id == bindparam("user_id"))
+)
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+USER_LIKED_GENRE_IDS = select(UserLikedGenres.genre_id).where(UserLikedGenres.user_id == bindparam("user_id"))
+GENRE_IDS = select(Genre.id).where(Genre.id.in_(bindparam("genre_ids", expanding=True)))
+ROLE_EXISTS = select(Role.id).where(Role.id == bindparam("role_id"))
+
+
+def column_values(instance) -> tuple:
+    return tuple(getattr(instance, attr.key) for attr in object_mapper(instance).column_attrs)
+
+
+def detached_instance(model, values: tuple):
+    """An instance of ``model`` with the given column values that the session treats as already loaded."""
+    keys = [attr.key for attr in class_mapper(model).column_attrs]
+    instance = model(**dict(zip(keys, values, strict=True)))
+    make_transient_to_detached(instance)
+    return instance
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    """Column values of a user, its role and liked genres, shared between coalesced lookups."""
+
+    user: tuple
+    role: tuple
+    liked_genres: tuple[tuple[tuple, tuple], ...]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserRecord":
+        return cls(
+            user=column_values(user),
+            role=column_values(user.role),
+            liked_genres=tuple((column_values(liked), column_values(liked.genre)) for liked in user.liked_genres),
+        )
 
+    def to_detached_user(self) -> User:
+        # set_committed_value does not fire backrefs, which would mark Role.users and Genre.liked_by_users as
+        # loaded with just this user in them
+        user = detached_instance(User, self.user)
+        set_committed_value(user, "role", detached_instance(Role, self.role))
+        liked_genres = []
+        for liked_values, genre_values in self.liked_genres:
+            liked = detached_instance(UserLikedGenres, liked_values)
+            set_committed_value(liked, "genre", detached_instance(Genre, genre_values))
+            liked_genres.append(liked)
+        set_committed_value(user, "liked_genres", liked_genres)
+        return user
 
-class UserService:
-    async def get_user_by_id(self, user_id: int, db: AsyncSession) -> User:
-        statement = (
-            select(User)
-            .options(selectinload(User.role), selectinload(User.liked_genres).selectinload(UserLikedGenres.genre))
-            .where(User.id == user_id)
-        )
 
-        result = await db.execute(statement)
+@trace_methods
+class UserService:
+    async def get_user_by_id(self, user_id: int, db: AsyncSession) -> User | None:
+        identity = db.identity_key(User, user_id)
+        if identity in db.identity_map:
+            # re-reads after our own writes must not join a lookup that started before them
+            result = await db.execute(USER_BY_ID, {"user_id": user_id})
+            return result.scalar_one_or_none()
+
+        record = await self._get_user_record(user_id, db)
+        if record is None:
+            return None
+        if (user := db.identity_map.get(identity)) is not None:
+            # this request led the lookup and already holds the loaded user
+            return user
+
+        # the lookup was coalesced with a concurrent request, build our own instances from its column values
+        return await db.merge(record.to_detached_user(), load=False)
+
+    @user_lookup_flight.coalesce
+    async def _get_user_record(self, user_id: int, db: AsyncSession) -> UserRecord | None:
+        result = await db.execute(USER_BY_ID, {"user_id": user_id})
         user = result.scalar_one_or_none()
-        return user
+        return None if user is None else UserRecord.from_user(user)
 
     async def get_user_by_username(self, username: str, db: AsyncSession) -> User | None:
-        statement = select(User).where(User.username == username)
-
-        result = await db.execute(statement)
+        result = await db.execute(USER_BY_USERNAME, {"username": username})
         user = result.scalar_one_or_none()
         return user
 
@@ -73,31 +145,73 @@ class UserService:
         return updated_user
 
     async def delete_user(self, user_id: int, db: AsyncSession) -> bool:
+        users, _ = await self.delete_users(db, user_ids=[user_id])
+        return users > 0
+
+    async def delete_users(
+        self,
+        db: AsyncSession,
+        user_ids: list[int] | None = None,
+        role_id: int | None = None,
+        exclude_ids: Iterable[int] = (),
+        batch_size: int = 1000,
+    ) -> tuple[int, int]:
+        """Delete the users matching every given filter with their liked genres, in one transaction.
+
+        Core deletes skip the ORM cascade, so the liked genres go first in the same set-based statements.
+        Returns the number of deleted users and liked genre rows.
+        """
+        conditions = []
+        if role_id is not None:
+            conditions.append(User.role_id == role_id)
+        exclude_ids = list(exclude_ids)
+        if exclude_ids:
+            conditions.append(User.id.not_in(exclude_ids))
+
+        if user_ids is None:
+            batches = [conditions]
+        else:
+            user_ids = sorted(set(user_ids))
+            batches = [
+                [*conditions, User.id.in_(user_ids[start : start + batch_size])]
+                for start in range(0, len(user_ids), batch_size)
+            ]
+
+        users = liked_genres = 0
         try:
-            statement = delete(User).where(User.id == user_id)
-            result = await db.execute(statement)
+            for batch in batches:
+                matching = select(User.id).where(*batch)
+                result = await db.execute(
+                    delete(UserLikedGenres).where(UserLikedGenres.user_id.in_(matching)),
+                    execution_options={"synchronize_session": False},
+                )
+                liked_genres += result.rowcount
+                result = await db.execute(delete(User).where(*batch), execution_options={"synchronize_session": False})
+                users += result.rowcount
             await db.commit()
-            return result.rowcount > 0
-        except SQLAlchemyError as e:
+        except SQLAlchemyError:
             await db.rollback()
-            raise e
+            raise
+        return users, liked_genres
 
+    @cached("user_liked_genres")
+    @recommendations_flight.coalesce
     async def get_user_liked_genre_ids(self, user_id: int, db: AsyncSession) -> list[int] | None:
-        statement = select(UserLikedGenres.genre_id).where(UserLikedGenres.user_id == user_id)
-        result = await db.execute(statement)
-        genre_ids = result.scalars().all()
+        result = await db.execute(USER_LIKED_GENRE_IDS, {"user_id": user_id})
+        genre_ids = list(result.scalars().all())
         return genre_ids or None
 
     # better to move it to GenreService
+    @cached("genres")
     async def genres_exist(self, genre_ids: list[int], db: AsyncSession) -> bool:
         if not genre_ids:
             return True
-        result = await db.execute(select(Genre.id).where(Genre.id.in_(genre_ids)))
+        result = await db.execute(GENRE_IDS, {"genre_ids": genre_ids})
         existed_ids = set(result.scalars().all())
         return set(genre_ids).issubset(existed_ids)
 
+    @cached("roles")
     async def role_exist(self, role_id: int, db: AsyncSession) -> bool:
-        statement = select(Role.id).where(Role.id == role_id)
-        result = await db.execute(statement)
+        result = await db.execute(ROLE_EXISTS, {"role_id": role_id})
         role = result.scalars().first()
         return role is not None
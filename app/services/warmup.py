@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from contextlib import AsyncExitStack
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Role
+from app.schemas.game import GameSortField
+from app.services.autocomplete import title_index
+from app.services.game import GameService
+from app.services.genre_affinity import genre_affinity
+from app.services.leaderboard import leaderboard
+from app.services.user import UserService
+from app.settings import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# the first pages of the list endpoints with their default limits, the routers fetch one extra row
+WARMUP_PAGE_LIMITS = (10 + 1, 20 + 1)
+
+game_service = GameService()
+user_service = UserService()
+
+
+class WarmupService:
+    """Gets a fresh process ready to serve before readiness is reported: pool connections opened, the hot
+    statements compiled and the lookup caches and in-process snapshots built.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.attempts = 0
+        self.error: str | None = None
+        self.steps: dict[str, float] = {}
+
+    def stats(self) -> dict:
+        return {"ready": self.ready, "attempts": self.attempts, "error": self.error, "steps": self.steps}
+
+    async def _step(self, name: str, step: Awaitable) -> None:
+        started = time.perf_counter()
+        await step
+        self.steps[name] = round(time.perf_counter() - started, 4)
+
+    async def open_connections(self, engine: AsyncEngine, count: int) -> None:
+        """Check out ``count`` connections at once so the pool holds them when they are returned."""
+        async with AsyncExitStack() as stack:
+            connections = await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(count)))
+            await asyncio.gather(*(connection.execute(text("SELECT 1")) for connection in connections))
+
+    async def compile_statements(self, db: AsyncSession) -> None:
+        """Run the per-request lookups once so their statements are in the compiled cache."""
+        await user_service.get_user_by_id(0, db)
+        await user_service.get_user_by_username("", db)
+        await game_service.game_exists(0, db)
+
+    async def preload_lookups(self, db: AsyncSession) -> None:
+        for role_id in (await db.execute(select(Role.id))).scalars().all():
+            await user_service.role_exist(role_id, db)
+        await game_service.get_genre_game_counts(db)
+        await game_service.estimate_game_count(db)
+
+    async def preload_pages(self, db: AsyncSession) -> None:
+        for sort in GameSortField:
+            for limit in WARMUP_PAGE_LIMITS:
+                await game_service.get_games(db, limit, 0, sort)
+        if settings.leaderboard_enabled:
+            await leaderboard.rebuild(db)
+        await genre_affinity.rebuild(db)
+        await title_index.rebuild(db)
+
+    async def warm_up(self, engine: AsyncEngine, session_maker: sessionmaker) -> None:
+        pool_size = getattr(engine.pool, "size", lambda: 1)()
+        await self._step("connections", self.open_connections(engine, min(settings.warmup_connections, pool_size)))
+        async with session_maker() as db:
+            await self._step("statements", self.compile_statements(db))
+            await self._step("lookups", self.preload_lookups(db))
+            await self._step("pages", self.preload_pages(db))
+
+    async def run(self, engine: AsyncEngine, session_maker: sessionmaker) -> None:
+        """Retry the warm-up until it succeeds, and report ready regardless once ``warmup_timeout_seconds`` pass,
+        a degraded process serves better than one that never joins the load balancer.
+        """
+        deadline = time.monotonic() + settings.warmup_timeout_seconds
+        delay = 0.5
+        while not self.ready:
+            self.attempts += 1
+            try:
+                await self.warm_up(engine, session_maker)
+            except Exception as err:
+                logger.exception("Warm-up attempt %s failed", self.attempts)
+                self.error = f"{type(err).__name__}: {err}"
+                if time.monotonic() + delay >= deadline:
+                    logger.warning("Warm-up gave up after %s attempts, reporting ready", self.attempts)
+                    self.ready = True
+                    return
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+            else:
+                self.error = None
+                self.ready = True
+                logger.info("Warm-up finished in %s attempts: %s", self.attempts, self.steps)
+
+
+warmup = WarmupService()
+metrics.register("warmup", warmup.stats)
@@ -1,14 +1,135 @@
 from dotenv import load_dotenv
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 load_dotenv()
 
+# game columns the popularity score can weigh
+SCORE_SIGNALS = ("rating", "plays", "playing", "backlogs", "whitelist", "times_listed")
+
 
 class Settings(BaseSettings):
     database_url: str
     jwt_secret_key: str
     jwt_algorithm: str
     jwt_expire_minutes: int
+    # verified tokens kept in memory, 0 verifies every request
+    jwt_cache_size: int = 10_000
+    jwt_cache_max_token_length: int = 4096
+
+    cache_enabled: bool = True
+    cache_backend: str = "memory"
+    cache_redis_url: str | None = None
+    cache_max_entries: int = 2048
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_ttl_seconds: float = 300
+
+    leaderboard_enabled: bool = True
+    leaderboard_size: int = 500
+    leaderboard_genre_size: int = 200
+    leaderboard_refresh_seconds: float = 300
+    leaderboard_poll_seconds: float = 2
+    leaderboard_rendered_pages: int = 1024
+
+    score_weights: dict[str, float] = {
+        "rating": 0.5,
+        "plays": 0.15,
+        "playing": 0.1,
+        "backlogs": 0.05,
+        "whitelist": 0.1,
+        "times_listed": 0.1,
+    }
+    score_rating_prior_reviews: int = 50
+
+    similar_games_top_k: int = 20
+    similar_games_team_weight: float = 2.0
+    similar_games_popularity_weight: float = 0.3
+    similar_games_poll_seconds: float = 5
+
+    recommendation_expand_below: int = 3
+    recommendation_expansion_weight: float = 0.5
+    genre_affinity_refresh_seconds: float = 600
+    genre_affinity_poll_seconds: float = 5
+
+    autocomplete_refresh_seconds: float = 600
+    autocomplete_poll_seconds: float = 10
+
+    catalog_snapshot_path: str | None = None
+    catalog_snapshot_refresh_seconds: float = 300
+    catalog_snapshot_poll_seconds: float = 2
+    catalog_snapshot_check_seconds: float = 1
+
+    activity_journal_dir: str | None = "var/activity"
+    activity_flush_seconds: float = 1
+    activity_flush_batch_size: int = 1000
+    activity_max_pending_games: int = 10_000
+
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    jobs_enabled: bool = True
+    jobs_queue_size: int = 100
+    jobs_workers: int = 2
+    jobs_default_type_limit: int = 1
+    jobs_type_limits: dict[str, int] = {}
+    # running jobs whose runner has not beaten for jobs_stale_after_seconds are failed by the other runners
+    jobs_heartbeat_seconds: float = 10
+    jobs_stale_after_seconds: float = 60
+
+    games_core_read_path: bool = True
+    user_delete_batch_size: int = 1000
+
+    concurrency_limit_enabled: bool = True
+    # initial and maximum in-flight requests per route class, keep the sum near the pool's connections
+    concurrency_limits: dict[str, int] = {"auth": 4, "read": 16, "write": 8}
+    concurrency_max_limits: dict[str, int] = {"auth": 8, "read": 48, "write": 16}
+    concurrency_min_limit: int = 1
+    concurrency_queue_size: int = 100
+    concurrency_max_wait_seconds: float = 2
+    concurrency_latency_tolerance: float = 2.0
+
+    # seconds per request by longest matching path prefix, 0 disables the deadline of a prefix
+    request_deadlines: dict[str, float] = {"/games/recommendations": 3, "/games": 5, "/auth": 5, "/health": 0}
+    request_deadline_seconds: float = 10
+
+    profiling_enabled: bool = True
+    profiling_header: str = "X-Profile"
+    profiling_reports_kept: int = 50
+    profiling_top_functions: int = 30
+
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    # compiled statements SQLAlchemy keeps per engine
+    database_compiled_cache_size: int = 1000
+    # prepared statements asyncpg keeps per connection, 0 turns them off for pgbouncer before 1.21
+    database_prepared_statement_cache_size: int = 500
+    # unique prepared statement names, for pgbouncer in transaction pooling mode
+    database_pgbouncer: bool = False
+    warmup_enabled: bool = True
+    warmup_connections: int = 5
+    warmup_timeout_seconds: float = 60
+    health_database_timeout_seconds: float = 2
+
+    # tracing is on once spans have somewhere to go, a JSON lines file or an OTLP/HTTP collector
+    tracing_file_path: str | None = None
+    tracing_otlp_endpoint: str | None = None
+    tracing_service_name: str = "igames"
+    # share of requests traced unless the caller's traceparent decided
+    tracing_sample_rate: float = 0.01
+    tracing_export_seconds: float = 5
+    tracing_max_queued_spans: int = 10_000
+
+    @field_validator("score_weights")
+    @classmethod
+    def check_score_weights(cls, weights: dict[str, float]) -> dict[str, float]:
+        unknown = set(weights) - set(SCORE_SIGNALS)
+        if unknown:
+            raise ValueError(f"unknown score signals {sorted(unknown)}, expected some of {list(SCORE_SIGNALS)}")
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("score weights must not be negative")
+        return weights
 
     class Config:
         env_file = ".env"
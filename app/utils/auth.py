@@ -1,4 +1,6 @@
+from collections.abc import Mapping
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
@@ -10,6 +12,7 @@ from app.db import get_async_session
 from app.models import User
 from app.services.user import UserService
 from app.settings import settings
+from app.utils.token_cache import token_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -24,23 +27,34 @@ def generate_jwt_token(data: dict, expires_delta: timedelta | None = None) -> st
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_session)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def decode_jwt_token(token: str) -> Mapping[str, Any] | None:
+    """The verified claims of ``token``, from the cache when it was verified before and has not expired."""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError as err:
-        raise credentials_exception from err
-
-    user = await user_service.get_user_by_id(int(user_id), db)
+        claims = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return None
+    return token_cache.put(token, claims)
+
+
+async def get_user_from_token(token: str, db: AsyncSession) -> User | None:
+    payload = decode_jwt_token(token)
+    user_id: str | None = payload.get("sub") if payload is not None else None
+    if user_id is None:
+        return None
+    return await user_service.get_user_by_id(int(user_id), db)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_session)) -> User:
+    user = await get_user_from_token(token, db)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
@@ -0,0 +1,277 @@
+import functools
+import inspect
+import pickle  # noqa: S403
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, object_mapper
+
+from app.settings import settings
+from app.utils.metrics import metrics
+
+MISSING = object()
+
+VERSION_PREFIX = "version:"
+PENDING_TABLES_KEY = "query_cache_pending_tables"
+# execution option naming the versions a write bumps instead of its table's, {"invalidates": ()} bumps none
+INVALIDATES_OPTION = "invalidates"
+
+
+class CacheBackend(ABC):
+    """Storage for cached values and per-table generation counters."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float | None) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int: ...
+
+    @abstractmethod
+    def get_counters(self, keys: list[str]) -> list[int]: ...
+
+    def stats(self) -> dict[str, int]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by both entry count and the pickled size of the values.
+
+    Values are kept pickled, like in redis, so every hit returns a fresh copy that callers may mutate.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float | None, bytes]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, raw = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return MISSING
+            self._entries.move_to_end(key)
+        return pickle.loads(raw)  # noqa: S301 - values are only written by this backend
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        raw = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(raw) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, raw)
+            self.current_bytes += len(raw)
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counters(self, keys: list[str]) -> list[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self.current_bytes, "evictions": self.evictions}
+
+    def _remove(self, key: str) -> None:
+        _, raw = self._entries.pop(key)
+        self.current_bytes -= len(raw)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend shared between worker processes.
+
+    Works with any client exposing the redis-py ``get``/``set``/``incr``/``mget``/``scan_iter``/``delete``
+    methods, so tests can pass a local stand-in instead of a real server.
+    """
+
+    def __init__(self, client, prefix: str = "igames:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as err:
+            raise RuntimeError("The redis cache backend requires the 'redis' package") from err
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)  # noqa: S301 - values are only written by this backend
+
+    def set(self, key: str, value: Any, ttl: float | None) -> None:
+        self.client.set(self.prefix + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=int(ttl) if ttl else None)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def get_counters(self, keys: list[str]) -> list[int]:
+        return [int(value or 0) for value in self.client.mget([self.prefix + key for key in keys])]
+
+
+def call_key(func: Callable, signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+    """Build a stable key from a service call, ignoring ``self`` and the database session."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    parts = []
+    for name, value in bound.arguments.items():
+        if name == "self" or isinstance(value, AsyncSession | Session):
+            continue
+        if isinstance(value, list | tuple | set | frozenset):
+            value = tuple(sorted(value)) if isinstance(value, set | frozenset) else tuple(value)
+        parts.append(f"{name}={value!r}")
+    arguments = ",".join(parts)
+    return f"{func.__module__}.{func.__qualname__}({arguments})"
+
+
+def pending_tables(args: tuple, kwargs: dict) -> set[str]:
+    """Tables written by the call's session in its still open transaction."""
+    for value in chain(args, kwargs.values()):
+        if isinstance(value, AsyncSession | Session):
+            return value.info.get(PENDING_TABLES_KEY, set())
+    return set()
+
+
+class QueryCache:
+    def __init__(self, backend: CacheBackend, enabled: bool = True, default_ttl: float | None = None) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    def versions(self, tables: Iterable[str]) -> tuple[int, ...]:
+        return tuple(self.backend.get_counters([VERSION_PREFIX + table for table in tables]))
+
+    def bump(self, *tables: str) -> None:
+        for table in tables:
+            self.backend.incr(VERSION_PREFIX + table)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, **self.backend.stats()}
+
+    def cached(self, *tables: str, ttl: float | None = None):
+        """Cache an async service method until a write to one of ``tables`` is committed.
+
+        The cached value is shared between requests, so it must not be an ORM instance bound to a session.
+        Calls whose session has uncommitted writes to ``tables`` bypass the cache, so they see their own writes
+        and never store them.
+        """
+
+        def decorator(func):
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled or not pending_tables(args, kwargs).isdisjoint(tables):
+                    return await func(*args, **kwargs)
+
+                key = f"{call_key(func, signature, args, kwargs)}@{self.versions(tables)}"
+                value = self.backend.get(key)
+                if value is not MISSING:
+                    self.hits += 1
+                    return value
+
+                self.misses += 1
+                value = await func(*args, **kwargs)
+                self.backend.set(key, value, ttl or self.default_ttl)
+                return value
+
+            return wrapper
+
+        return decorator
+
+
+def build_backend() -> CacheBackend:
+    if settings.cache_backend == "redis":
+        return RedisCacheBackend.from_url(settings.cache_redis_url)
+    return MemoryCacheBackend(max_entries=settings.cache_max_entries, max_bytes=settings.cache_max_bytes)
+
+
+query_cache = QueryCache(build_backend(), enabled=settings.cache_enabled, default_ttl=settings.cache_ttl_seconds)
+cached = query_cache.cached
+metrics.register("query_cache", query_cache.stats)
+
+
+def _mark_tables_written(session: Session, tables: set[str]) -> None:
+    # Versions only move once the write is committed: bumping at flush time would let other sessions cache
+    # the rows the transaction is about to replace under the new version.
+    if tables:
+        session.info.setdefault(PENDING_TABLES_KEY, set()).update(tables)
+
+
+def _bump_pending_tables(session: Session) -> None:
+    tables = session.info.pop(PENDING_TABLES_KEY, None)
+    if tables:
+        query_cache.bump(*tables)
+
+
+def _drop_pending_tables(session: Session) -> None:
+    session.info.pop(PENDING_TABLES_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session: Session, flush_context) -> None:
+    objects = chain(session.new, session.dirty, session.deleted)
+    _mark_tables_written(session, {object_mapper(obj).local_table.name for obj in objects})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_after_bulk_statement(orm_execute_state: ORMExecuteState) -> None:
+    # 2.0 style insert()/update()/delete() bypass the legacy after_bulk_* hooks, do_orm_execute sees them all
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    tables = orm_execute_state.execution_options.get(INVALIDATES_OPTION)
+    if tables is None:
+        table_name = getattr(orm_execute_state.statement.table, "name", None)
+        tables = (table_name,) if table_name else ()
+    _mark_tables_written(orm_execute_state.session, set(tables))
+
+
+event.listen(Session, "after_commit", _bump_pending_tables)
+event.listen(Session, "after_rollback", _drop_pending_tables)
@@ -0,0 +1,34 @@
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class CompiledCacheStats:
+    """How the statements of an engine got their SQL: from the compiled cache, compiled anew, or not cacheable.
+
+    SQLAlchemy records the outcome on every execution context, this counts them.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.outcomes: Counter[str] = Counter()
+        event.listen(engine, "after_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            self.outcomes[context.cache_hit.name.lower()] += 1
+
+    def snapshot(self) -> dict[str, int | float]:
+        hits = self.outcomes["cache_hit"]
+        misses = self.outcomes["cache_miss"]
+        # the engine's LRU of compiled statements, None when query_cache_size is 0
+        cache = self.engine._compiled_cache
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "uncacheable": sum(self.outcomes.values()) - hits - misses,
+            "entries": len(cache) if cache is not None else 0,
+            "capacity": cache.capacity if cache is not None else 0,
+        }
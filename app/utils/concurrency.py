@@ -0,0 +1,189 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.settings import settings
+from app.utils.deadline import remaining
+from app.utils.metrics import metrics
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# probes must answer while the service sheds load
+EXEMPT_PREFIXES = ("/health",)
+
+
+class OverloadedError(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """A concurrency limit with a bounded FIFO wait queue, adjusted by additive increase / multiplicative decrease.
+
+    The limit grows by about one per round trip while requests run at the limit and their latency stays within
+    ``tolerance`` times the no-load baseline, and shrinks by ``backoff`` once per round trip while it does not.
+    A request is refused up front when the queue is full or its predicted wait exceeds ``max_wait``, and after
+    ``max_wait`` in the queue. A request whose predicted wait exceeds what is left of its deadline is refused up
+    front as well, time in the queue counts against the deadline.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        max_wait: float,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+    ) -> None:
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.latency: float | None = None
+        self.baseline: float | None = None
+        self.admitted = 0
+        self.shed = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    def stats(self) -> dict[str, float | int | None]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "latency": self.latency,
+            "baseline": self.baseline,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+    def expected_wait(self, position: int) -> float:
+        return (position + 1) * (self.latency or 0.0) / max(self.limit, 1)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        left = remaining()
+        max_wait = self.max_wait if left is None else min(self.max_wait, left)
+        expected = self.expected_wait(len(self._waiters))
+        if len(self._waiters) >= self.max_queue or expected > max_wait:
+            self.shed += 1
+            raise OverloadedError(max(expected, self.latency or 0.0))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except TimeoutError:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                self.shed += 1
+                raise OverloadedError(self.max_wait) from None
+            # the slot was handed over while the timeout fired
+        except asyncio.CancelledError:
+            if waiter.done():
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        self.admitted += 1
+
+    def release(self, latency: float) -> None:
+        self._observe(latency, saturated=self.in_flight >= int(self.limit))
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _observe(self, latency: float, saturated: bool) -> None:
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        # the baseline follows drops at once and rises slowly, so it tracks the no-load latency
+        self.baseline = latency if self.baseline is None else min(latency, self.baseline * 1.01)
+
+        now = time.monotonic()
+        if self.latency > self.baseline * self.tolerance:
+            if now - self._last_decrease >= self.latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+def route_class(method: str, path: str) -> str | None:
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith("/auth"):
+        return "auth"
+    if method in WRITE_METHODS:
+        return "write"
+    return "read"
+
+
+class ConcurrencyLimitMiddleware:
+    """Admits requests through the limiter of their route class and answers ``503`` with ``Retry-After`` when it
+    sheds them.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: dict[str, AdaptiveLimiter]) -> None:
+        self.app = app
+        self.limiters = limiters
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = None
+        if scope["type"] == "http":
+            limiter = self.limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except OverloadedError as err:
+            response = JSONResponse(
+                {"detail": "Service overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(max(1, math.ceil(err.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+
+limiters = {
+    name: AdaptiveLimiter(
+        name,
+        initial_limit=initial_limit,
+        min_limit=settings.concurrency_min_limit,
+        max_limit=settings.concurrency_max_limits.get(name, initial_limit),
+        max_queue=settings.concurrency_queue_size,
+        max_wait=settings.concurrency_max_wait_seconds,
+        tolerance=settings.concurrency_latency_tolerance,
+    )
+    for name, initial_limit in settings.concurrency_limits.items()
+}
+metrics.register("concurrency", lambda: {name: limiter.stats() for name, limiter in limiters.items()})
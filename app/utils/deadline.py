@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.util import await_only
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLite checks the progress handler every this many virtual machine instructions
+SQLITE_PROGRESS_STEPS = 10_000
+PROGRESS_HANDLER_KEY = "deadline_progress_handler"
+QUERY_CANCELED = "57014"
+
+current_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceededError(Exception):
+    pass
+
+
+class DeadlineStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.exceeded: Counter[str] = Counter()
+        self.statement_timeouts = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "exceeded": sum(self.exceeded.values()),
+            "exceeded_by_route": dict(self.exceeded),
+            "statement_timeouts": self.statement_timeouts,
+        }
+
+
+deadline_stats = DeadlineStats()
+metrics.register("deadlines", deadline_stats.snapshot)
+
+
+def remaining() -> float | None:
+    deadline = current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def route_budget(path: str, budgets: dict[str, float], default: float | None) -> tuple[str, float | None]:
+    """The budget of the longest matching path prefix, with the prefix it was configured under."""
+    matches = [prefix for prefix in budgets if path.startswith(prefix)]
+    if not matches:
+        return "*", default
+    prefix = max(matches, key=len)
+    return prefix, budgets[prefix]
+
+
+@event.listens_for(Session, "after_begin")
+def _limit_transaction(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    """Bound every statement of a transaction begun under a request deadline by the budget left at its start."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError
+
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        if left is not None:
+            # SET LOCAL ends with the transaction, pooled connections never keep it
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(1, int(left * 1000))}")
+            deadline_stats.statement_timeouts += 1
+    elif dialect == "sqlite":
+        _set_sqlite_progress_handler(connection, None if left is None else current_deadline.get())
+
+
+def _set_sqlite_progress_handler(connection: Connection, deadline: float | None) -> None:
+    """Interrupt statements running past ``deadline``, SQLite has no statement timeout of its own."""
+    info = connection.connection.info
+    if deadline is None and not info.get(PROGRESS_HANDLER_KEY):
+        return
+    driver_connection = connection.connection.driver_connection
+    if not hasattr(driver_connection, "set_progress_handler"):
+        return
+
+    handler = None if deadline is None else (lambda: int(time.monotonic() > deadline))
+    # the handler runs on the aiosqlite thread, so it closes over the deadline rather than reading the context
+    await_only(driver_connection.set_progress_handler(handler, SQLITE_PROGRESS_STEPS))
+    info[PROGRESS_HANDLER_KEY] = handler is not None
+    if handler is not None:
+        deadline_stats.statement_timeouts += 1
+
+
+def is_deadline_error(err: Exception) -> bool:
+    """Errors of statements the database stopped for the deadline, they can arrive just before it passes."""
+    if isinstance(err, DeadlineExceededError):
+        return True
+    orig = getattr(err, "orig", None)
+    if isinstance(orig, sqlite3.OperationalError):
+        return getattr(orig, "sqlite_errorcode", None) == sqlite3.SQLITE_INTERRUPT
+    return getattr(orig, "sqlstate", None) == QUERY_CANCELED
+
+
+class DeadlineMiddleware:
+    """Gives each request the deadline budget of its route and answers ``504`` when the request overruns it.
+
+    The request is cancelled at the deadline, and the statements it runs are bounded by the database as well,
+    so a slow query gives its pool connection back instead of holding it until it completes.
+    """
+
+    def __init__(self, app: ASGIApp, budgets: dict[str, float], default: float | None) -> None:
+        self.app = app
+        self.budgets = budgets
+        self.default = default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route, budget = route_budget(scope["path"], self.budgets, self.default)
+        if not budget:
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        deadline_stats.requests += 1
+        deadline = time.monotonic() + budget
+        token = current_deadline.set(deadline)
+        try:
+            async with asyncio.timeout(budget):
+                await self.app(scope, receive, send_wrapper)
+        except Exception as err:
+            if response_started or not (time.monotonic() >= deadline or is_deadline_error(err)):
+                raise
+            deadline_stats.exceeded[route] += 1
+            logger.warning("%s %s exceeded its %ss deadline", scope["method"], scope["path"], budget)
+            response = JSONResponse({"detail": "Request deadline exceeded"}, status_code=504)
+            await response(scope, receive, send)
+        finally:
+            current_deadline.reset(token)
@@ -1,12 +1,16 @@
 from passlib.context import CryptContext
 
+from app.utils.tracing import traced
+
 password_context = CryptContext(schemes=["bcrypt"])
 
 
+@traced("password_hashing.hash")
 def generate_hashed_password(password: str) -> str:
     hashed_password = password_context.hash(password)
     return hashed_password
 
 
+@traced("password_hashing.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return password_context.verify(plain_password, hashed_password)
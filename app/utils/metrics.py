@@ -0,0 +1,18 @@
+from collections.abc import Callable
+from typing import Any
+
+
+class MetricsRegistry:
+    """Collects counters from components that register a snapshot callable under a name."""
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def register(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        self._sources[name] = source
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: source() for name, source in self._sources.items()}
+
+
+metrics = MetricsRegistry()
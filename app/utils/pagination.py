@@ -0,0 +1,31 @@
+from starlette.responses import Response
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+HAS_MORE_HEADER = "X-Has-More"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def split_page(items: list, limit: int) -> tuple[list, bool]:
+    """Split a ``limit + 1`` fetch into the page and whether anything follows it."""
+    return items[:limit], len(items) > limit
+
+
+def total_from_page(offset: int, page: list, has_more: bool) -> int | None:
+    """The exact total when the page is the last one, no count query needed."""
+    if not has_more and (page or offset == 0):
+        return offset + len(page)
+    return None
+
+
+def set_pagination_headers(response: Response, total: int, exact: bool, has_more: bool) -> None:
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    response.headers[TOTAL_COUNT_EXACT_HEADER] = "true" if exact else "false"
+    response.headers[HAS_MORE_HEADER] = "true" if has_more else "false"
+
+
+def set_cursor_headers(response: Response, next_cursor: int | None) -> None:
+    """Keyset pages have no total, only whether more follow and where the next page starts."""
+    response.headers[HAS_MORE_HEADER] = "true" if next_cursor is not None else "false"
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
@@ -0,0 +1,221 @@
+import cProfile
+import pstats
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.constants import ADMIN_ACCESS
+from app.db import async_session_maker
+from app.settings import settings
+from app.utils.auth import get_user_from_token
+from app.utils.metrics import metrics
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+STATEMENT_TEXT_LIMIT = 2000
+
+# (phase, filename fragment, function name fragment), the first match wins
+PHASES = (
+    ("orm_hydration", "sqlalchemy/orm/loading.py", ""),
+    ("validation", "~", "pydantic_core._pydantic_core.SchemaValidator"),
+    ("serialization", "~", "pydantic_core._pydantic_core.SchemaSerializer"),
+    ("serialization", "fastapi/encoders.py", ""),
+    ("serialization", "starlette/responses.py", "render"),
+    ("password_hashing", "passlib/", ""),
+    ("password_hashing", "bcrypt", ""),
+)
+
+_current: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.profiler = cProfile.Profile()
+        self.statements: list[dict[str, Any]] = []
+        self.started = 0.0
+        self.wall = 0.0
+        self._statement_started: list[float] = []
+
+    def statement_started(self) -> None:
+        self._statement_started.append(time.perf_counter())
+
+    def statement_finished(self, statement: str, rowcount: int) -> None:
+        duration = time.perf_counter() - self._statement_started.pop()
+        self.statements.append({"sql": statement[:STATEMENT_TEXT_LIMIT], "seconds": duration, "rows": rowcount})
+
+    def phases(self, stats: pstats.Stats) -> dict[str, float]:
+        """Wall seconds per phase, a phase counts a function only when no caller belongs to the same phase."""
+        phases = {"total": self.wall, "sql": sum(statement["seconds"] for statement in self.statements)}
+        for function, (_, _, _, cumulative, callers) in stats.stats.items():
+            phase = classify(function)
+            if phase is None or any(classify(caller) == phase for caller in callers):
+                continue
+            phases[phase] = phases.get(phase, 0.0) + cumulative
+        return phases
+
+    def report(self, top: int) -> dict[str, Any]:
+        stats = pstats.Stats(self.profiler)
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases(stats).items()},
+            "functions": [
+                {
+                    "function": pstats.func_std_string(function),
+                    "calls": calls,
+                    "own_seconds": round(own, 6),
+                    "cumulative_seconds": round(cumulative, 6),
+                }
+                for function, (_, calls, own, cumulative, _) in functions
+            ],
+            "statements": [{**statement, "seconds": round(statement["seconds"], 6)} for statement in self.statements],
+        }
+
+
+def classify(function: tuple[str, int, str]) -> str | None:
+    filename, _, name = function
+    for phase, filename_part, name_part in PHASES:
+        if filename_part in filename and name_part in name:
+            return phase
+    return None
+
+
+def server_timing(phases: dict[str, float], statements: int) -> str:
+    entries = []
+    for name, seconds in phases.items():
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if name == "sql":
+            entry += f';desc="{statements} statements"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class ProfileStore:
+    """The last ``size`` reports, in memory of the process that served the request."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.profiled = 0
+        self.busy = 0
+        self._reports: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def add(self, report: dict[str, Any]) -> None:
+        self._reports[report["id"]] = report
+        while len(self._reports) > self.size:
+            self._reports.popitem(last=False)
+        self.profiled += 1
+
+    def get(self, profile_id: str) -> dict[str, Any] | None:
+        return self._reports.get(profile_id)
+
+    def list(self) -> list[dict[str, Any]]:
+        return [
+            {"id": report["id"], "method": report["method"], "path": report["path"], "total": report["phases"]["total"]}
+            for report in reversed(self._reports.values())
+        ]
+
+    def stats(self) -> dict[str, int]:
+        return {"profiled": self.profiled, "busy": self.busy, "kept": len(self._reports)}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.statement_started()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.statement_finished(statement, cursor.rowcount)
+
+
+def _listen_to_statements() -> None:
+    # registered on the first profiled request, so unprofiled processes pay nothing per statement
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def is_admin(authorization: str | None) -> bool:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    async with async_session_maker() as db:
+        user = await get_user_from_token(token, db)
+        return user is not None and user.role.name in ADMIN_ACCESS
+
+
+profile_store = ProfileStore(settings.profiling_reports_kept)
+metrics.register("profiling", profile_store.stats)
+
+
+class ProfilingMiddleware:
+    """Profiles a single request when an admin sends the profiling header.
+
+    The response carries a ``Server-Timing`` header with the time per phase and an ``X-Profile-Id`` whose full
+    report (hottest functions, phases, SQL statements) is served at ``/admin/profiles/{id}``. Requests without
+    the header only pay for the header lookup. cProfile sees everything the event loop runs, so one request is
+    profiled at a time and concurrent work shows up in its report.
+    """
+
+    def __init__(self, app: ASGIApp, header: str, top_functions: int, store: ProfileStore = profile_store) -> None:
+        self.app = app
+        self.header = header.lower()
+        self.top_functions = top_functions
+        self.store = store
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if self.header not in headers or not await is_admin(headers.get("authorization")):
+            await self.app(scope, receive, send)
+            return
+        if self._active:
+            self.store.busy += 1
+            await self.app(scope, receive, send)
+            return
+
+        _listen_to_statements()
+        profile = RequestProfile(scope["method"], scope["path"])
+        messages: list[Message] = []
+
+        # ASGI awaits send, so the buffer stays a coroutine function though it never suspends
+        async def buffer(message: Message) -> None:  # noqa: RUF029
+            messages.append(message)
+
+        self._active = True
+        token = _current.set(profile)
+        profile.started = time.perf_counter()
+        profile.profiler.enable()
+        try:
+            await self.app(scope, receive, buffer)
+        finally:
+            profile.profiler.disable()
+            profile.wall = time.perf_counter() - profile.started
+            _current.reset(token)
+            self._active = False
+
+        report = profile.report(self.top_functions)
+        self.store.add(report)
+        start, *body = messages
+        response_headers = MutableHeaders(raw=start["headers"])
+        response_headers.append("Server-Timing", server_timing(report["phases"], len(profile.statements)))
+        response_headers[PROFILE_ID_HEADER] = profile.id
+        await send(start)
+        for message in body:
+            await send(message)
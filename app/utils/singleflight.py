@@ -0,0 +1,76 @@
+import asyncio
+import functools
+import inspect
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.utils.cache import call_key
+from app.utils.metrics import metrics
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one in-flight execution and its result."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        metrics.register(f"singleflight.{name}", self.stats)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # the leader was cancelled, not us: retry and possibly become the new leader
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+            self.coalesced += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        # followers may never look at a failed result
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def coalesce(self, func):
+        """Decorator for async service methods, keyed like the query cache (ignoring ``self`` and the session)."""
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = call_key(func, signature, args, kwargs)
+            return await self.do(key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+
+game_list_flight = SingleFlight("game_list")
+recommendations_flight = SingleFlight("recommendations")
+user_lookup_flight = SingleFlight("user_lookup")
@@ -0,0 +1,81 @@
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+from app.settings import settings
+from app.utils.metrics import metrics
+
+
+class TokenCache:
+    """Verified JWT claims by token digest, so a token sent again skips the signature check and claims parsing.
+
+    Entries expire at the token's ``exp``. Only tokens that passed verification are stored, so random tokens never
+    take a slot, and the LRU bound and the token length limit cap the memory valid tokens can take.
+    """
+
+    def __init__(self, max_entries: int, max_token_length: int) -> None:
+        self.max_entries = max_entries
+        self.max_token_length = max_token_length
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._entries: OrderedDict[bytes, tuple[float, Mapping[str, Any]]] = OrderedDict()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Mapping[str, Any] | None:
+        if not self.max_entries or len(token) > self.max_token_length:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Store the verified claims of ``token``, read-only since every later request shares them."""
+        claims = MappingProxyType(dict(claims))
+        expires_at = claims.get("exp")
+        # tokens without an expiry would stay valid for as long as they are cached
+        if not self.max_entries or len(token) > self.max_token_length or not isinstance(expires_at, int | float):
+            return claims
+        key = self._key(token)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return claims
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+token_cache = TokenCache(settings.jwt_cache_size, settings.jwt_cache_max_token_length)
+metrics.register("jwt_cache", token_cache.stats)
@@ -0,0 +1,403 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import re
+import secrets
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.settings import settings
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+STATEMENT_TEXT_LIMIT = 2000
+# span kinds as numbered by OTLP
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_current_span: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+
+
+def new_trace_id() -> str:
+    return f"{secrets.randbits(128):032x}"
+
+
+def new_span_id() -> str:
+    return f"{secrets.randbits(64):016x}"
+
+
+@dataclass(slots=True)
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    kind: str = "internal"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def child(self, name: str, kind: str = "internal", **attributes: Any) -> "Span":
+        return Span(self.trace_id, new_span_id(), self.span_id, name, kind, attributes=attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": 2, "message": self.error}
+        return span
+
+
+def otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Trace id, parent span id and sampled flag of a W3C ``traceparent`` header."""
+    match = TRACEPARENT.match(value or "")
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def format_traceparent(trace_id: str, span_id: str, sampled: bool) -> str:
+    flags = "01" if sampled else "00"
+    return f"00-{trace_id}-{span_id}-{flags}"
+
+
+class SpanExporter(Protocol):
+    async def export(self, spans: list[Span]) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class FileSpanExporter:
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+
+    async def export(self, spans: list[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write(lines)
+
+    async def close(self) -> None:
+        pass
+
+
+class OTLPSpanExporter:
+    """Posts spans as OTLP/HTTP JSON, which collectors accept at ``/v1/traces``."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5) -> None:
+        self.endpoint = endpoint
+        self.resource = {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]}
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, spans: list[Span]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": self.resource,
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+                }
+            ]
+        }
+        response = await self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class Tracer:
+    """Collects the spans of sampled requests in memory and hands them to the exporters in batches.
+
+    A request is sampled when its ``traceparent`` says so, or, without a sampled parent, for ``sample_rate`` of
+    the trace ids. Outside a sampled request a span costs one context variable lookup.
+    """
+
+    def __init__(self, sample_rate: float, max_queued: int, exporters: list[SpanExporter]) -> None:
+        self.sample_rate = sample_rate
+        self.max_queued = max_queued
+        self.exporters = exporters
+        self.queue: deque[Span] = deque()
+        self.sampled = 0
+        self.unsampled = 0
+        self.exported = 0
+        self.dropped = 0
+        self.export_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "sample_rate": self.sample_rate,
+            "sampled": self.sampled,
+            "unsampled": self.unsampled,
+            "queued": len(self.queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "export_failures": self.export_failures,
+        }
+
+    def should_sample(self, trace_id: str, parent_sampled: bool | None) -> bool:
+        if parent_sampled is not None:
+            return parent_sampled
+        # ratio of the random trace id bits, so every service sampling by id agrees on the same traces
+        return int(trace_id[16:], 16) < self.sample_rate * 2**64
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span | None]:
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = parent.child(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.error = repr(err)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if len(self.queue) >= self.max_queued:
+            self.dropped += 1
+            return
+        self.queue.append(span)
+
+    async def export(self) -> None:
+        spans = list(self.queue)
+        self.queue.clear()
+        if not spans:
+            return
+        for exporter in self.exporters:
+            try:
+                await exporter.export(spans)
+            except Exception:
+                self.export_failures += 1
+                logger.exception("Span export to %s failed", type(exporter).__name__)
+        self.exported += len(spans)
+
+    async def run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.export()
+
+    async def close(self) -> None:
+        await self.export()
+        for exporter in self.exporters:
+            await exporter.close()
+
+
+def build_exporters() -> list[SpanExporter]:
+    exporters: list[SpanExporter] = []
+    if settings.tracing_file_path:
+        exporters.append(FileSpanExporter(settings.tracing_file_path))
+    if settings.tracing_otlp_endpoint:
+        exporters.append(OTLPSpanExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name))
+    return exporters
+
+
+tracer = Tracer(settings.tracing_sample_rate, settings.tracing_max_queued_spans, build_exporters())
+metrics.register("tracing", tracer.stats)
+
+
+def traced(name: str | None = None) -> Callable[[Callable], Callable]:
+    """Runs the function in a span of its own when called within a sampled request."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(cls: type) -> type:
+    """Traces every public method of a service class, spans are named ``Class.method``."""
+    for attribute, value in list(vars(cls).items()):
+        if not attribute.startswith("_") and inspect.isfunction(value):
+            setattr(cls, attribute, traced(f"{cls.__name__}.{attribute}")(value))
+    return cls
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    parent = _current_span.get()
+    if parent is not None and context is not None:
+        context.trace_span = parent.child(
+            "sql", "client", **{"db.system": conn.dialect.name, "db.statement": statement[:STATEMENT_TEXT_LIMIT]}
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = getattr(context, "trace_span", None)
+    if span is not None:
+        span.attributes["db.rows"] = cursor.rowcount
+        tracer.finish(span)
+        context.trace_span = None
+
+
+def _handle_error(exception_context) -> None:
+    span = getattr(exception_context.execution_context, "trace_span", None)
+    if span is not None:
+        span.error = repr(exception_context.original_exception)
+        tracer.finish(span)
+        exception_context.execution_context.trace_span = None
+
+
+def listen_to_statements() -> None:
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def _traced_route(app: ASGIApp, name: str, route: str) -> ASGIApp:
+    async def traced_app(scope: Scope, receive: Receive, send: Send) -> None:
+        if _current_span.get() is None:
+            await app(scope, receive, send)
+            return
+        with tracer.span(name, **{"http.route": route}):
+            await app(scope, receive, send)
+
+    return traced_app
+
+
+def instrument_routes(app: FastAPI) -> None:
+    """Gives each route handler, with its dependencies and response serialization, a span of its own."""
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            route.app = _traced_route(route.app, f"route {route.name}", route.path)
+
+
+class TracingMiddleware:
+    """Opens the server span of each request and answers with its ``traceparent``.
+
+    An incoming ``traceparent`` makes the request part of the caller's trace and decides its sampling.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer = tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = parse_traceparent(Headers(scope=scope).get(TRACEPARENT_HEADER))
+        trace_id, parent_id, parent_sampled = parent or (new_trace_id(), None, None)
+        sampled = self.tracer.should_sample(trace_id, parent_sampled)
+        method, path = scope["method"], scope["path"]
+        span = Span(
+            trace_id,
+            new_span_id(),
+            parent_id,
+            f"{method} {path}",
+            "server",
+            attributes={"http.method": method, "http.target": path},
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers[TRACEPARENT_HEADER] = format_traceparent(trace_id, span.span_id, sampled)
+            await send(message)
+
+        if not sampled:
+            self.tracer.unsampled += 1
+            await self.app(scope, receive, send_wrapper)
+            return
+
+        self.tracer.sampled += 1
+        token = _current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as err:
+            span.error = repr(err)
+            raise
+        finally:
+            _current_span.reset(token)
+            if (route := scope.get("route")) is not None and hasattr(route, "path"):
+                span.name = f"{method} {route.path}"
+            self.tracer.finish(span)
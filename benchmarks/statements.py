@@ -0,0 +1,161 @@
+"""Statement construction micro-benchmark.
+
+Runs the hot service queries against an in-memory SQLite database twice: with the statement built anew on
+every call, as the services used to, and with the prebuilt statements they execute with bound parameters.
+The difference in CPU time per call is what building and cache-keying the statement costs each request.
+
+    python -m benchmarks.statements --iterations 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+Query = Callable[[object, int], Awaitable[object]]
+
+GAMES = 50
+
+
+def configure_environment() -> None:
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("JWT_ALGORITHM", "HS256")
+    os.environ.setdefault("JWT_EXPIRE_MINUTES", "60")
+
+
+def build_cases() -> dict[str, tuple[Query, Query]]:
+    """Per query, the statement built on every call and the prebuilt one, executed the same way."""
+    from sqlalchemy import bindparam, select
+    from sqlalchemy.orm import selectinload
+
+    from app.models import Game, User, UserLikedGenres
+    from app.schemas.game import GameSortField
+    from app.services.game import GAME_EXISTS, fetch_game_cards, game_card_columns, game_card_statement
+    from app.services.user import USER_BY_ID
+
+    async def user_rebuilt(db, i):
+        statement = (
+            select(User)
+            .options(selectinload(User.role), selectinload(User.liked_genres).selectinload(UserLikedGenres.genre))
+            .where(User.id == 1)
+        )
+        return (await db.execute(statement)).scalar_one()
+
+    async def user_prebuilt(db, i):
+        return (await db.execute(USER_BY_ID, {"user_id": 1})).scalar_one()
+
+    async def page_rebuilt(db, i):
+        offset = i % GAMES
+        statement = (
+            select(*game_card_columns(db.get_bind().dialect.name))
+            .order_by(Game.rating.desc(), Game.id)
+            .limit(10)
+            .offset(offset)
+        )
+        return await fetch_game_cards(db, statement)
+
+    async def page_prebuilt(db, i):
+        statement = game_card_statement(
+            db,
+            ("page", GameSortField.rating),
+            lambda cards: (
+                cards.order_by(Game.rating.desc(), Game.id).limit(bindparam("limit")).offset(bindparam("offset"))
+            ),
+        )
+        return await fetch_game_cards(db, statement, {"limit": 10, "offset": i % GAMES})
+
+    async def exists_rebuilt(db, i):
+        return (await db.execute(select(Game.id).where(Game.id == i % GAMES + 1))).scalar_one_or_none()
+
+    async def exists_prebuilt(db, i):
+        return (await db.execute(GAME_EXISTS, {"game_id": i % GAMES + 1})).scalar_one_or_none()
+
+    return {
+        "user_by_id": (user_rebuilt, user_prebuilt),
+        "games_page": (page_rebuilt, page_prebuilt),
+        "game_exists": (exists_rebuilt, exists_prebuilt),
+    }
+
+
+async def seed(engine) -> None:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.db import Base
+    from app.models import Game, GameGenre, Genre, Role, User, UserLikedGenres
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        genres = [Genre(id=index, name=f"Genre {index}") for index in range(1, 4)]
+        games = [
+            Game(
+                id=index,
+                title=f"Game {index}",
+                rating=index % 5,
+                times_listed=0,
+                reviews_number=0,
+                plays=0,
+                playing=0,
+                backlogs=0,
+                whitelist=0,
+            )
+            for index in range(1, GAMES + 1)
+        ]
+        db.add_all([Role(id=1, name="admin"), User(id=1, username="bench", password_hash="-", role_id=1)])  # noqa: S106
+        db.add_all(genres + games)
+        await db.flush()
+        db.add_all([UserLikedGenres(user_id=1, genre_id=genre.id) for genre in genres])
+        db.add_all([GameGenre(game_id=game.id, genre_id=game.id % 3 + 1) for game in games])
+        await db.commit()
+
+
+async def measure(db, query: Query, iterations: int, warmup: int) -> float:
+    """CPU seconds per call, across the event loop and the driver thread."""
+    for i in range(warmup):
+        await query(db, i)
+    started = time.process_time()
+    for i in range(iterations):
+        await query(db, i)
+    return (time.process_time() - started) / iterations
+
+
+async def run(iterations: int, warmup: int) -> tuple[list[tuple[str, float, float]], dict]:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.db import async_engine, compiled_cache_stats
+
+    await seed(async_engine)
+    results = []
+    async with AsyncSession(async_engine) as db:
+        for name, (rebuilt, prebuilt) in build_cases().items():
+            results.append((
+                name,
+                await measure(db, rebuilt, iterations, warmup),
+                await measure(db, prebuilt, iterations, warmup),
+            ))
+            db.expunge_all()
+    return results, compiled_cache_stats.snapshot()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the CPU prebuilt statements save per call.")
+    parser.add_argument("--iterations", default=2000, type=int)
+    parser.add_argument("--warmup", default=100, type=int)
+    args = parser.parse_args(argv)
+
+    configure_environment()
+    results, compiled_cache = asyncio.run(run(args.iterations, args.warmup))
+    header = "query".ljust(14) + "rebuilt us".rjust(12) + "prebuilt us".rjust(13) + "saved us".rjust(10)
+    print(header + "saved".rjust(8))
+    for name, rebuilt, prebuilt in results:
+        saved = rebuilt - prebuilt
+        print(f"{name:<14}{rebuilt * 1e6:>12.1f}{prebuilt * 1e6:>13.1f}{saved * 1e6:>10.1f}{saved / rebuilt:>8.1%}")
+    print(f"compiled cache: {compiled_cache}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
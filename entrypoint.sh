@@ -18,5 +18,11 @@ python -m app.scripts.seed_games || { echo "Seed games failed!"; exit 1; }
 echo "Seeding database with users..."
 python -m app.scripts.seed_users || { echo "Seed users failed!"; exit 1; }
 
+echo "Computing game scores..."
+python -m app.scripts.compute_scores || { echo "Compute scores failed!"; exit 1; }
+
+echo "Building similar games..."
+python -m app.scripts.build_similar_games || { echo "Build similar games failed!"; exit 1; }
+
 echo "Starting app server..."
 exec uvicorn app.main:app --host 0.0.0.0 --port 8000
@@ -1,20 +1,31 @@
+import hashlib
 from collections.abc import AsyncGenerator
+from pathlib import Path
 from unittest.mock import AsyncMock
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import insert
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from app.db import Base, get_async_session
 from app.main import app
 from app.models import Role, User
+from app.scripts.seed_games import CSV_FILE_PATH, load_data
 from app.utils.auth import generate_jwt_token
+from app.utils.cache import query_cache
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=True, future=True)
+test_engine = create_async_engine(TEST_DATABASE_URL, echo=False, future=True)
 AsyncTestSessionLocal = sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+# built once per session and copied over the test database, so each test starts from a known state
+schema_snapshot_engine = create_async_engine(TEST_DATABASE_URL, future=True)
+catalog_snapshot_engine = create_async_engine(TEST_DATABASE_URL, future=True)
 
 
 async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -22,30 +33,72 @@ async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def copy_database(source_engine: AsyncEngine, target_engine: AsyncEngine) -> None:
+    """Replace the target database with the source through the SQLite backup API.
+
+    The cost depends on the size of the source alone, not on the tables or on what earlier tests wrote.
+    """
+    async with source_engine.connect() as source, target_engine.connect() as target:
+        source_connection = (await source.get_raw_connection()).driver_connection
+        target_connection = (await target.get_raw_connection()).driver_connection
+        await source_connection.backup(target_connection)
+
+
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def prepare_database() -> None:
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    async with schema_snapshot_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-
-    async with AsyncTestSessionLocal() as session:
-        roles = [Role(id=1, name="admin"), Role(id=2, name="editor")]
-        session.add_all(roles)
-        await session.commit()
+        await conn.execute(
+            insert(Role), [{"id": 1, "name": "admin"}, {"id": 2, "name": "editor"}, {"id": 3, "name": "user"}]
+        )
+
+
+def catalog_digest() -> str:
+    """Changes with the CSV and the schema, either makes a cached catalog snapshot stale."""
+    digest = hashlib.sha256(Path(CSV_FILE_PATH).read_bytes())
+    dialect = sqlite.dialect()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()[:16]
+
+
+@pytest_asyncio.fixture(scope="session")
+async def catalog_snapshot(request: pytest.FixtureRequest, prepare_database: None) -> AsyncEngine:
+    """The schema seeded with the CSV catalog. Seeding takes seconds, so the result is kept in the pytest cache."""
+    path = request.config.cache.mkdir("catalog_snapshot") / f"{catalog_digest()}.sqlite3"
+    file_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    try:
+        if path.exists():
+            await copy_database(file_engine, catalog_snapshot_engine)
+            return catalog_snapshot_engine
+
+        await copy_database(schema_snapshot_engine, catalog_snapshot_engine)
+        session_maker = sessionmaker(catalog_snapshot_engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as session:
+            await load_data(session, CSV_FILE_PATH)
+        await copy_database(catalog_snapshot_engine, file_engine)
+        return catalog_snapshot_engine
+    finally:
+        await file_engine.dispose()
 
 
 @pytest_asyncio.fixture(scope="function", autouse=True)
 async def clean_db():
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    async with AsyncTestSessionLocal() as session:
-        roles = [Role(id=1, name="admin"), Role(id=2, name="editor"), Role(id=3, name="user")]
-        session.add_all(roles)
-        await session.commit()
+    await copy_database(schema_snapshot_engine, test_engine)
+    # the copy bypasses the ORM hooks that invalidate the query cache
+    query_cache.clear()
     yield
 
 
+@pytest_asyncio.fixture
+async def seeded_catalog(clean_db: None, catalog_snapshot: AsyncEngine) -> None:
+    """The full CSV catalog, seeded once per session and restored for each test that asks for it."""
+    await copy_database(catalog_snapshot, test_engine)
+    query_cache.clear()
+
+
 @pytest_asyncio.fixture
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncTestSessionLocal() as session:
@@ -0,0 +1,49 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.services.jobs import JobRunner
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_as_admin(authenticated_admin_client: AsyncClient):
+    response = await authenticated_admin_client.get("/admin/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert "query_cache" in data
+    assert data["singleflight.user_lookup"]["calls"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_forbidden_for_editor(authenticated_editor_client: AsyncClient):
+    response = await authenticated_editor_client.get("/admin/metrics")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_enqueue_and_poll_job(authenticated_admin_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr("app.routers.admin.job_runner", JobRunner(10, 1, {}, 1))
+    response = await authenticated_admin_client.post("/admin/jobs", json={"type": "compute_scores"})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = response.json()
+    job_id = job["id"]
+    assert job["status"] == "queued"
+
+    response = await authenticated_admin_client.get(f"/admin/jobs/{job_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["type"] == "compute_scores"
+
+    response = await authenticated_admin_client.get("/admin/jobs", params={"status": "queued"})
+    assert [item["id"] for item in response.json()] == [job_id]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_unknown_job_type(authenticated_admin_client: AsyncClient):
+    response = await authenticated_admin_client.post("/admin/jobs", json={"type": "missing"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_get_job_not_found(authenticated_admin_client: AsyncClient):
+    response = await authenticated_admin_client.get("/admin/jobs/999")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -5,7 +5,7 @@ import pytest
 from fastapi import status
 from httpx import AsyncClient
 
-from app.models import Game, GameGenre, Genre, UserLikedGenres
+from app.models import Game, GameGenre, Genre, SimilarGame, UserLikedGenres
 
 
 @pytest.mark.asyncio
@@ -79,11 +79,239 @@ async def test_get_game_recommendations_success(authenticated_editor_client: Asy
 
 
 @pytest.mark.asyncio
-async def test_get_game_recommendations_no_liked_genres(authenticated_editor_client: AsyncClient):
+async def test_get_game_recommendations_no_liked_genres(authenticated_editor_client: AsyncClient, db_session):
+    db_session.add_all([
+        Game(
+            title=title,
+            rating=rating,
+            score=score,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for title, rating, score in (("High Rating", 4.9, 0.2), ("High Score", 3.5, 0.9))
+    ])
+    await db_session.commit()
+
     with patch("app.services.user.UserService.get_user_liked_genre_ids", new_callable=AsyncMock) as mock_method:
         mock_method.return_value = []
         response = await authenticated_editor_client.get("/games/recommendations")
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert isinstance(data, list)
-        assert data == []
+        assert [game["title"] for game in response.json()] == ["High Score", "High Rating"]
+        assert response.headers["x-total-count"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_get_games_sorted_by_score(authenticated_editor_client: AsyncClient, db_session):
+    db_session.add_all([
+        Game(
+            title="High Rating",
+            rating=4.9,
+            score=0.2,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        ),
+        Game(
+            title="High Score",
+            rating=3.5,
+            score=0.9,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        ),
+    ])
+    await db_session.commit()
+
+    response = await authenticated_editor_client.get("/games/", params={"sort": "score"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [game["title"] for game in response.json()] == ["High Score", "High Rating"]
+
+    response = await authenticated_editor_client.get("/games/")
+    assert [game["title"] for game in response.json()] == ["High Rating", "High Score"]
+
+
+@pytest.mark.asyncio
+async def test_get_games_pagination_headers(authenticated_editor_client: AsyncClient, db_session):
+    db_session.add_all([
+        Game(
+            title=f"Game {index}",
+            rating=index,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for index in range(3)
+    ])
+    await db_session.commit()
+
+    response = await authenticated_editor_client.get("/games/", params={"limit": 2})
+    assert len(response.json()) == 2
+    assert response.headers["x-has-more"] == "true"
+    assert response.headers["x-total-count"] == "3"
+    assert response.headers["x-total-count-exact"] == "false"
+
+    response = await authenticated_editor_client.get("/games/", params={"limit": 2, "exact_total": True})
+    assert response.headers["x-total-count-exact"] == "true"
+
+    response = await authenticated_editor_client.get("/games/", params={"limit": 2, "offset": 2})
+    assert len(response.json()) == 1
+    assert response.headers["x-has-more"] == "false"
+    assert response.headers["x-total-count"] == "3"
+    assert response.headers["x-total-count-exact"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_get_game_recommendations_pagination_headers(
+    authenticated_editor_client: AsyncClient, db_session, editor_user
+):
+    genres = [Genre(name=name) for name in ("RPG", "Strategy", "Puzzle")]
+    games = [
+        Game(
+            title=f"Game {index}",
+            rating=index,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for index in range(3)
+    ]
+    db_session.add_all([*genres, *games])
+    await db_session.flush()
+    db_session.add_all(
+        [UserLikedGenres(user_id=editor_user.id, genre_id=genre.id) for genre in genres]
+        + [GameGenre(game_id=game.id, genre_id=genres[0].id) for game in games]
+        + [GameGenre(game_id=games[0].id, genre_id=genres[1].id)]
+    )
+    await db_session.commit()
+
+    response = await authenticated_editor_client.get("/games/recommendations", params={"limit": 1})
+    assert response.headers["x-has-more"] == "true"
+    # Game 0 is in two liked genres and counted twice, the estimate is capped at the catalog size
+    assert response.headers["x-total-count"] == "3"
+    assert response.headers["x-total-count-exact"] == "false"
+
+    response = await authenticated_editor_client.get("/games/recommendations", params={"limit": 1, "exact_total": True})
+    assert response.headers["x-total-count"] == "3"
+    assert response.headers["x-total-count-exact"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_get_similar_games(authenticated_editor_client: AsyncClient, db_session):
+    games = [
+        Game(title=title, rating=4.0, times_listed=0, reviews_number=0, plays=0, playing=0, backlogs=0, whitelist=0)
+        for title in ("Original", "Similar")
+    ]
+    db_session.add_all(games)
+    await db_session.flush()
+    db_session.add(SimilarGame(game_id=games[0].id, rank=1, similar_game_id=games[1].id, similarity=0.9))
+    await db_session.commit()
+
+    response = await authenticated_editor_client.get(f"/games/{games[0].id}/similar")
+    assert response.status_code == status.HTTP_200_OK
+    assert [game["id"] for game in response.json()] == [games[1].id]
+
+    response = await authenticated_editor_client.get(f"/games/{games[1].id}/similar")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_get_similar_games_not_found(authenticated_editor_client: AsyncClient):
+    response = await authenticated_editor_client.get("/games/999999/similar")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_create_review_updates_running_rating(authenticated_editor_client: AsyncClient, db_session):
+    game = Game(
+        title="Reviewed",
+        rating=4.0,
+        rating_sum=8.0,
+        rating_count=2,
+        times_listed=0,
+        reviews_number=2,
+        plays=0,
+        playing=0,
+        backlogs=0,
+        whitelist=0,
+    )
+    db_session.add(game)
+    await db_session.commit()
+
+    response = await authenticated_editor_client.post(f"/games/{game.id}/reviews", json={"review": "Meh", "score": 1})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["score"] == 1
+
+    response = await authenticated_editor_client.post(f"/games/{game.id}/reviews", json={"review": "No score"})
+    assert response.status_code == status.HTTP_201_CREATED
+
+    await db_session.refresh(game)
+    assert game.rating == 3.0
+    assert (game.rating_count, game.reviews_number) == (3, 4)
+
+    response = await authenticated_editor_client.get("/games/")
+    assert response.json()[0]["game_reviews"] == ["Meh", "No score"]
+
+
+@pytest.mark.asyncio
+async def test_create_review_validation(authenticated_editor_client: AsyncClient):
+    response = await authenticated_editor_client.post("/games/999/reviews", json={"score": 3})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await authenticated_editor_client.post("/games/999/reviews", json={})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await authenticated_editor_client.post("/games/999/reviews", json={"score": 7})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_create_reviews_in_bulk(
+    authenticated_admin_client: AsyncClient, authenticated_editor_client: AsyncClient, db_session
+):
+    games = [
+        Game(title=title, rating=0, times_listed=0, reviews_number=0, plays=0, playing=0, backlogs=0, whitelist=0)
+        for title in ("First", "Second")
+    ]
+    db_session.add_all(games)
+    await db_session.commit()
+
+    reviews = [
+        {"game_id": games[0].id, "score": 5},
+        {"game_id": games[0].id, "score": 4},
+        {"game_id": games[1].id, "review": "Text only"},
+    ]
+    response = await authenticated_editor_client.post("/games/reviews", json=reviews)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    response = await authenticated_admin_client.post("/games/reviews", json=reviews)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {"created": 3}
+
+    for game in games:
+        await db_session.refresh(game)
+    assert (games[0].rating, games[0].reviews_number) == (4.5, 2)
+    assert (games[1].rating, games[1].reviews_number) == (0, 1)
+
+    response = await authenticated_editor_client.get("/games/")
+    assert response.status_code == status.HTTP_200_OK
+    assert {game["title"]: game["game_reviews"] for game in response.json()} == {"First": [], "Second": ["Text only"]}
+
+    response = await authenticated_admin_client.post("/games/reviews", json=[{"game_id": 999, "score": 1}])
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,72 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game, GameGenre, Genre
+
+
+async def create_genres(db_session) -> tuple[Genre, Genre, list[Game]]:
+    action, puzzle = Genre(name="Action"), Genre(name="Puzzle")
+    games = [
+        Game(
+            title=f"Game {rating}",
+            rating=rating,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for rating in (1.0, 2.0, 3.0, 4.0, 5.0)
+    ]
+    db_session.add_all([action, puzzle, *games])
+    await db_session.flush()
+    db_session.add_all([GameGenre(game_id=game.id, genre_id=action.id) for game in games])
+    await db_session.commit()
+    return action, puzzle, games
+
+
+@pytest.mark.asyncio
+async def test_get_genres(authenticated_editor_client: AsyncClient, db_session):
+    action, puzzle, _ = await create_genres(db_session)
+
+    response = await authenticated_editor_client.get("/genres/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"id": action.id, "name": "Action", "games_count": 5, "average_rating": 3.0},
+        {"id": puzzle.id, "name": "Puzzle", "games_count": 0, "average_rating": None},
+    ]
+    assert response.headers["X-Total-Count"] == "2"
+
+    response = await authenticated_editor_client.get("/genres/", params={"limit": 1, "offset": 1})
+    assert [genre["name"] for genre in response.json()] == ["Puzzle"]
+    assert response.headers["X-Has-More"] == "false"
+
+
+@pytest.mark.asyncio
+async def test_get_genre_games_keyset_pages(authenticated_editor_client: AsyncClient, db_session):
+    action, puzzle, games = await create_genres(db_session)
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await authenticated_editor_client.get(f"/genres/{action.id}/games", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(game["id"] for game in response.json())
+        if response.headers["X-Has-More"] == "false":
+            assert "X-Next-Cursor" not in response.headers
+            break
+        params["after"] = response.headers["X-Next-Cursor"]
+    assert seen == [game.id for game in games]
+
+    response = await authenticated_editor_client.get(f"/genres/{puzzle.id}/games")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_get_genre_games_not_found(authenticated_editor_client: AsyncClient):
+    response = await authenticated_editor_client.get("/genres/999/games")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Genre not found"
@@ -0,0 +1,68 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.db import get_async_session
+from app.main import app
+from app.services.autocomplete import TitleIndexService
+from app.services.genre_affinity import GenreAffinityService
+from app.services.leaderboard import LeaderboardService
+from app.services.warmup import WarmupService
+from tests.conftest import AsyncTestSessionLocal, override_get_async_session, test_engine
+
+
+@pytest.fixture
+def fresh_warmup(monkeypatch) -> WarmupService:
+    service = WarmupService()
+    monkeypatch.setattr("app.routers.health.warmup", service)
+    # keep the process-wide snapshots out of the warm-up
+    monkeypatch.setattr("app.services.warmup.leaderboard", LeaderboardService(10, 10))
+    monkeypatch.setattr("app.services.warmup.genre_affinity", GenreAffinityService())
+    monkeypatch.setattr("app.services.warmup.title_index", TitleIndexService())
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    yield service
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_live(async_client: AsyncClient):
+    response = await async_client.get("/health/live")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "alive"}
+
+
+@pytest.mark.asyncio
+async def test_ready_held_back_until_warmup_finishes(async_client: AsyncClient, fresh_warmup: WarmupService):
+    response = await async_client.get("/health/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["status"] == "warming_up"
+
+    await fresh_warmup.run(test_engine, AsyncTestSessionLocal)
+
+    response = await async_client.get("/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+    warmup = response.json()["warmup"]
+    assert warmup["ready"] is True
+    assert warmup["attempts"] == 1
+    assert set(warmup["steps"]) == {"connections", "statements", "lookups", "pages"}
+
+
+@pytest.mark.asyncio
+async def test_warmup_retries_failed_attempts(fresh_warmup: WarmupService, monkeypatch):
+    calls = []
+    warm_up = fresh_warmup.warm_up
+
+    async def flaky_warm_up(engine, session_maker):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("database is starting")
+        await warm_up(engine, session_maker)
+
+    monkeypatch.setattr(fresh_warmup, "warm_up", flaky_warm_up)
+    monkeypatch.setattr("app.services.warmup.asyncio.sleep", AsyncMock())
+    await fresh_warmup.run(test_engine, AsyncTestSessionLocal)
+    assert fresh_warmup.ready
+    assert fresh_warmup.attempts == 2
+    assert fresh_warmup.error is None
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game, GameTeam, Team
+
+
+@pytest.mark.asyncio
+async def test_get_teams_and_team_games(authenticated_editor_client: AsyncClient, db_session):
+    nintendo, sega = Team(name="Nintendo"), Team(name="Sega")
+    games = [
+        Game(title=title, rating=rating, times_listed=0, reviews_number=0, plays=0, playing=0, backlogs=0, whitelist=0)
+        for title, rating in (("Zelda", 4.5), ("Mario", 3.5), ("Sonic", 4.0))
+    ]
+    db_session.add_all([nintendo, sega, *games])
+    await db_session.flush()
+    db_session.add_all([
+        GameTeam(game_id=games[0].id, team_id=nintendo.id),
+        GameTeam(game_id=games[1].id, team_id=nintendo.id),
+        GameTeam(game_id=games[2].id, team_id=sega.id),
+    ])
+    await db_session.commit()
+
+    response = await authenticated_editor_client.get("/teams/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"id": nintendo.id, "name": "Nintendo", "games_count": 2, "average_rating": 4.0},
+        {"id": sega.id, "name": "Sega", "games_count": 1, "average_rating": 4.0},
+    ]
+
+    response = await authenticated_editor_client.get(f"/teams/{nintendo.id}/games", params={"limit": 1})
+    assert [game["title"] for game in response.json()] == ["Zelda"]
+    assert response.json()[0]["game_teams"] == ["Nintendo"]
+    assert response.headers["X-Next-Cursor"] == str(games[0].id)
+
+    response = await authenticated_editor_client.get(
+        f"/teams/{nintendo.id}/games", params={"limit": 1, "after": games[0].id}
+    )
+    assert [game["title"] for game in response.json()] == ["Mario"]
+    assert response.headers["X-Has-More"] == "false"
+
+
+@pytest.mark.asyncio
+async def test_get_team_games_not_found(authenticated_editor_client: AsyncClient):
+    response = await authenticated_editor_client.get("/teams/999/games")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Team not found"
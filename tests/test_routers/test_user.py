@@ -1,8 +1,11 @@
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import event, func, select
 
-from app.models import User
+from app.models import Genre, User, UserLikedGenres
+from app.services.user import UserService
+from tests.conftest import AsyncTestSessionLocal, test_engine
 
 
 @pytest.mark.asyncio
@@ -65,3 +68,78 @@ async def test_delete_user_success(authenticated_admin_client: AsyncClient, user
 async def test_delete_user_not_found(authenticated_admin_client: AsyncClient):
     response = await authenticated_admin_client.delete("/user/999999")
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def create_users_with_genres(db_session, count: int, role_id: int) -> list[int]:
+    genre = Genre(name="Strategy")
+    users = [User(username=f"bulk_{role_id}_{index}", password_hash="hash", role_id=role_id) for index in range(count)]
+    db_session.add_all([genre, *users])
+    await db_session.flush()
+    db_session.add_all([UserLikedGenres(user_id=user.id, genre_id=genre.id) for user in users])
+    await db_session.commit()
+    return [user.id for user in users]
+
+
+async def count_rows(model) -> int:
+    async with AsyncTestSessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_delete_user_removes_liked_genres(authenticated_admin_client: AsyncClient, db_session):
+    (user_id,) = await create_users_with_genres(db_session, 1, role_id=2)
+    response = await authenticated_admin_client.delete(f"/user/{user_id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert await count_rows(UserLikedGenres) == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_by_ids(authenticated_admin_client: AsyncClient, admin_user: User, db_session):
+    user_ids = await create_users_with_genres(db_session, 5, role_id=3)
+    response = await authenticated_admin_client.post(
+        "/user/bulk-delete", json={"user_ids": [*user_ids[:4], admin_user.id, 999999]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"users": 4, "liked_genres": 4}
+    # the requesting admin and the fifth user are kept
+    assert await count_rows(User) == 2
+    assert await count_rows(UserLikedGenres) == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_by_role_in_batches(db_session):
+    user_ids = await create_users_with_genres(db_session, 7, role_id=3)
+    kept = User(username="kept", password_hash="hash", role_id=2)
+    db_session.add(kept)
+    await db_session.commit()
+
+    deletes = []
+
+    def count_deletes(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM users"):
+            deletes.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count_deletes)
+    try:
+        users, liked_genres = await UserService().delete_users(
+            db_session, user_ids=[*user_ids, kept.id], role_id=3, batch_size=3
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", count_deletes)
+    assert (users, liked_genres) == (7, 7)
+    # eight ids in batches of three
+    assert len(deletes) == 3
+    assert await count_rows(User) == 1
+
+    users, _ = await UserService().delete_users(db_session, user_ids=[kept.id, kept.id], role_id=3, batch_size=1)
+    assert users == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_validation(
+    authenticated_admin_client: AsyncClient, authenticated_editor_client: AsyncClient
+):
+    response = await authenticated_admin_client.post("/user/bulk-delete", json={})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = await authenticated_editor_client.post("/user/bulk-delete", json={"role_id": 3})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,116 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game
+from app.schemas.game import GameCounter
+from app.services.activity import JOURNAL_PREFIX, ActivityBuffer
+from app.services.leaderboard import LeaderboardService
+from app.utils.cache import query_cache
+from tests.conftest import AsyncTestSessionLocal
+
+
+@pytest.fixture
+def buffer(tmp_path):
+    buffer = ActivityBuffer(journal_dir=str(tmp_path), batch_size=2, max_pending_games=100)
+    yield buffer
+    buffer.close()
+
+
+async def create_games(db_session, count: int) -> list[Game]:
+    games = [
+        Game(
+            title=f"Game {index}",
+            rating=1,
+            times_listed=0,
+            reviews_number=0,
+            plays=10,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for index in range(count)
+    ]
+    db_session.add_all(games)
+    await db_session.commit()
+    return games
+
+
+@pytest.mark.asyncio
+async def test_flush_merges_deltas_per_game(buffer, db_session):
+    games = await create_games(db_session, 3)
+    for game in games:
+        buffer.record(game.id, GameCounter.plays, 1)
+        buffer.record(game.id, GameCounter.plays, 2)
+    buffer.record(games[0].id, GameCounter.playing, -1)
+    buffer.record(999, GameCounter.plays, 1)
+    assert len(buffer.pending) == 4
+
+    assert await buffer.flush(db_session) == 4
+    assert not buffer.pending
+    assert list(buffer.journal_dir.glob("*.seg")) == []
+
+    for game in games:
+        await db_session.refresh(game)
+    assert [game.plays for game in games] == [13, 13, 13]
+    # counters stop at zero
+    assert games[0].playing == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_catalog_caches(buffer, db_session):
+    (game,) = await create_games(db_session, 1)
+    board = LeaderboardService(size=10, genre_size=5)
+    await board.rebuild(db_session)
+    games_version = query_cache.versions(("games",))
+
+    buffer.record(game.id, GameCounter.plays, 5)
+    async with AsyncTestSessionLocal() as db:
+        await buffer.flush(db)
+    assert query_cache.versions(("games",)) == games_version
+    assert board.current() is not None
+    await db_session.refresh(game)
+    assert game.plays == 15
+
+
+@pytest.mark.asyncio
+async def test_journal_of_crashed_process_is_replayed(buffer, db_session):
+    (game,) = await create_games(db_session, 1)
+    buffer.record(game.id, GameCounter.backlogs, 4)
+    # a crash: the journal stays behind and its lock is released
+    buffer.close()
+
+    recovered = ActivityBuffer(journal_dir=str(buffer.journal_dir), batch_size=10, max_pending_games=100)
+    recovered.open()
+    assert recovered.pending[game.id]["backlogs"] == 4
+
+    await recovered.flush(db_session)
+    recovered.close()
+    await db_session.refresh(game)
+    assert game.backlogs == 4
+    assert [path.suffix for path in buffer.journal_dir.iterdir()] == [".log"]
+
+
+def test_recovery_skips_journals_claimed_meanwhile(buffer, monkeypatch):
+    buffer.journal_dir.mkdir(parents=True, exist_ok=True)
+    dead = buffer.journal_dir / f"{JOURNAL_PREFIX}4242.log"
+    dead.write_text("7 plays 3\n")
+    # listed, then recovered and renamed by another process before this one opens it
+    vanished = buffer.journal_dir / f"{JOURNAL_PREFIX}4243.log"
+    listed = {f"{JOURNAL_PREFIX}*.log": [dead, vanished]}
+    monkeypatch.setattr(type(dead), "glob", lambda self, pattern: iter(listed.get(pattern, [])))
+
+    buffer.open()
+    assert buffer.pending[7]["plays"] == 3
+    assert not dead.exists()
+
+
+@pytest.mark.asyncio
+async def test_record_activity_endpoint(authenticated_editor_client: AsyncClient, buffer, monkeypatch):
+    monkeypatch.setattr("app.routers.game.activity_buffer", buffer)
+    response = await authenticated_editor_client.post("/games/1/activity", json={"counter": "whitelist", "delta": 2})
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert buffer.pending[1]["whitelist"] == 2
+
+    response = await authenticated_editor_client.post("/games/1/activity", json={"counter": "rating"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,89 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game
+from app.services.autocomplete import TitleIndex, TitleIndexService
+from app.services.game import GameService
+
+CATALOG = [
+    ("The Legend of Zelda", 5.0, 4.5),
+    ("Zelda II", 0.5, 3.0),
+    ("Legend of Grimrock", 8.0, 4.0),
+    ("Super Mario Bros.", 9.0, 5.0),
+    ("Mario Kart 8", 7.0, 4.0),
+    ("100% Orange Juice", 0.1, 2.0),
+    ("Doom", 3.0, 3.5),
+    ("Doom II", 3.0, 4.5),
+]
+
+
+async def create_catalog(db_session) -> dict[str, int]:
+    games = [
+        Game(
+            title=title,
+            rating=rating,
+            score=score,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for title, score, rating in CATALOG
+    ]
+    db_session.add_all(games)
+    await db_session.commit()
+    return {game.title: game.id for game in games}
+
+
+def titles(results) -> list[str]:
+    return [result.title for result in results]
+
+
+def test_title_prefix_first_then_score():
+    index = TitleIndex.build((0,), [(row, *game) for row, game in enumerate(CATALOG)])
+    assert titles(index.search("zel", 10)) == ["Zelda II", "The Legend of Zelda"]
+    assert titles(index.search("  LEGEND ", 10)) == ["Legend of Grimrock", "The Legend of Zelda"]
+    assert titles(index.search("mario", 1)) == ["Mario Kart 8"]
+    assert titles(index.search("m", 10)) == ["Mario Kart 8", "Super Mario Bros."]
+    assert titles(index.search("100%", 10)) == ["100% Orange Juice"]
+    assert titles(index.search("doom", 10)) == ["Doom II", "Doom"]
+    assert index.search("zz", 10) == []
+
+
+def test_long_queries_are_checked_against_the_full_title():
+    long_title = "A " + "very " * 10 + "long title"
+    index = TitleIndex.build((0,), [(1, long_title, 0, 0), (2, "A " + "very " * 10 + "long story", 0, 0)])
+    assert titles(index.search(long_title[:-3], 10)) == [long_title]
+
+
+@pytest.mark.asyncio
+async def test_database_path_matches_index(db_session):
+    await create_catalog(db_session)
+    service = TitleIndexService()
+    index = await service.rebuild(db_session)
+    game_service = GameService()
+    for query in ["zel", "legend", "m", "mario k", "100%", "doom", "_", "zz"]:
+        assert await game_service.autocomplete_titles(query, db_session, 10) == index.search(query, 10), query
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_endpoint(authenticated_editor_client: AsyncClient, db_session, monkeypatch):
+    ids = await create_catalog(db_session)
+    response = await authenticated_editor_client.get("/games/autocomplete", params={"q": "leg"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"id": ids["Legend of Grimrock"], "title": "Legend of Grimrock"},
+        {"id": ids["The Legend of Zelda"], "title": "The Legend of Zelda"},
+    ]
+
+    service = TitleIndexService()
+    await service.rebuild(db_session)
+    monkeypatch.setattr("app.routers.game.title_index", service)
+    indexed = await authenticated_editor_client.get("/games/autocomplete", params={"q": "leg"})
+    assert indexed.json() == response.json()
+
+    response = await authenticated_editor_client.get("/games/autocomplete", params={"q": ""})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game, GameGenre, GameTeam, Genre, Review, Team
+from app.schemas.game import GameSortField
+from app.services.catalog import CatalogSnapshotService, catalog_snapshot
+from app.services.game import GameService
+
+
+async def create_catalog(db_session) -> tuple[Genre, Genre]:
+    action, puzzle = Genre(name="Action"), Genre(name="Puzzle")
+    team = Team(name="Studio")
+    games = [
+        Game(
+            title=f"Game {rating}",
+            release_date=datetime.date(2020, 1, int(rating)),
+            summary=None if rating == 1 else f"Summary {rating}",
+            rating=rating,
+            score=6 - rating,
+            times_listed=1,
+            reviews_number=2,
+            plays=3,
+            playing=4,
+            backlogs=5,
+            whitelist=6,
+        )
+        for rating in (1.0, 4.0, 3.0, 2.0, 5.0)
+    ]
+    db_session.add_all([action, puzzle, team, *games])
+    await db_session.flush()
+    db_session.add_all(
+        [GameGenre(game_id=game.id, genre_id=action.id) for game in games[:3]]
+        + [GameGenre(game_id=game.id, genre_id=puzzle.id) for game in games[2:]]
+        + [GameTeam(game_id=games[1].id, team_id=team.id), Review(game_id=games[1].id, review="Great")]
+        # a score without text is not listed as a review
+        + [Review(game_id=games[1].id, score=4)]
+    )
+    await db_session.commit()
+    return action, puzzle
+
+
+@pytest.fixture
+def service(tmp_path):
+    return CatalogSnapshotService(str(tmp_path / "catalog.bin"), check_interval=0)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_database_reads(service, db_session):
+    action, puzzle = await create_catalog(db_session)
+    snapshot = await service.rebuild(db_session)
+    game_service = GameService()
+
+    for sort in GameSortField:
+        assert snapshot.top(3, 1, sort) == await game_service.get_games(db_session, 3, 1, sort)
+        assert snapshot.top_for_genres([action.id, puzzle.id], 10, 0, sort) == (
+            await game_service.get_games_by_genre_ids([action.id, puzzle.id], db_session, 10, 0, sort)
+        )
+    assert snapshot.top_for_genres([action.id], 2, 1, GameSortField.rating) == (
+        await game_service.get_games_by_genre_ids([action.id], db_session, 2, 1)
+    )
+
+    game_ids = [game.id for game in await game_service.get_games(db_session, 5, 0)][::-1] + [999]
+    assert snapshot.games_by_ids(game_ids) == await game_service.get_games_by_ids(game_ids, db_session)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_ignored_after_catalog_write_until_rebuilt(service, db_session):
+    await create_catalog(db_session)
+    await service.rebuild(db_session)
+    assert service.current() is not None
+
+    db_session.add(Genre(name="Racing"))
+    await db_session.commit()
+    assert service.current() is None
+
+    old = service.snapshot
+    await service.rebuild(db_session)
+    assert service.current() is not None
+    assert service.snapshot is not old
+    assert len(old.games) == 5
+
+
+@pytest.mark.asyncio
+async def test_games_endpoint_serves_from_catalog(
+    authenticated_editor_client: AsyncClient, db_session, service, monkeypatch
+):
+    await create_catalog(db_session)
+    await service.rebuild(db_session)
+    monkeypatch.setattr(catalog_snapshot, "path", service.path)
+    monkeypatch.setattr(catalog_snapshot, "snapshot", service.snapshot)
+    monkeypatch.setattr(catalog_snapshot, "_changed_at", service._changed_at)
+    monkeypatch.setattr(catalog_snapshot, "_versions", service._versions)
+
+    response = await authenticated_editor_client.get("/games/", params={"limit": 2, "sort": "score"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [game["title"] for game in response.json()] == ["Game 1.0", "Game 2.0"]
@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Game, GameGenre, GameTeam, Genre, Review, SimilarGame, Team
+from app.schemas.game import GameSortField
+from app.services.game import GameService
+from app.settings import settings
+from app.utils.cache import query_cache
+from tests.conftest import AsyncTestSessionLocal
+
+
+@pytest_asyncio.fixture
+async def catalog(db_session: AsyncSession) -> list[Game]:
+    genres = [Genre(name="Action, Adventure"), Genre(name="Puzzle")]
+    teams = [Team(name="Studio A"), Team(name='Studio "B"')]
+    games = [
+        Game(
+            title=f"Game {index}",
+            release_date=date(2020, 1, index + 1) if index % 2 else None,
+            rating=4.3 - index / 10,
+            score=index,
+            summary=None if index % 3 else f"Summary {index}",
+            times_listed=index,
+            reviews_number=index,
+            plays=index,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for index in range(6)
+    ]
+    db_session.add_all(genres + teams + games)
+    await db_session.flush()
+    db_session.add_all([
+        GameGenre(game_id=games[0].id, genre_id=genres[1].id),
+        GameGenre(game_id=games[0].id, genre_id=genres[0].id),
+        GameGenre(game_id=games[2].id, genre_id=genres[0].id),
+        GameGenre(game_id=games[3].id, genre_id=genres[1].id),
+        GameTeam(game_id=games[0].id, team_id=teams[1].id),
+        GameTeam(game_id=games[1].id, team_id=teams[0].id),
+        Review(game_id=games[0].id, review="Great", score=5),
+        Review(game_id=games[0].id, review=None, score=4),
+        Review(game_id=games[2].id, review="Fine"),
+        SimilarGame(game_id=games[0].id, rank=1, similar_game_id=games[3].id, similarity=0.9),
+        SimilarGame(game_id=games[0].id, rank=2, similar_game_id=games[2].id, similarity=0.5),
+    ])
+    await db_session.commit()
+    return games
+
+
+async def read_all(game_ids: list[int]) -> list:
+    query_cache.clear()
+    service = GameService()
+    async with AsyncTestSessionLocal() as db:
+        return [
+            await service.get_games(db, 10, 0, GameSortField.rating),
+            await service.get_games(db, 2, 1, GameSortField.score),
+            await service.get_games_by_genre_ids([1, 2], db, limit=10, offset=0),
+            await service.get_games_by_ids(list(reversed(game_ids)), db),
+            await service.get_similar_games(game_ids[0], db, 10),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_core_read_path_matches_orm(catalog: list[Game], monkeypatch):
+    game_ids = [game.id for game in catalog]
+    monkeypatch.setattr(settings, "games_core_read_path", False)
+    orm_reads = await read_all(game_ids)
+    monkeypatch.setattr(settings, "games_core_read_path", True)
+    core_reads = await read_all(game_ids)
+
+    assert core_reads == orm_reads
+    first = core_reads[0][0]
+    assert sorted(first.game_genres) == ["Action, Adventure", "Puzzle"]
+    assert first.game_teams == ['Studio "B"']
+    assert first.game_reviews == ["Great"]
+    assert core_reads[0][-1].game_genres == []
+    assert [game.id for game in core_reads[4]] == [game_ids[3], game_ids[2]]
+
+
+@pytest.mark.asyncio
+async def test_core_read_path_matches_orm_on_seeded_catalog(seeded_catalog: None, monkeypatch):
+    async with AsyncTestSessionLocal() as db:
+        game_ids = list((await db.execute(select(Game.id).order_by(Game.id).limit(50))).scalars())
+    assert len(game_ids) == 50
+
+    monkeypatch.setattr(settings, "games_core_read_path", False)
+    orm_reads = await read_all(game_ids)
+    monkeypatch.setattr(settings, "games_core_read_path", True)
+    core_reads = await read_all(game_ids)
+
+    # the CSV repeats genres within a game, only their order differs between the paths
+    for orm_games, core_games in zip(orm_reads, core_reads, strict=True):
+        assert [game.id for game in core_games] == [game.id for game in orm_games]
+        for orm_game, core_game in zip(orm_games, core_games, strict=True):
+            assert sorted(core_game.game_genres) == sorted(orm_game.game_genres)
+            assert core_game.model_dump(exclude={"game_genres"}) == orm_game.model_dump(exclude={"game_genres"})
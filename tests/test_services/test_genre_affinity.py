@@ -0,0 +1,90 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game, GameGenre, Genre, UserLikedGenres
+from app.schemas.game import GameSortField
+from app.services.genre_affinity import GenreAffinityService, genre_affinity
+
+
+def make_game(title: str, rating: float) -> Game:
+    return Game(
+        title=title, rating=rating, times_listed=0, reviews_number=0, plays=0, playing=0, backlogs=0, whitelist=0
+    )
+
+
+async def create_catalog(db_session) -> tuple[Genre, Genre, Genre]:
+    """RPG mostly co-occurs with Adventure, Racing never does."""
+    rpg, adventure, racing = Genre(name="RPG"), Genre(name="Adventure"), Genre(name="Racing")
+    rpg_adventure = make_game("RPG Adventure", 3.0)
+    pure_rpg = make_game("Pure RPG", 2.0)
+    pure_adventure = make_game("Pure Adventure", 5.0)
+    pure_racing = make_game("Pure Racing", 4.9)
+    db_session.add_all([rpg, adventure, racing, rpg_adventure, pure_rpg, pure_adventure, pure_racing])
+    await db_session.flush()
+    db_session.add_all([
+        GameGenre(game_id=rpg_adventure.id, genre_id=rpg.id),
+        GameGenre(game_id=rpg_adventure.id, genre_id=adventure.id),
+        GameGenre(game_id=pure_rpg.id, genre_id=rpg.id),
+        GameGenre(game_id=pure_adventure.id, genre_id=adventure.id),
+        GameGenre(game_id=pure_racing.id, genre_id=racing.id),
+    ])
+    await db_session.commit()
+    return rpg, adventure, racing
+
+
+async def titles(db_session, game_ids: list[int]) -> list[str]:
+    return [(await db_session.get(Game, game_id)).title for game_id in game_ids]
+
+
+@pytest.mark.asyncio
+async def test_recommend_expands_with_cooccurring_genres(db_session):
+    rpg, _, _ = await create_catalog(db_session)
+    model = await GenreAffinityService().rebuild(db_session)
+
+    game_ids, total = model.recommend([rpg.id], limit=10, offset=0, sort=GameSortField.rating, expansion_weight=0.5)
+    assert await titles(db_session, game_ids) == ["RPG Adventure", "Pure RPG", "Pure Adventure"]
+    assert total == 3
+
+    game_ids, total = model.recommend([rpg.id], limit=10, offset=0, sort=GameSortField.rating, expansion_weight=0)
+    assert await titles(db_session, game_ids) == ["RPG Adventure", "Pure RPG"]
+    assert total == 2
+
+    game_ids, total = model.recommend([rpg.id], limit=1, offset=2, sort=GameSortField.rating, expansion_weight=0.5)
+    assert await titles(db_session, game_ids) == ["Pure Adventure"]
+    assert total == 3
+
+
+@pytest.mark.asyncio
+async def test_recommend_with_empty_catalog(db_session):
+    model = await GenreAffinityService().rebuild(db_session)
+    assert model.recommend([1], limit=10, offset=0, sort=GameSortField.rating, expansion_weight=0.5) == ([], 0)
+
+
+@pytest.mark.asyncio
+async def test_recommendations_endpoint_uses_affinity_model(
+    authenticated_editor_client: AsyncClient, db_session, editor_user, monkeypatch
+):
+    rpg, _, _ = await create_catalog(db_session)
+    db_session.add(UserLikedGenres(user_id=editor_user.id, genre_id=rpg.id))
+    await db_session.commit()
+    monkeypatch.setattr(genre_affinity, "model", await GenreAffinityService().rebuild(db_session))
+
+    response = await authenticated_editor_client.get("/games/recommendations")
+    assert response.status_code == status.HTTP_200_OK
+    assert [game["title"] for game in response.json()] == ["RPG Adventure", "Pure RPG", "Pure Adventure"]
+
+
+@pytest.mark.asyncio
+async def test_model_is_ignored_after_catalog_write_until_rebuilt(db_session):
+    await create_catalog(db_session)
+    service = GenreAffinityService()
+    await service.rebuild(db_session)
+    assert service.current() is not None
+
+    db_session.add(Genre(name="Puzzle"))
+    await db_session.commit()
+    assert service.current() is None
+
+    await service.rebuild(db_session)
+    assert service.current() is not None
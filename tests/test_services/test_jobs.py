@@ -0,0 +1,173 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.models import Game, Job
+from app.schemas.job import JobStatus
+from app.services.jobs import JOB_HANDLERS, JobContext, JobQueueFullError, JobRunner, UnknownJobTypeError
+from tests.conftest import AsyncTestSessionLocal
+
+
+@pytest.fixture
+def runner():
+    return JobRunner(queue_size=10, workers=3, type_limits={"limited": 1}, default_type_limit=2)
+
+
+@pytest.mark.asyncio
+async def test_job_runs_and_stores_result(runner, db_session):
+    db_session.add(
+        Game(title="Game", rating=4.0, times_listed=1, reviews_number=1, plays=1, playing=1, backlogs=1, whitelist=1)
+    )
+    await db_session.commit()
+    job = await runner.enqueue(db_session, "compute_scores", {})
+    assert job.status == JobStatus.queued.value
+
+    await runner.start(AsyncTestSessionLocal)
+    await runner.join()
+    await runner.stop()
+
+    await db_session.refresh(job)
+    assert job.status == JobStatus.succeeded.value
+    assert job.progress == 1
+    assert job.result == {"games": 1}
+    assert runner.stats()["succeeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error(runner, db_session, monkeypatch):
+    async def broken(db, params, context):
+        await context.report(0.5)
+        raise ValueError("boom")
+
+    monkeypatch.setitem(JOB_HANDLERS, "broken", broken)
+    job = await runner.enqueue(db_session, "broken", {})
+    await runner.start(AsyncTestSessionLocal)
+    await runner.join()
+    await runner.stop()
+
+    await db_session.refresh(job)
+    assert job.status == JobStatus.failed.value
+    # progress is not written on SQLite, see test_progress_is_not_written_on_sqlite
+    assert job.progress == 0
+    assert job.error == "ValueError: boom"
+
+
+@pytest.mark.asyncio
+async def test_type_limit_caps_concurrency(runner, db_session, monkeypatch):
+    active = peak = 0
+
+    async def limited(db, params, context):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    monkeypatch.setitem(JOB_HANDLERS, "limited", limited)
+    for _ in range(3):
+        await runner.enqueue(db_session, "limited", {})
+    await runner.start(AsyncTestSessionLocal)
+    await runner.join()
+    await runner.stop()
+
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_rejects_unknown_type_and_full_queue(db_session):
+    runner = JobRunner(queue_size=1, workers=1, type_limits={}, default_type_limit=1)
+    with pytest.raises(UnknownJobTypeError):
+        await runner.enqueue(db_session, "missing", {})
+
+    await runner.enqueue(db_session, "compute_scores", {})
+    with pytest.raises(JobQueueFullError):
+        await runner.enqueue(db_session, "compute_scores", {})
+
+
+@pytest.mark.asyncio
+async def test_start_fails_only_jobs_of_stopped_runners(runner, db_session):
+    now = datetime.now(UTC)
+    orphaned = Job(type="compute_scores", status=JobStatus.running.value, params={}, created_at=now)
+    stale = Job(
+        type="compute_scores",
+        status=JobStatus.running.value,
+        params={},
+        created_at=now,
+        owner="other-worker",
+        heartbeat_at=now - timedelta(seconds=runner.stale_after_seconds + 1),
+    )
+    alive = Job(
+        type="compute_scores",
+        status=JobStatus.running.value,
+        params={},
+        created_at=now,
+        owner="other-worker",
+        heartbeat_at=now,
+    )
+    db_session.add_all([orphaned, stale, alive])
+    await db_session.commit()
+
+    await runner.start(AsyncTestSessionLocal)
+    await runner.stop()
+
+    for job in (orphaned, stale, alive):
+        await db_session.refresh(job)
+    assert (orphaned.status, stale.status) == (JobStatus.failed.value, JobStatus.failed.value)
+    assert orphaned.error == "Interrupted by shutdown"
+    assert alive.status == JobStatus.running.value
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_own_jobs_alive(db_session):
+    runner = JobRunner(queue_size=1, workers=1, type_limits={}, default_type_limit=1, heartbeat_seconds=0.01)
+    beaten = datetime.now(UTC) - timedelta(hours=1)
+    job = Job(
+        type="compute_scores",
+        status=JobStatus.running.value,
+        params={},
+        created_at=beaten,
+        owner=runner.owner,
+        heartbeat_at=beaten,
+    )
+    db_session.add(job)
+    await db_session.commit()
+
+    await runner.start(AsyncTestSessionLocal)
+    await asyncio.sleep(0.05)
+    await runner.stop()
+
+    await db_session.refresh(job)
+    assert job.status == JobStatus.running.value
+    assert job.heartbeat_at.replace(tzinfo=UTC) > beaten
+
+
+@pytest.mark.asyncio
+async def test_compute_scores_reports_progress(db_session, monkeypatch):
+    db_session.add_all([
+        Game(title=title, rating=4.0, times_listed=1, reviews_number=1, plays=1, playing=1, backlogs=1, whitelist=1)
+        for title in ("First", "Second")
+    ])
+    await db_session.commit()
+    monkeypatch.setattr("app.services.scoring.UPDATE_BATCH_SIZE", 1)
+    reported = []
+
+    class Context:
+        async def report(self, progress: float) -> None:
+            reported.append(progress)
+
+    assert await JOB_HANDLERS["compute_scores"](db_session, {}, Context()) == {"games": 2}
+    assert reported == [0.5, 1.0]
+
+
+@pytest.mark.asyncio
+async def test_progress_is_not_written_on_sqlite(db_session, caplog):
+    job = Job(type="compute_scores", status=JobStatus.running.value, params={}, created_at=datetime.now(UTC))
+    db_session.add(job)
+    await db_session.commit()
+
+    # the job's transaction would hold SQLite's write lock, every report would wait for it and fail
+    await JobContext(job.id, AsyncTestSessionLocal).report(0.5)
+    await db_session.refresh(job)
+    assert job.progress == 0
+    assert not caplog.records
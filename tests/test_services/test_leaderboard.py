@@ -0,0 +1,67 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game, GameGenre, Genre
+from app.services.leaderboard import LeaderboardService, leaderboard
+
+
+async def create_catalog(db_session) -> tuple[Genre, Genre]:
+    action, puzzle = Genre(name="Action"), Genre(name="Puzzle")
+    games = [
+        Game(
+            title=f"Game {rating}",
+            rating=rating,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for rating in (1.0, 4.0, 3.0, 2.0, 5.0)
+    ]
+    db_session.add_all([action, puzzle, *games])
+    await db_session.flush()
+    db_session.add_all(
+        [GameGenre(game_id=game.id, genre_id=action.id) for game in games[:3]]
+        + [GameGenre(game_id=game.id, genre_id=puzzle.id) for game in games[2:]]
+    )
+    await db_session.commit()
+    return action, puzzle
+
+
+@pytest.mark.asyncio
+async def test_snapshot_ranks_overall_and_per_genre(db_session):
+    action, puzzle = await create_catalog(db_session)
+    snapshot = await LeaderboardService(size=3, genre_size=2).rebuild(db_session)
+
+    assert [game.title for game in snapshot.top(limit=2, offset=1)] == ["Game 4.0", "Game 3.0"]
+    assert snapshot.top(limit=2, offset=2) is None
+
+    by_genre = snapshot.top_for_genres([action.id, puzzle.id], limit=2, offset=0)
+    assert [game.title for game in by_genre] == ["Game 5.0", "Game 4.0"]
+    assert snapshot.top_for_genres([action.id], limit=3, offset=0) is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_ignored_once_catalog_changes(db_session):
+    await create_catalog(db_session)
+    service = LeaderboardService(size=10, genre_size=10)
+    await service.rebuild(db_session)
+    assert service.current() is not None
+
+    db_session.add(Genre(name="Racing"))
+    await db_session.commit()
+    assert service.current() is None
+
+
+@pytest.mark.asyncio
+async def test_games_endpoint_serves_from_snapshot(authenticated_editor_client: AsyncClient, db_session, monkeypatch):
+    await create_catalog(db_session)
+    snapshot = await LeaderboardService(size=10, genre_size=10).rebuild(db_session)
+    monkeypatch.setattr(leaderboard, "snapshot", snapshot)
+
+    response = await authenticated_editor_client.get("/games/", params={"limit": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert [game["title"] for game in response.json()] == ["Game 5.0", "Game 4.0"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.models import Game
+from app.services.scoring import compute_scores, recompute_game_scores
+from app.settings import Settings
+
+
+def make_columns(**overrides):
+    columns = {
+        name: np.array([0.0, 0.0, 0.0])
+        for name in ("rating", "reviews_number", "plays", "playing", "backlogs", "whitelist", "times_listed")
+    }
+    columns.update({name: np.array(values, dtype=np.float64) for name, values in overrides.items()})
+    return columns
+
+
+def test_rating_is_shrunk_by_review_count():
+    columns = make_columns(rating=[5.0, 4.6, 3.0], reviews_number=[2, 5000, 100])
+    scores = compute_scores(columns, {"rating": 1.0}, rating_prior_reviews=50)
+    assert scores[1] > scores[0] > scores[2]
+
+
+def test_scores_are_normalized_weighted_sum():
+    columns = make_columns(rating=[4.0, 4.0, 4.0], reviews_number=[10, 10, 10], plays=[0, 99, 9999])
+    scores = compute_scores(columns, {"rating": 1.0, "plays": 1.0}, rating_prior_reviews=0)
+    assert scores[2] == pytest.approx(1.0)
+    assert scores[0] == pytest.approx(0.5)
+    assert np.all(np.diff(scores) > 0)
+
+
+def test_score_weights_are_validated_at_startup():
+    with pytest.raises(ValidationError, match="unknown score signals"):
+        Settings(score_weights={"rating": 1.0, "ratings": 1.0})
+    with pytest.raises(ValidationError, match="must not be negative"):
+        Settings(score_weights={"plays": -1.0})
+
+
+@pytest.mark.asyncio
+async def test_recompute_game_scores_writes_back(db_session):
+    db_session.add_all([
+        Game(
+            title="Popular",
+            rating=4.0,
+            reviews_number=1000,
+            plays=100_000,
+            playing=500,
+            backlogs=900,
+            whitelist=800,
+            times_listed=1000,
+        ),
+        Game(title="Niche", rating=4.2, reviews_number=3, plays=10, playing=0, backlogs=1, whitelist=0, times_listed=2),
+    ])
+    await db_session.commit()
+
+    assert await recompute_game_scores(db_session) == 2
+
+    scores = dict((await db_session.execute(select(Game.title, Game.score))).all())
+    assert scores["Popular"] > scores["Niche"] > 0
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import select
+
+from app.models import Game, GameGenre, GameTeam, Genre, SimilarGame, Team
+from app.services.similarity import SimilarGamesService, similar_games
+
+
+def make_game(title: str, plays: int = 0) -> Game:
+    return Game(
+        title=title, rating=3.0, times_listed=0, reviews_number=0, plays=plays, playing=0, backlogs=0, whitelist=0
+    )
+
+
+async def neighbours(db_session, game: Game) -> list[int]:
+    statement = select(SimilarGame.similar_game_id).where(SimilarGame.game_id == game.id).order_by(SimilarGame.rank)
+    return list((await db_session.execute(statement)).scalars())
+
+
+@pytest.mark.asyncio
+async def test_refresh_ranks_by_shared_genres_and_teams(db_session):
+    rpg, shooter = Genre(name="RPG"), Genre(name="Shooter")
+    studio = Team(name="Studio")
+    base, same_team, same_genre, unrelated = (make_game(title) for title in ("Base", "Team", "Genre", "Other"))
+    db_session.add_all([rpg, shooter, studio, base, same_team, same_genre, unrelated])
+    await db_session.flush()
+    db_session.add_all([
+        GameGenre(game_id=base.id, genre_id=rpg.id),
+        GameTeam(game_id=base.id, team_id=studio.id),
+        GameGenre(game_id=same_team.id, genre_id=rpg.id),
+        GameTeam(game_id=same_team.id, team_id=studio.id),
+        GameGenre(game_id=same_genre.id, genre_id=rpg.id),
+        GameGenre(game_id=unrelated.id, genre_id=shooter.id),
+    ])
+    await db_session.commit()
+
+    service = SimilarGamesService(top_k=5, team_weight=2.0, popularity_weight=0.0)
+    assert await service.refresh(db_session) == 4
+
+    assert await neighbours(db_session, base) == [same_team.id, same_genre.id]
+    assert await neighbours(db_session, unrelated) == []
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_updates_affected_games(db_session):
+    rpg = Genre(name="RPG")
+    first, second, third = make_game("First"), make_game("Second"), make_game("Third")
+    db_session.add_all([rpg, first, second, third])
+    await db_session.flush()
+    db_session.add_all([GameGenre(game_id=first.id, genre_id=rpg.id), GameGenre(game_id=second.id, genre_id=rpg.id)])
+    await db_session.commit()
+
+    service = SimilarGamesService(top_k=5, team_weight=2.0, popularity_weight=0.0)
+    await service.refresh(db_session)
+    assert await neighbours(db_session, first) == [second.id]
+
+    similar_games.pending_game_ids.clear()
+    db_session.add(GameGenre(game_id=third.id, genre_id=rpg.id))
+    await db_session.commit()
+    assert third.id in similar_games.pending_game_ids
+
+    await service.refresh(db_session, {third.id})
+    assert set(await neighbours(db_session, first)) == {second.id, third.id}
+    assert set(await neighbours(db_session, third)) == {first.id, second.id}
@@ -0,0 +1,133 @@
+import fnmatch
+
+import pytest
+from sqlalchemy import delete
+
+from app.models import Genre, UserLikedGenres
+from app.utils.cache import MISSING, MemoryCacheBackend, QueryCache, RedisCacheBackend, query_cache
+
+
+class LocalRedis:
+    """Stand-in for a redis client, implementing only what RedisCacheBackend uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2, max_bytes=1024 * 1024)
+    backend.set("a", 1, None)
+    backend.set("b", 2, None)
+    assert backend.get("a") == 1
+    backend.set("c", 3, None)
+
+    assert backend.get("b") is MISSING
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+
+
+def test_memory_backend_respects_byte_limit():
+    backend = MemoryCacheBackend(max_entries=100, max_bytes=200)
+    backend.set("small", "x", None)
+    backend.set("large", "x" * 500, None)
+    backend.set("medium", "y" * 180, None)
+
+    assert backend.get("large") is MISSING
+    assert backend.get("small") is MISSING
+    assert backend.get("medium") == "y" * 180
+    assert backend.current_bytes <= 200
+
+
+@pytest.mark.asyncio
+async def test_cached_method_is_invalidated_by_table_version():
+    cache = QueryCache(RedisCacheBackend(LocalRedis()))
+    calls = []
+
+    class Service:
+        @cache.cached("genres")
+        async def get(self, genre_id: int) -> int:
+            calls.append(genre_id)
+            return genre_id * 2
+
+    service = Service()
+    assert await service.get(1) == 2
+    assert await service.get(1) == 2
+    assert calls == [1]
+
+    cache.bump("genres")
+    assert await service.get(1) == 2
+    assert calls == [1, 1]
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_orm_writes_bump_table_versions(db_session, editor_user):
+    before = query_cache.versions(["genres", "user_liked_genres"])
+
+    genre = Genre(name="Strategy")
+    db_session.add(genre)
+    await db_session.commit()
+    after_insert = query_cache.versions(["genres", "user_liked_genres"])
+    assert after_insert[0] > before[0]
+    assert after_insert[1] == before[1]
+
+    await db_session.execute(delete(UserLikedGenres).where(UserLikedGenres.user_id == editor_user.id))
+    await db_session.commit()
+    assert query_cache.versions(["user_liked_genres"])[0] > after_insert[1]
+
+
+def test_memory_backend_returns_copies():
+    backend = MemoryCacheBackend(max_entries=10, max_bytes=1024 * 1024)
+    backend.set("genres", ["RPG"], None)
+    backend.get("genres").append("Indie")
+
+    assert backend.get("genres") == ["RPG"]
+
+
+@pytest.mark.asyncio
+async def test_versions_move_on_commit_only(db_session):
+    calls = []
+
+    class Service:
+        @query_cache.cached("genres")
+        async def count(self, db) -> int:
+            calls.append(1)
+            return len(calls)
+
+    service = Service()
+    before = query_cache.versions(["genres"])
+    assert await service.count(db_session) == 1
+
+    db_session.add(Genre(name="Pending"))
+    await db_session.flush()
+    assert query_cache.versions(["genres"]) == before
+    assert await service.count(db_session) == 2
+    assert await service.count(db_session) == 3
+    await db_session.rollback()
+
+    assert query_cache.versions(["genres"]) == before
+    assert await service.count(db_session) == 1
+
+    db_session.add(Genre(name="Committed"))
+    await db_session.commit()
+    assert query_cache.versions(["genres"]) > before
@@ -0,0 +1,78 @@
+import gzip
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.models import Game
+from app.services.leaderboard import LeaderboardService, leaderboard
+from app.utils.compression import CompressedBody, negotiate
+
+
+def test_negotiate_respects_quality_values():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("gzip;q=0, deflate") is None
+    assert negotiate("identity") is None
+    assert negotiate("*") in {"br", "gzip"}
+    assert negotiate(None) is None
+
+
+def test_compressed_body_encodes_once():
+    body = CompressedBody(b"[" + b'{"title":"Game"},' * 200 + b"{}]")
+    first = body.encoded("gzip")
+    assert body.encoded("gzip") is first
+    assert gzip.decompress(first) == body.body
+    assert body.etag == CompressedBody(body.body).etag
+
+
+async def create_games(db_session, count: int) -> None:
+    db_session.add_all([
+        Game(
+            title=f"Game {index}",
+            summary="A long summary that compresses well. " * 10,
+            rating=index,
+            times_listed=0,
+            reviews_number=0,
+            plays=0,
+            playing=0,
+            backlogs=0,
+            whitelist=0,
+        )
+        for index in range(count)
+    ])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_gzipped(authenticated_editor_client: AsyncClient, db_session):
+    await create_games(db_session, 10)
+
+    response = await authenticated_editor_client.get("/games/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 10
+
+    response = await authenticated_editor_client.get("/games/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_snapshot_pages_are_precompressed_with_etag(
+    authenticated_editor_client: AsyncClient, db_session, monkeypatch
+):
+    await create_games(db_session, 10)
+    snapshot = await LeaderboardService(size=10, genre_size=10, rendered_limit=10).rebuild(db_session)
+    monkeypatch.setattr(leaderboard, "snapshot", snapshot)
+
+    params = {"limit": 5}
+    response = await authenticated_editor_client.get("/games/", params=params, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert [game["title"] for game in response.json()][:2] == ["Game 9", "Game 8"]
+    etag = response.headers["etag"]
+    assert snapshot.bodies[("top", 5, 0)].etag == etag
+
+    response = await authenticated_editor_client.get("/games/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
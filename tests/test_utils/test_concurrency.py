@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.responses import PlainTextResponse
+
+from app.utils.concurrency import AdaptiveLimiter, ConcurrencyLimitMiddleware, OverloadedError, route_class
+
+
+def make_limiter(**kwargs) -> AdaptiveLimiter:
+    options = {"initial_limit": 2, "min_limit": 1, "max_limit": 4, "max_queue": 1, "max_wait": 1.0}
+    return AdaptiveLimiter("test", **{**options, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_queues_up_to_the_limit_then_sheds():
+    limiter = make_limiter()
+    await limiter.acquire()
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == 1
+    with pytest.raises(OverloadedError):
+        await limiter.acquire()
+
+    limiter.release(0.01)
+    await waiting
+    assert limiter.in_flight == 2
+    assert limiter.shed == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_request_times_out():
+    limiter = make_limiter(initial_limit=1, max_wait=0.01)
+    await limiter.acquire()
+    with pytest.raises(OverloadedError):
+        await limiter.acquire()
+    assert limiter.stats()["queued"] == 0
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_sheds_early_when_predicted_wait_is_too_long():
+    limiter = make_limiter(initial_limit=1, max_queue=10, max_wait=0.5)
+    limiter.latency = 1.0
+    await limiter.acquire()
+    with pytest.raises(OverloadedError) as err:
+        await limiter.acquire()
+    assert err.value.retry_after >= 1.0
+
+
+def test_limit_adapts_to_latency():
+    limiter = make_limiter(initial_limit=2)
+    limiter.in_flight = 2
+    limiter.release(0.01)
+    assert limiter.limit > 2
+
+    limiter.in_flight = 1
+    before = limiter.limit
+    limiter.release(0.5)
+    assert limiter.limit < before
+    assert limiter.limit >= limiter.min_limit
+
+
+def test_route_classes():
+    assert route_class("POST", "/auth/login") == "auth"
+    assert route_class("GET", "/games/") == "read"
+    assert route_class("POST", "/games/reviews") == "write"
+    assert route_class("GET", "/health/ready") is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_answers_503_with_retry_after():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    limiter = make_limiter(initial_limit=1, max_queue=0)
+    app = ConcurrencyLimitMiddleware(slow_app, {"read": limiter})
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/games/"))
+        await asyncio.sleep(0.01)
+        response = await client.get("/games/")
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+
+        release.set()
+        assert (await first).status_code == 200
+    assert limiter.in_flight == 0
@@ -0,0 +1,120 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from starlette.responses import PlainTextResponse
+
+from app.utils.concurrency import AdaptiveLimiter, ConcurrencyLimitMiddleware
+from app.utils.deadline import (
+    DeadlineMiddleware,
+    current_deadline,
+    deadline_stats,
+    is_deadline_error,
+    route_budget,
+)
+from tests.conftest import AsyncTestSessionLocal
+
+# counts to ten million, far longer than the deadlines below
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000000) SELECT count(*) FROM n"
+)
+
+
+def test_route_budget_uses_longest_prefix():
+    budgets = {"/games": 5, "/games/recommendations": 1, "/health": 0}
+    assert route_budget("/games/recommendations", budgets, 10) == ("/games/recommendations", 1)
+    assert route_budget("/games/1/similar", budgets, 10) == ("/games", 5)
+    assert route_budget("/user/me", budgets, 10) == ("*", 10)
+    assert route_budget("/health/live", budgets, 10) == ("/health", 0)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_statement_is_interrupted_at_the_deadline():
+    token = current_deadline.set(time.monotonic() + 0.05)
+    try:
+        started = time.monotonic()
+        with pytest.raises(OperationalError) as err:
+            async with AsyncTestSessionLocal() as db:
+                await db.execute(SLOW_QUERY)
+        assert time.monotonic() - started < 2
+        assert is_deadline_error(err.value)
+    finally:
+        current_deadline.reset(token)
+
+    # the handler is removed for transactions without a deadline
+    async with AsyncTestSessionLocal() as db:
+        assert (await db.execute(text("SELECT 1"))).scalar_one() == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_query_answers_504():
+    async def slow_endpoint(scope, receive, send):
+        async with AsyncTestSessionLocal() as db:
+            await db.execute(SLOW_QUERY)
+        await PlainTextResponse("done")(scope, receive, send)
+
+    app = DeadlineMiddleware(slow_endpoint, {"/slow": 0.05}, default=None)
+    exceeded = sum(deadline_stats.exceeded.values())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/slow")
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+    assert sum(deadline_stats.exceeded.values()) == exceeded + 1
+
+
+@pytest.mark.asyncio
+async def test_request_is_cancelled_at_the_deadline():
+    async def sleepy_endpoint(scope, receive, send):
+        await asyncio.sleep(5)
+
+    app = DeadlineMiddleware(sleepy_endpoint, {}, default=0.05)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/anything")
+    assert response.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_errors_before_the_deadline_propagate():
+    # an ASGI app is awaited, so it stays a coroutine function though it raises before suspending
+    async def failing_endpoint(scope, receive, send):  # noqa: RUF029
+        raise ValueError("boom")
+
+    app = DeadlineMiddleware(failing_endpoint, {}, default=5)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        with pytest.raises(ValueError):
+            await client.get("/anything")
+
+
+def test_deadline_errors_are_recognised_by_code():
+    interrupted = sqlite3.OperationalError("interrupted")
+    interrupted.sqlite_errorcode = sqlite3.SQLITE_INTERRUPT
+    locked = sqlite3.OperationalError("database is locked, the import was interrupted")
+    locked.sqlite_errorcode = sqlite3.SQLITE_BUSY
+    assert is_deadline_error(OperationalError("SELECT 1", {}, interrupted))
+    assert not is_deadline_error(OperationalError("SELECT 1", {}, locked))
+
+
+@pytest.mark.asyncio
+async def test_limiter_queue_time_counts_against_the_deadline():
+    async def endpoint(scope, receive, send):
+        await PlainTextResponse("done")(scope, receive, send)
+
+    limiter = AdaptiveLimiter("test", initial_limit=1, min_limit=1, max_limit=1, max_queue=10, max_wait=5)
+    await limiter.acquire()
+    app = DeadlineMiddleware(ConcurrencyLimitMiddleware(endpoint, {"read": limiter}), {}, default=0.05)
+    started = time.monotonic()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/anything")
+        assert response.status_code == 504
+        assert time.monotonic() - started < 1
+        assert limiter.stats()["queued"] == 0
+
+        # a predicted wait beyond the budget is shed before queueing
+        limiter.latency = 1.0
+        response = await client.get("/anything")
+        assert response.status_code == 503
+        assert limiter.shed == 1
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+
+from app.utils.profiling import PROFILE_ID_HEADER, classify, server_timing
+from tests.conftest import AsyncTestSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def profiling_session(monkeypatch) -> None:
+    monkeypatch.setattr("app.utils.profiling.async_session_maker", AsyncTestSessionLocal)
+
+
+@pytest.mark.asyncio
+async def test_admin_request_is_profiled(authenticated_admin_client: AsyncClient):
+    response = await authenticated_admin_client.get("/games/", headers={"X-Profile": "1"})
+    assert response.status_code == status.HTTP_200_OK
+    assert "sql;dur=" in response.headers["Server-Timing"]
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    response = await authenticated_admin_client.get(f"/admin/profiles/{profile_id}")
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["path"] == "/games/"
+    assert report["phases"]["total"] >= report["phases"]["sql"] > 0
+    assert any("FROM games" in statement["sql"] for statement in report["statements"])
+    assert report["functions"]
+
+    response = await authenticated_admin_client.get("/admin/profiles")
+    assert response.json()[0]["id"] == profile_id
+
+
+@pytest.mark.asyncio
+async def test_profiling_header_ignored_for_non_admins(authenticated_editor_client: AsyncClient):
+    response = await authenticated_editor_client.get("/games/", headers={"X-Profile": "1"})
+    assert response.status_code == status.HTTP_200_OK
+    assert PROFILE_ID_HEADER not in response.headers
+    assert "Server-Timing" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_unknown_profile(authenticated_admin_client: AsyncClient):
+    response = await authenticated_admin_client.get("/admin/profiles/missing")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_classify_and_server_timing():
+    assert classify(("/venv/sqlalchemy/orm/loading.py", 1, "instances")) == "orm_hydration"
+    assert classify(("/venv/passlib/handlers/bcrypt.py", 1, "verify")) == "password_hashing"
+    validator = "<method 'validate_python' of 'pydantic_core._pydantic_core.SchemaValidator' objects>"
+    assert classify(("~", 0, validator)) == "validation"
+    assert classify(("/app/routers/game.py", 1, "get_games")) is None
+    assert server_timing({"total": 0.01, "sql": 0.002}, 3) == 'total;dur=10.00, sql;dur=2.00;desc="3 statements"'
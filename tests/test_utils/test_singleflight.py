@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from sqlalchemy import inspect
+
+from app.models import Genre, UserLikedGenres
+from app.services.user import UserService
+from app.utils.singleflight import SingleFlight, user_lookup_flight
+from tests.conftest import AsyncTestSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test_shared")
+    executions = 0
+
+    async def fetch():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return [1, 2, 3]
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+    assert executions == 1
+    assert all(result == [1, 2, 3] for result in results)
+    assert flight.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_followers():
+    flight = SingleFlight("test_errors")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.executions == 1
+
+
+@pytest.mark.asyncio
+async def test_follower_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight("test_cancel")
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "value"
+
+    leader = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "value"
+    assert flight.executions == 2
+
+
+@pytest.mark.asyncio
+async def test_coalesced_user_lookup_is_bound_to_each_session(editor_user, db_session):
+    genre = Genre(name="Puzzle")
+    db_session.add(genre)
+    await db_session.flush()
+    db_session.add(UserLikedGenres(user_id=editor_user.id, genre_id=genre.id))
+    await db_session.commit()
+    service = UserService()
+    coalesced_before = user_lookup_flight.coalesced
+
+    async with AsyncTestSessionLocal() as first, AsyncTestSessionLocal() as second:
+        users = await asyncio.gather(
+            service.get_user_by_id(editor_user.id, first), service.get_user_by_id(editor_user.id, second)
+        )
+
+        assert user_lookup_flight.coalesced == coalesced_before + 1
+        assert users[0] in first
+        assert users[1] in second
+        assert users[1].role_name == "editor"
+        assert users[1].liked_genres_names == users[0].liked_genres_names == ["Puzzle"]
+
+        # the follower's instance is its own, built from column values rather than the leader's instance
+        users[0].username = "renamed"
+        assert users[1].username == editor_user.username
+        assert "users" not in inspect(users[1].role).dict
+
+
+@pytest.mark.asyncio
+async def test_user_lookup_after_own_write_does_not_coalesce(editor_user):
+    service = UserService()
+
+    async with AsyncTestSessionLocal() as first, AsyncTestSessionLocal() as second:
+        user = await service.get_user_by_id(editor_user.id, first)
+        user.username = "renamed"
+        await first.commit()
+
+        coalesced_before = user_lookup_flight.coalesced
+        _, reread = await asyncio.gather(
+            service.get_user_by_id(editor_user.id, second), service.get_user_by_id(editor_user.id, first)
+        )
+
+        assert user_lookup_flight.coalesced == coalesced_before
+        assert reread is user
+        assert reread.username == "renamed"
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+from jose import jwt
+
+from app.utils import auth
+from app.utils.auth import decode_jwt_token, generate_jwt_token, get_user_from_token
+from app.utils.token_cache import TokenCache
+
+
+def test_verified_claims_are_cached_until_expiry(monkeypatch):
+    cache = TokenCache(max_entries=10, max_token_length=100)
+    claims = cache.put("token", {"sub": "1", "exp": 2_000})
+    monkeypatch.setattr("app.utils.token_cache.time.time", lambda: 1_000)
+    assert cache.get("token") == claims
+    with pytest.raises(TypeError):
+        claims["sub"] = "2"
+
+    monkeypatch.setattr("app.utils.token_cache.time.time", lambda: 2_000)
+    assert cache.get("token") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1, "hit_ratio": 0.5, "expired": 1, "evictions": 0}
+
+
+def test_cache_is_bounded():
+    cache = TokenCache(max_entries=2, max_token_length=10)
+    for token in ("a", "b", "c"):
+        cache.put(token, {"exp": 2**40})
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+    cache.put("x" * 11, {"exp": 2**40})
+    cache.put("no-expiry", {"sub": "1"})
+    assert cache.get("x" * 11) is None
+    assert cache.get("no-expiry") is None
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_token_skips_verification(monkeypatch, db_session, editor_user):
+    monkeypatch.setattr(auth, "token_cache", TokenCache(max_entries=10, max_token_length=4096))
+    decodes = []
+    decode = jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: decodes.append(1) or decode(*args, **kwargs))
+
+    token = generate_jwt_token({"sub": str(editor_user.id)})
+    for _ in range(3):
+        user = await get_user_from_token(token, db_session)
+        assert user.id == editor_user.id
+    assert len(decodes) == 1
+    assert auth.token_cache.stats()["hits"] == 2
+
+    assert decode_jwt_token("not-a-token") is None
+    assert decode_jwt_token("not-a-token") is None
+    assert decode_jwt_token(generate_jwt_token({"sub": "1"}, timedelta(minutes=-1))) is None
+    assert auth.token_cache.stats()["entries"] == 1
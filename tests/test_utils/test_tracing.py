@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.game import GameService
+from app.utils.hashing import verify_password
+from app.utils.tracing import (
+    FileSpanExporter,
+    Span,
+    Tracer,
+    TracingMiddleware,
+    format_traceparent,
+    instrument_routes,
+    listen_to_statements,
+    parse_traceparent,
+)
+from tests.conftest import override_get_async_session
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+# bcrypt hash of "secret" at the minimum cost
+PASSWORD_HASH = "$2b$04$7GZvzB3TBVMJTZcEEX9Vpes1PJmVNAzpc6KKlBtLSaA83ObNExaDK"
+
+
+class ListExporter:
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    async def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def exporter(monkeypatch) -> ListExporter:
+    exporter = ListExporter()
+    monkeypatch.setattr("app.utils.tracing.tracer", Tracer(sample_rate=0, max_queued=100, exporters=[exporter]))
+    return exporter
+
+
+def traced_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/games/{game_id}")
+    async def game(game_id: int, db: AsyncSession = Depends(override_get_async_session)):
+        return {
+            "exists": await GameService().game_exists(game_id, db),
+            "match": verify_password("secret", PASSWORD_HASH),
+        }
+
+    instrument_routes(app)
+    listen_to_statements()
+    return app
+
+
+async def get(tracer: Tracer, headers: dict[str, str]):
+    app = TracingMiddleware(traced_app(), tracer=tracer)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/games/1", headers=headers)
+    await tracer.export()
+    return response
+
+
+def test_traceparent_round_trip():
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent("00-" + "0" * 32 + f"-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert format_traceparent(TRACE_ID, PARENT_ID, True) == f"00-{TRACE_ID}-{PARENT_ID}-01"
+
+
+def test_sampling_follows_parent_then_rate():
+    assert Tracer(sample_rate=0, max_queued=1, exporters=[]).should_sample(TRACE_ID, True)
+    assert not Tracer(sample_rate=1, max_queued=1, exporters=[]).should_sample(TRACE_ID, False)
+    assert Tracer(sample_rate=1, max_queued=1, exporters=[]).should_sample(TRACE_ID, None)
+    assert not Tracer(sample_rate=0, max_queued=1, exporters=[]).should_sample(TRACE_ID, None)
+
+
+@pytest.mark.asyncio
+async def test_sampled_request_spans_route_service_sql_and_hashing(exporter: ListExporter):
+    from app.utils import tracing
+
+    response = await get(tracing.tracer, {"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    assert response.json() == {"exists": False, "match": True}
+    trace_id, server_span_id, sampled = parse_traceparent(response.headers["traceparent"])
+    assert (trace_id, sampled) == (TRACE_ID, True)
+
+    spans = {span.name: span for span in exporter.spans}
+    assert {span.trace_id for span in exporter.spans} == {TRACE_ID}
+    server = spans["GET /games/{game_id}"]
+    assert (server.span_id, server.parent_id, server.attributes["http.status_code"]) == (server_span_id, PARENT_ID, 200)
+    route = spans["route game"]
+    assert (route.parent_id, route.attributes["http.route"]) == (server.span_id, "/games/{game_id}")
+    assert spans["GameService.game_exists"].parent_id == route.span_id
+    assert spans["sql"].parent_id == spans["GameService.game_exists"].span_id
+    assert "FROM games" in spans["sql"].attributes["db.statement"]
+    assert spans["password_hashing.verify"].parent_id == route.span_id
+    assert all(span.end_ns >= span.start_ns for span in exporter.spans)
+
+
+@pytest.mark.asyncio
+async def test_unsampled_request_records_nothing(exporter: ListExporter):
+    from app.utils import tracing
+
+    response = await get(tracing.tracer, {})
+    assert response.headers["traceparent"].endswith("-00")
+    assert exporter.spans == []
+    assert tracing.tracer.stats()["unsampled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_file_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(sample_rate=1, max_queued=1, exporters=[FileSpanExporter(str(path))])
+    tracer.finish(Span(TRACE_ID, PARENT_ID, None, "one"))
+    tracer.finish(Span(TRACE_ID, PARENT_ID, None, "dropped"))
+    await tracer.export()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["one"]
+    assert tracer.stats()["dropped"] == 1
+    assert Span(TRACE_ID, PARENT_ID, None, "one", error="boom").to_otlp()["status"] == {"code": 2, "message": "boom"}